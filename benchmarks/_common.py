@@ -0,0 +1,50 @@
+import timeit
+import tracemalloc
+from typing import Callable, Tuple, Union
+
+import httpx
+
+from httptoolkit.transport import AsyncHttpxTransport, HttpxTransport
+
+BASE_URL = "https://example.com:4321/api"
+
+
+def mock_network(transport: Union[HttpxTransport, AsyncHttpxTransport], content: bytes = b"ok") -> None:
+    """
+    Replace the network layer of the transport session, so that only the library overhead is measured.
+    """
+    if isinstance(transport, HttpxTransport):
+        transport._session._transport = httpx.MockTransport(lambda request: httpx.Response(200, content=content))
+    else:
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(200, content=content)
+
+        transport._session._transport = httpx.MockTransport(handler)
+
+
+def per_call_microseconds(function: Callable[[], object], number: int, repeat: int = 5) -> float:
+    return min(timeit.repeat(function, number=number, repeat=repeat)) / number * 1e6
+
+
+def retained_per_call(function: Callable[[], object], number: int) -> Tuple[float, float]:
+    """
+    Memory blocks and bytes still allocated per call while the results are kept alive.
+    """
+    results = []
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        for _ in range(number):
+            results.append(function())
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    statistics = after.compare_to(before, "filename")
+    blocks = sum(stat.count_diff for stat in statistics)
+    size = sum(stat.size_diff for stat in statistics)
+    return blocks / number, size / number
+
+
+def report(name: str, value: float, unit: str = "us/call") -> None:
+    print(f"{name:<48} {value:>12.2f} {unit}")
@@ -0,0 +1,71 @@
+"""
+Cost of the SentRequest returned by HttpxTransport.send: the lazy view of the httpx request compared with eagerly
+materialized headers and body, as the transport used to build them for every request.
+
+The httpx request is kept alive by the response anyway, so it is retained in both variants. The "send" numbers
+include the request log record, which still reads the headers and body even when INFO is disabled.
+
+    python -m benchmarks.lazy_sent_request
+"""
+
+import logging
+from typing import Tuple
+
+from httpx import Request as OriginalRequest
+
+from httptoolkit import Header, HttpMethod
+from httptoolkit.request import Request
+from httptoolkit.sent_request import SentRequest
+from httptoolkit.transport import HttpxTransport
+from ._common import BASE_URL, mock_network, per_call_microseconds, report, retained_per_call
+
+NUMBER = 2000
+HEADERS = (
+    Header(name="X-Service", value="service", is_sensitive=False),
+    Header(name="Authorization", value="Bearer token", is_sensitive=True),
+)
+
+
+class EagerHttpxTransport(HttpxTransport):
+    def _prepare_sent_request(self, request: Request, httpx_request: OriginalRequest) -> SentRequest:
+        httpx_request.read()
+        sensitive_headers = {header.name.lower(): header.is_sensitive for header in request.headers}
+        headers = tuple(
+            Header(
+                name=header_name,
+                value=httpx_request.headers[header_name],
+                is_sensitive=sensitive_headers.get(header_name, False),
+            )
+            for header_name in httpx_request.headers
+        )
+        sent_request = SentRequest(
+            request=request,
+            base_url=self._base_url,
+            body=httpx_request.content,
+            proxies=self._proxies,
+            headers=headers,
+        )
+        sent_request.url
+        return sent_request
+
+
+def main() -> None:
+    logging.getLogger("httptoolkit").setLevel(logging.WARNING)
+    request = Request(method=HttpMethod.POST, path="/users", params={"page": 1}, headers=HEADERS, json={"a": 1})
+
+    for name, transport in (("eager", EagerHttpxTransport(base_url=BASE_URL)), ("lazy", HttpxTransport(BASE_URL))):
+        mock_network(transport)
+
+        def prepare(transport: HttpxTransport = transport) -> Tuple[OriginalRequest, SentRequest]:
+            httpx_request = transport._build_httpx_request(request)
+            return httpx_request, transport._prepare_sent_request(request, httpx_request)
+
+        blocks, size = retained_per_call(prepare, NUMBER)
+        report(f"prepare, {name} SentRequest: retained blocks", blocks, "blocks/call")
+        report(f"prepare, {name} SentRequest: retained bytes", size, "bytes/call")
+        report(f"prepare, {name} SentRequest", per_call_microseconds(prepare, NUMBER))
+        report(f"send, {name} SentRequest", per_call_microseconds(lambda: transport.send(request), NUMBER))
+
+
+if __name__ == "__main__":
+    main()
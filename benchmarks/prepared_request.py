@@ -0,0 +1,63 @@
+"""
+Per-call overhead of Service.get/post compared with a PreparedRequest of the same endpoint.
+
+The network layer is mocked, so the numbers are the cost of the library and httpx request handling.
+
+    python -m benchmarks.prepared_request
+"""
+
+import logging
+
+from httptoolkit import Header, HttpMethod, Service
+from httptoolkit.request import Request
+from httptoolkit.transport import HttpxTransport
+from ._common import BASE_URL, mock_network, per_call_microseconds, report
+
+NUMBER = 5000
+PARAMS = {"fields": "name,email"}
+INDEX_HEADER = Header(name="X-Index", value="users", is_sensitive=False)
+
+
+def main() -> None:
+    logging.getLogger("httptoolkit").setLevel(logging.WARNING)
+    transport = HttpxTransport(base_url=BASE_URL)
+    mock_network(transport)
+    service = Service(
+        transport=transport,
+        headers=(
+            Header(name="X-Service", value="service", is_sensitive=False),
+            Header(name="Authorization", value="Bearer token", is_sensitive=True),
+        ),
+    )
+    get_user = service.prepare(HttpMethod.GET, "/users/{user_id}", params=PARAMS)
+    search = service.prepare(HttpMethod.POST, "/search", headers=(INDEX_HEADER,))
+
+    def build_request() -> None:
+        request = Request(method=HttpMethod.GET, path="/users/42", params=PARAMS, headers=service.headers)
+        transport._build_httpx_request(request)
+
+    def build_prepared() -> None:
+        transport._build_httpx_request(get_user.build(path_params={"user_id": 42}))
+
+    report("build httpx request: Request", per_call_microseconds(build_request, NUMBER))
+    report("build httpx request: PreparedRequest", per_call_microseconds(build_prepared, NUMBER))
+    report(
+        "GET: Service.get",
+        per_call_microseconds(lambda: service.get("/users/42", params=PARAMS), NUMBER),
+    )
+    report(
+        "GET: PreparedRequest",
+        per_call_microseconds(lambda: service.request(get_user.build(path_params={"user_id": 42})), NUMBER),
+    )
+    report(
+        "POST json: Service.post",
+        per_call_microseconds(lambda: service.post("/search", headers=(INDEX_HEADER,), json={"q": "x"}), NUMBER),
+    )
+    report(
+        "POST json: PreparedRequest",
+        per_call_microseconds(lambda: service.request(search.build(json={"q": "x"})), NUMBER),
+    )
+
+
+if __name__ == "__main__":
+    main()
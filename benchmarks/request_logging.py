@@ -0,0 +1,45 @@
+"""
+Cost of the request log line for MB-sized bodies, with INFO disabled and enabled.
+
+The "str body" variant is how the record used to compute the body size: len(str(body)), a repr copy of the body.
+
+    python -m benchmarks.request_logging
+"""
+
+import logging
+import os
+
+from httptoolkit import Header, HttpMethod
+from httptoolkit.request import Request
+from httptoolkit.transport import HttpxTransport
+from ._common import BASE_URL, per_call_microseconds, report
+
+NUMBER = 50
+SIZES_IN_MB = (1, 8)
+HEADERS = (
+    Header(name="X-Service", value="service", is_sensitive=False),
+    Header(name="Authorization", value="Bearer token", is_sensitive=True),
+)
+
+
+def main() -> None:
+    transport = HttpxTransport(base_url=BASE_URL)
+    logger = logging.getLogger("httptoolkit")
+    handler = logging.StreamHandler(open(os.devnull, "w"))
+    handler.setFormatter(logging.Formatter("%(message)s %(headers)s"))
+    logger.addHandler(handler)
+    logger.propagate = False
+
+    for size in SIZES_IN_MB:
+        body = b"x" * size * 1024 * 1024
+        request = Request(method=HttpMethod.POST, path="/upload", params=None, headers=HEADERS, body=body)
+        sent_request = transport._prepare_sent_request(request, transport._build_httpx_request(request))
+
+        report(f"{size} MB: str body size", per_call_microseconds(lambda: len(str(sent_request.body)), NUMBER))
+        for level, name in ((logging.WARNING, "INFO disabled"), (logging.INFO, "INFO enabled")):
+            logger.setLevel(level)
+            report(f"{size} MB: log, {name}", per_call_microseconds(lambda: transport._log(sent_request), NUMBER))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,5 @@
+from ._base import BaseBulkWriter, BulkFormat, BulkWriterStats
+from ._sync import BulkWriter
+from ._async import AsyncBulkWriter
+
+__all__ = ["BaseBulkWriter", "BulkFormat", "BulkWriterStats", "BulkWriter", "AsyncBulkWriter"]
@@ -0,0 +1,127 @@
+import asyncio
+from typing import Any, Callable, List, Optional, Set, Tuple
+
+from httptoolkit.encoder import default_json_encoder
+from httptoolkit.header import Header
+from httptoolkit.service import AsyncService
+from ._base import BaseBulkWriter, BulkFormat, BulkWriterStats
+
+
+class AsyncBulkWriter(BaseBulkWriter):
+    """
+    Buffers records and posts them to a bulk endpoint of an AsyncService in batches.
+
+    write() waits while max_buffered_records are buffered or being sent; a write still waiting when the writer is
+    closed raises RuntimeError. close() sends what is left and waits for the batches in flight.
+    """
+
+    def __init__(
+        self,
+        service: AsyncService,
+        path: str,
+        bulk_format: BulkFormat = BulkFormat.NDJSON,
+        headers: Tuple[Header, ...] = (),
+        max_records: int = BaseBulkWriter.DEFAULT_MAX_RECORDS,
+        max_bytes: int = BaseBulkWriter.DEFAULT_MAX_BYTES,
+        max_age_in_seconds: float = BaseBulkWriter.DEFAULT_MAX_AGE_IN_SECONDS,
+        max_in_flight: int = BaseBulkWriter.DEFAULT_MAX_IN_FLIGHT,
+        max_buffered_records: int = BaseBulkWriter.DEFAULT_MAX_BUFFERED_RECORDS,
+        max_retries: int = BaseBulkWriter.DEFAULT_MAX_RETRIES,
+        retry_backoff_factor: float = BaseBulkWriter.DEFAULT_RETRY_BACKOFF_FACTOR,
+        json_encoder: Callable[[Any], str] = default_json_encoder,
+    ) -> None:
+        super().__init__(
+            path,
+            bulk_format=bulk_format,
+            headers=headers,
+            max_records=max_records,
+            max_bytes=max_bytes,
+            max_age_in_seconds=max_age_in_seconds,
+            max_in_flight=max_in_flight,
+            max_buffered_records=max_buffered_records,
+            max_retries=max_retries,
+            retry_backoff_factor=retry_backoff_factor,
+            json_encoder=json_encoder,
+        )
+        self._service = service
+        self._condition: Optional[asyncio.Condition] = None
+        self._in_flight: Optional[asyncio.Semaphore] = None
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set["asyncio.Task[None]"] = set()
+
+    async def write(self, record: Any) -> None:
+        data = self._encode(record)
+        condition = self._get_condition()
+        async with condition:
+            if self._closed:
+                raise RuntimeError("the writer is closed")
+            await condition.wait_for(lambda: self._pending < self._max_buffered_records or self._closed)
+            if self._closed:
+                raise RuntimeError("the writer is closed")
+            if self._needs_flush_before(data):
+                self.flush()
+            loop = asyncio.get_running_loop()
+            if self._append(data, loop.time()):
+                self.flush()
+            elif self._timer is None:
+                self._timer = loop.call_later(self._max_age_in_seconds, self.flush)
+
+    def flush(self) -> None:
+        """
+        Send the buffered records now, without waiting for them.
+        """
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._buffer:
+            return
+        task = asyncio.ensure_future(self._send(self._take_batch()))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def close(self) -> BulkWriterStats:
+        condition = self._get_condition()
+        async with condition:
+            self._closed = True
+            # wake the writers waiting for room, they fail as the buffer is no longer sent
+            condition.notify_all()
+        self.flush()
+        while self._tasks:
+            await asyncio.gather(*self._tasks)
+        return self.stats
+
+    async def __aenter__(self) -> "AsyncBulkWriter":
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        await self.close()
+
+    def _get_condition(self) -> asyncio.Condition:
+        # created on first use, so that the writer can be made outside of the event loop
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        return self._condition
+
+    async def _send(self, batch: List[bytes]) -> None:
+        request = self._build_request(batch)
+        error: Optional[Exception] = None
+        attempt = 0
+        if self._in_flight is None:
+            self._in_flight = asyncio.Semaphore(self._max_in_flight)
+        async with self._in_flight:
+            while True:
+                try:
+                    await self._service.request(request)
+                    error = None
+                    break
+                except Exception as exc:
+                    error = exc
+                    if not self._should_retry(exc, attempt):
+                        break
+                await asyncio.sleep(self._retry_backoff(attempt))
+                attempt += 1
+                self._retries += 1
+        condition = self._get_condition()
+        async with condition:
+            self._finish_batch(batch, error)
+            condition.notify_all()
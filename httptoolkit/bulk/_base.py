@@ -0,0 +1,143 @@
+import logging
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, Callable, List, Optional, Tuple
+
+from httptoolkit.encoder import default_json_encoder
+from httptoolkit.errors import HttpError, ServiceError
+from httptoolkit.header import Header
+from httptoolkit.http_method import HttpMethod
+from httptoolkit.request import Request
+
+
+class BulkFormat(Enum):
+    NDJSON = "application/x-ndjson"
+    """One JSON record per line."""
+    JSON_ARRAY = "application/json"
+    """One JSON array of the records."""
+
+
+@dataclass(frozen=True)
+class BulkWriterStats:
+    records: int
+    """Records sent."""
+    batches: int
+    """Batches sent."""
+    retries: int
+    """Batches sent again after a failure."""
+    dropped: int
+    """Records given up on after the retries."""
+
+
+class BaseBulkWriter:
+    DEFAULT_MAX_RECORDS = 1000
+    DEFAULT_MAX_BYTES = 1024 * 1024
+    DEFAULT_MAX_AGE_IN_SECONDS = 1.0
+    DEFAULT_MAX_IN_FLIGHT = 2
+    DEFAULT_MAX_BUFFERED_RECORDS = 10000
+    DEFAULT_MAX_RETRIES = 3
+    DEFAULT_RETRY_BACKOFF_FACTOR = 0.5
+
+    def __init__(
+        self,
+        path: str,
+        bulk_format: BulkFormat = BulkFormat.NDJSON,
+        headers: Tuple[Header, ...] = (),
+        max_records: int = DEFAULT_MAX_RECORDS,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        max_age_in_seconds: float = DEFAULT_MAX_AGE_IN_SECONDS,
+        max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+        max_buffered_records: int = DEFAULT_MAX_BUFFERED_RECORDS,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        retry_backoff_factor: float = DEFAULT_RETRY_BACKOFF_FACTOR,
+        json_encoder: Callable[[Any], str] = default_json_encoder,
+    ) -> None:
+        """
+        :param max_records: A batch is sent once it holds that many records.
+        :param max_bytes: A batch is sent before a record would take its body over that many bytes.
+        :param max_age_in_seconds: A batch is sent at the latest that long after its first record.
+        :param max_in_flight: How many batches are sent at the same time.
+        :param max_buffered_records: Writers wait while that many records are buffered or being sent.
+        :param max_retries: How many times a failed batch is sent again before its records are dropped.
+        """
+        if max_records < 1 or max_in_flight < 1 or max_buffered_records < 1:
+            raise RuntimeError("max_records, max_in_flight and max_buffered_records must be at least 1")
+        self._path = path
+        self._format = bulk_format
+        self._headers = headers + (Header(name="Content-Type", value=bulk_format.value, is_sensitive=False),)
+        self._max_records = max_records
+        self._max_bytes = max_bytes
+        self._max_age_in_seconds = max_age_in_seconds
+        self._max_in_flight = max_in_flight
+        self._max_buffered_records = max_buffered_records
+        self._max_retries = max_retries
+        self._retry_backoff_factor = retry_backoff_factor
+        self._json_encoder = json_encoder
+        self._logger = logging.getLogger(self.__class__.__module__)
+
+        self._buffer: List[bytes] = []
+        self._buffer_bytes = 0
+        self._buffer_started: Optional[float] = None
+        self._pending = 0
+        self._closed = False
+        self._sent_records = 0
+        self._sent_batches = 0
+        self._retries = 0
+        self._dropped = 0
+
+    @property
+    def stats(self) -> BulkWriterStats:
+        return BulkWriterStats(
+            records=self._sent_records, batches=self._sent_batches, retries=self._retries, dropped=self._dropped
+        )
+
+    def _encode(self, record: Any) -> bytes:
+        return self._json_encoder(record).encode()
+
+    def _needs_flush_before(self, data: bytes) -> bool:
+        return bool(self._buffer) and self._buffer_bytes + len(data) > self._max_bytes
+
+    def _append(self, data: bytes, now: float) -> bool:
+        """
+        :return: Whether the batch is full.
+        """
+        if not self._buffer:
+            self._buffer_started = now
+        self._buffer.append(data)
+        self._buffer_bytes += len(data)
+        self._pending += 1
+        return len(self._buffer) >= self._max_records
+
+    def _take_batch(self) -> List[bytes]:
+        batch = self._buffer
+        self._buffer = []
+        self._buffer_bytes = 0
+        self._buffer_started = None
+        return batch
+
+    def _build_request(self, batch: List[bytes]) -> Request:
+        if self._format is BulkFormat.NDJSON:
+            body = b"\n".join(batch) + b"\n"
+        else:
+            body = b"[" + b",".join(batch) + b"]"
+        return Request(method=HttpMethod.POST, path=self._path, params=None, headers=self._headers, body=body)
+
+    def _should_retry(self, exc: Exception, attempt: int) -> bool:
+        if attempt >= self._max_retries or not isinstance(exc, ServiceError):
+            return False
+        if isinstance(exc, HttpError):
+            status_code = exc.response_code()
+            return status_code is not None and (status_code >= 500 or status_code == 429)
+        return True
+
+    def _retry_backoff(self, attempt: int) -> float:
+        return self._retry_backoff_factor * (2**attempt)
+
+    def _finish_batch(self, batch: List[bytes], error: Optional[Exception]) -> None:
+        self._pending -= len(batch)
+        if error is None:
+            self._sent_records += len(batch)
+            self._sent_batches += 1
+            return
+        self._dropped += len(batch)
+        self._logger.warning("Dropped %d records for %s: %s", len(batch), self._path, type(error).__name__)
@@ -0,0 +1,129 @@
+import threading
+import time
+from concurrent import futures
+from typing import Any, Callable, List, Optional, Tuple
+
+from httptoolkit.encoder import default_json_encoder
+from httptoolkit.header import Header
+from httptoolkit.service import Service
+from ._base import BaseBulkWriter, BulkFormat, BulkWriterStats
+
+
+class BulkWriter(BaseBulkWriter):
+    """
+    Buffers records and posts them to a bulk endpoint of a Service in batches, from a thread pool.
+
+    write() blocks while max_buffered_records are buffered or being sent; a write still blocked when the writer is
+    closed raises RuntimeError. close() sends what is left and waits for the batches in flight.
+    """
+
+    def __init__(
+        self,
+        service: Service,
+        path: str,
+        bulk_format: BulkFormat = BulkFormat.NDJSON,
+        headers: Tuple[Header, ...] = (),
+        max_records: int = BaseBulkWriter.DEFAULT_MAX_RECORDS,
+        max_bytes: int = BaseBulkWriter.DEFAULT_MAX_BYTES,
+        max_age_in_seconds: float = BaseBulkWriter.DEFAULT_MAX_AGE_IN_SECONDS,
+        max_in_flight: int = BaseBulkWriter.DEFAULT_MAX_IN_FLIGHT,
+        max_buffered_records: int = BaseBulkWriter.DEFAULT_MAX_BUFFERED_RECORDS,
+        max_retries: int = BaseBulkWriter.DEFAULT_MAX_RETRIES,
+        retry_backoff_factor: float = BaseBulkWriter.DEFAULT_RETRY_BACKOFF_FACTOR,
+        json_encoder: Callable[[Any], str] = default_json_encoder,
+    ) -> None:
+        super().__init__(
+            path,
+            bulk_format=bulk_format,
+            headers=headers,
+            max_records=max_records,
+            max_bytes=max_bytes,
+            max_age_in_seconds=max_age_in_seconds,
+            max_in_flight=max_in_flight,
+            max_buffered_records=max_buffered_records,
+            max_retries=max_retries,
+            retry_backoff_factor=retry_backoff_factor,
+            json_encoder=json_encoder,
+        )
+        self._service = service
+        self._condition = threading.Condition()
+        self._executor = futures.ThreadPoolExecutor(
+            max_workers=self._max_in_flight, thread_name_prefix="httptoolkit-bulk"
+        )
+        self._timer = threading.Thread(target=self._flush_aged, name="httptoolkit-bulk-timer", daemon=True)
+        self._timer.start()
+
+    def write(self, record: Any) -> None:
+        data = self._encode(record)
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("the writer is closed")
+            self._condition.wait_for(lambda: self._pending < self._max_buffered_records or self._closed)
+            if self._closed:
+                raise RuntimeError("the writer is closed")
+            if self._needs_flush_before(data):
+                self._submit(self._take_batch())
+            if self._append(data, time.monotonic()):
+                self._submit(self._take_batch())
+            self._condition.notify_all()
+
+    def flush(self) -> None:
+        """
+        Send the buffered records now, without waiting for them.
+        """
+        with self._condition:
+            if self._buffer:
+                self._submit(self._take_batch())
+
+    def close(self) -> BulkWriterStats:
+        with self._condition:
+            if not self._closed:
+                self._closed = True
+                if self._buffer:
+                    self._submit(self._take_batch())
+                self._condition.notify_all()
+        self._timer.join()
+        self._executor.shutdown(wait=True)
+        return self.stats
+
+    def __enter__(self) -> "BulkWriter":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def _submit(self, batch: List[bytes]) -> None:
+        self._executor.submit(self._send, batch)
+
+    def _send(self, batch: List[bytes]) -> None:
+        request = self._build_request(batch)
+        error: Optional[Exception] = None
+        attempt = 0
+        while True:
+            try:
+                self._service.request(request)
+                error = None
+                break
+            except Exception as exc:
+                error = exc
+                if not self._should_retry(exc, attempt):
+                    break
+            time.sleep(self._retry_backoff(attempt))
+            attempt += 1
+            with self._condition:
+                self._retries += 1
+        with self._condition:
+            self._finish_batch(batch, error)
+            self._condition.notify_all()
+
+    def _flush_aged(self) -> None:
+        with self._condition:
+            while not self._closed:
+                if self._buffer_started is None:
+                    self._condition.wait()
+                    continue
+                remaining = self._buffer_started + self._max_age_in_seconds - time.monotonic()
+                if remaining > 0:
+                    self._condition.wait(remaining)
+                    continue
+                self._submit(self._take_batch())
@@ -0,0 +1,19 @@
+from ._entry import CacheEntry
+from ._policy import CachePolicy, parse_cache_control
+from ._disk import DiskCacheStore
+from ._memo import Memoizer, request_fingerprint
+from ._response import CachedOriginalResponse, CachedResponse
+from ._store import BaseCacheStore, MemoryCacheStore
+
+__all__ = [
+    "CacheEntry",
+    "CachePolicy",
+    "CachedOriginalResponse",
+    "CachedResponse",
+    "BaseCacheStore",
+    "MemoryCacheStore",
+    "DiskCacheStore",
+    "Memoizer",
+    "parse_cache_control",
+    "request_fingerprint",
+]
@@ -0,0 +1,258 @@
+import hashlib
+import json
+import mmap
+import os
+import sqlite3
+import struct
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional, Tuple
+from urllib.parse import urlsplit
+
+from httptoolkit.header import Header
+from httptoolkit.http_method import HttpMethod
+from httptoolkit.request import Request
+from httptoolkit.sent_request import SentRequest
+from ._entry import CacheEntry
+from ._store import BaseCacheStore
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (name TEXT PRIMARY KEY, size INTEGER NOT NULL, used_at REAL NOT NULL);
+CREATE INDEX IF NOT EXISTS files_by_use ON files (used_at);
+CREATE TABLE IF NOT EXISTS total (id INTEGER PRIMARY KEY CHECK (id = 0), size INTEGER NOT NULL);
+INSERT OR IGNORE INTO total VALUES (0, 0);
+CREATE TRIGGER IF NOT EXISTS files_inserted AFTER INSERT ON files
+BEGIN UPDATE total SET size = size + new.size; END;
+CREATE TRIGGER IF NOT EXISTS files_deleted AFTER DELETE ON files
+BEGIN UPDATE total SET size = size - old.size; END;
+CREATE TRIGGER IF NOT EXISTS files_resized AFTER UPDATE OF size ON files
+BEGIN UPDATE total SET size = size - old.size + new.size; END;
+"""
+
+
+class DiskCacheStore(BaseCacheStore):
+    """
+    Store keeping one file per entry, so that any number of processes can share a directory.
+
+    A file is a length-prefixed JSON metadata block followed by the body. Files are written to a temporary name
+    and renamed into place, so readers never see a partial entry.
+
+    Bodies are memory-mapped and served as memoryview without being copied. The map of an entry returned by get, and
+    the file descriptor it holds, are released when the entry and the responses built from it are garbage-collected;
+    copy the body, e.g. with bytes(response.content_view), to keep it longer without holding the map.
+
+    The sizes and last uses of the files are indexed in an SQLite database in the directory, shared by all the
+    processes, which also keeps their total. When a write takes it over max_size bytes, the least recently used files
+    are removed until it shrinks below EVICTION_RATIO of the limit. The index is built from the files found in the
+    directory when it is created.
+
+    Sensitive request headers are written in their filtered form only.
+    """
+
+    DEFAULT_MAX_SIZE = 256 * 1024 * 1024
+    EVICTION_RATIO = 0.9
+    FILE_SUFFIX = ".entry"
+    INDEX_FILE_NAME = "index.sqlite"
+    INDEX_TIMEOUT_IN_SECONDS = 30.0
+    _LENGTH = struct.Struct(">I")
+
+    def __init__(self, directory: str, max_size: int = DEFAULT_MAX_SIZE) -> None:
+        self._directory = directory
+        self._max_size = max_size
+        # sqlite connections can't be shared between threads, nor kept across a fork
+        self._local = threading.local()
+        os.makedirs(directory, exist_ok=True)
+        # executescript commits on its own, every statement of the schema can run more than once
+        self._index().executescript(_SCHEMA)
+        with self._transaction() as index:
+            if index.execute("PRAGMA user_version").fetchone()[0] == 0:
+                index.executemany("INSERT OR IGNORE INTO files VALUES (?, ?, ?)", self._scan())
+                index.execute("PRAGMA user_version = 1")
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as file:
+                mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except FileNotFoundError:
+            # evicted by another process, or removed from the directory
+            self._unindex(path)
+            return None
+        except ValueError:
+            return None
+
+        entry = self._load(key, mapped)
+        if entry is None:
+            mapped.close()
+            self.delete(key)
+            return None
+
+        with self._transaction() as index:
+            self._index_file(index, path, len(mapped))
+        return entry
+
+    def set(self, key: str, entry: CacheEntry) -> None:
+        path = self._path(key)
+        data = self._dump(key, entry)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        descriptor, temporary_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(descriptor, "wb") as file:
+                file.write(data)
+                file.write(entry.content)
+            os.replace(temporary_path, path)
+        except OSError:
+            self._remove(temporary_path)
+            return
+
+        with self._transaction() as index:
+            self._index_file(index, path, len(data) + len(entry.content))
+            self._evict(index)
+
+    def delete(self, key: str) -> None:
+        path = self._path(key)
+        self._unindex(path)
+        self._remove(path)
+
+    def evict(self) -> None:
+        """
+        Remove the least recently used files if the directory is over max_size.
+        """
+        with self._transaction() as index:
+            self._evict(index)
+
+    @property
+    def size(self) -> int:
+        """
+        :return: Size of the indexed files in bytes, written by any process.
+        """
+        return self._index().execute("SELECT size FROM total").fetchone()[0]
+
+    def _evict(self, index: sqlite3.Connection) -> None:
+        size = index.execute("SELECT size FROM total").fetchone()[0]
+        if size <= self._max_size:
+            return
+        for name, file_size in index.execute("SELECT name, size FROM files ORDER BY used_at").fetchall():
+            if size <= self._max_size * self.EVICTION_RATIO:
+                break
+            index.execute("DELETE FROM files WHERE name = ?", (name,))
+            self._remove(os.path.join(self._directory, name))
+            size -= file_size
+
+    def _index_file(self, index: sqlite3.Connection, path: str, size: int) -> None:
+        index.execute(
+            "INSERT INTO files VALUES (?, ?, ?) ON CONFLICT (name) DO UPDATE SET size = excluded.size, "
+            "used_at = excluded.used_at",
+            (os.path.relpath(path, self._directory), size, time.time()),
+        )
+
+    def _unindex(self, path: str) -> None:
+        with self._transaction() as index:
+            index.execute("DELETE FROM files WHERE name = ?", (os.path.relpath(path, self._directory),))
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        index = self._index()
+        # taking the write lock at once, so that a reader can't decide on an eviction another process has just made
+        index.execute("BEGIN IMMEDIATE")
+        try:
+            yield index
+        except BaseException:
+            index.execute("ROLLBACK")
+            raise
+        index.execute("COMMIT")
+
+    def _index(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(
+                os.path.join(self._directory, self.INDEX_FILE_NAME),
+                timeout=self.INDEX_TIMEOUT_IN_SECONDS,
+                isolation_level=None,
+            )
+            connection.execute("PRAGMA journal_mode = WAL")
+            connection.execute("PRAGMA synchronous = NORMAL")
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    def _scan(self) -> Iterator[Tuple[str, int, float]]:
+        for directory, _, names in os.walk(self._directory):
+            for name in names:
+                if not name.endswith(self.FILE_SUFFIX):
+                    continue
+                path = os.path.join(directory, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                yield os.path.relpath(path, self._directory), stat.st_size, stat.st_mtime
+
+    def _path(self, key: str) -> str:
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return os.path.join(self._directory, digest[:2], digest + self.FILE_SUFFIX)
+
+    def _dump(self, key: str, entry: CacheEntry) -> bytes:
+        sent_request = entry.sent_request
+        metadata = json.dumps(
+            {
+                "key": key,
+                "request": {
+                    "method": sent_request.method,
+                    "url": sent_request.url,
+                    "headers": list(sent_request.filtered_headers.items()),
+                    "proxies": sent_request.proxies,
+                },
+                "status_code": entry.status_code,
+                "headers": entry.headers,
+                "content_length": len(entry.content),
+                "elapsed": entry.elapsed,
+                "stored_at": entry.stored_at,
+                "expires_at": entry.expires_at,
+                "stale_while_revalidate": entry.stale_while_revalidate,
+                "stale_if_error": entry.stale_if_error,
+            }
+        ).encode("utf-8")
+        return self._LENGTH.pack(len(metadata)) + metadata
+
+    def _load(self, key: str, mapped: mmap.mmap) -> Optional[CacheEntry]:
+        try:
+            (metadata_length,) = self._LENGTH.unpack_from(mapped)
+            body_offset = self._LENGTH.size + metadata_length
+            metadata: Dict[str, Any] = json.loads(mapped[self._LENGTH.size : body_offset])
+            if metadata["key"] != key or len(mapped) - body_offset != metadata["content_length"]:
+                return None
+            return CacheEntry(
+                sent_request=self._restore_sent_request(metadata["request"]),
+                status_code=metadata["status_code"],
+                headers=tuple((name, value) for name, value in metadata["headers"]),
+                content=memoryview(mapped)[body_offset:],
+                elapsed=metadata["elapsed"],
+                stored_at=metadata["stored_at"],
+                expires_at=metadata["expires_at"],
+                stale_while_revalidate=metadata["stale_while_revalidate"],
+                stale_if_error=metadata["stale_if_error"],
+            )
+        except (struct.error, ValueError, KeyError, TypeError):
+            return None
+
+    @staticmethod
+    def _restore_sent_request(metadata: Dict[str, Any]) -> SentRequest:
+        url = urlsplit(metadata["url"])
+        path = f"{url.path}?{url.query}" if url.query else url.path
+        return SentRequest(
+            request=Request(method=HttpMethod(metadata["method"]), path=path, params=None),
+            base_url=f"{url.scheme}://{url.netloc}",
+            body=None,
+            proxies=metadata["proxies"],
+            headers=tuple(Header(name=name, value=value, is_sensitive=False) for name, value in metadata["headers"]),
+        )
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
@@ -0,0 +1,47 @@
+from dataclasses import dataclass
+from typing import Optional, Tuple, Union
+
+from httptoolkit.sent_request import SentRequest
+
+
+@dataclass(frozen=True)
+class CacheEntry:
+    """
+    Stored response together with the moments it stops being fresh or usable.
+
+    All moments are unix timestamps, so entries stay comparable between processes.
+    The content is a memoryview when the store maps bodies from disk.
+    """
+
+    sent_request: SentRequest
+    status_code: int
+    headers: Tuple[Tuple[str, str], ...]
+    content: Union[bytes, memoryview]
+    elapsed: float
+    stored_at: float
+    expires_at: float
+    stale_while_revalidate: float = 0
+    stale_if_error: float = 0
+
+    def is_fresh(self, now: float) -> bool:
+        return now < self.expires_at
+
+    def is_usable_while_revalidating(self, now: float) -> bool:
+        return now < self.expires_at + self.stale_while_revalidate
+
+    def is_usable_on_error(self, now: float) -> bool:
+        return now < self.expires_at + self.stale_if_error
+
+    @property
+    def etag(self) -> Optional[str]:
+        return self._header("etag")
+
+    @property
+    def last_modified(self) -> Optional[str]:
+        return self._header("last-modified")
+
+    def _header(self, name: str) -> Optional[str]:
+        for header_name, value in self.headers:
+            if header_name.lower() == name:
+                return value
+        return None
@@ -0,0 +1,103 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Iterable, Optional, Tuple
+from urllib.parse import urlencode
+
+from httptoolkit.encoder import default_json_encoder
+from httptoolkit.request import Request
+from httptoolkit.response import Response
+
+
+def request_fingerprint(
+    request: Request,
+    headers: Iterable[str] = (),
+    json_encoder: Callable[[Any], str] = default_json_encoder,
+) -> str:
+    """
+    Canonical fingerprint of a request: method, path, sorted params, a hash of the body or json and the values of
+    the chosen headers.
+
+    JSON is encoded through Request.encode_json, so a transport with the same encoder does not encode it again.
+    """
+    if request.files is not None:
+        raise RuntimeError("requests with files can't be fingerprinted")
+
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(request.method.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(request.path.encode("utf-8"))
+    digest.update(b"\0")
+    if request.params:
+        digest.update(urlencode(sorted(request.params.items())).encode("utf-8"))
+    digest.update(b"\0")
+
+    if request.json is not None:
+        digest.update(b"json:")
+        digest.update(request.encode_json(json_encoder).encode("utf-8"))
+    elif request.body is not None:
+        digest.update(b"body:")
+        body = request.body
+        digest.update(body.encode("utf-8") if isinstance(body, str) else body)
+    digest.update(b"\0")
+
+    names = tuple(name.lower() for name in headers)
+    if names:
+        values = {header.name.lower(): header.value for header in request.headers}
+        for name in names:
+            digest.update(f"{name}: {values.get(name, '')}\n".encode("utf-8"))
+
+    return digest.hexdigest()
+
+
+class Memoizer:
+    """
+    Application-level memo of successful responses keyed by request_fingerprint, for upstreams that send no
+    cache headers. Entries live for ttl seconds; the least recently used are evicted over max_entries.
+    """
+
+    DEFAULT_MAX_ENTRIES = 1024
+
+    def __init__(
+        self,
+        ttl: float,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        headers: Iterable[str] = (),
+        json_encoder: Callable[[Any], str] = default_json_encoder,
+    ) -> None:
+        self._ttl = ttl
+        self._max_entries = max_entries
+        self._headers = tuple(headers)
+        self._json_encoder = json_encoder
+        self._entries: "OrderedDict[str, Tuple[float, Response]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def fingerprint(self, request: Request) -> str:
+        return request_fingerprint(request, headers=self._headers, json_encoder=self._json_encoder)
+
+    def get(self, key: str) -> Optional[Response]:
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            expires_at, response = item
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return response
+
+    def set(self, key: str, response: Response) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self._ttl, response)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
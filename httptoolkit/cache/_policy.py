@@ -0,0 +1,197 @@
+import hashlib
+import re
+from dataclasses import replace
+from email.utils import parsedate_to_datetime
+from typing import Dict, FrozenSet, Iterable, MutableMapping, Optional
+
+from httpx import Headers
+
+from httptoolkit.encoder import default_json_encoder
+from httptoolkit.request import Request
+from httptoolkit.response import Response
+from httptoolkit.sent_request import SentRequest
+from ._entry import CacheEntry
+
+
+def parse_cache_control(value: str) -> Dict[str, Optional[str]]:
+    directives: Dict[str, Optional[str]] = {}
+    for directive in value.split(","):
+        name, separator, argument = directive.strip().partition("=")
+        if name:
+            directives[name.lower()] = argument.strip('"') if separator else None
+    return directives
+
+
+class CachePolicy:
+    """
+    Decides which requests are served from cache and for how long responses stay usable.
+
+    Freshness follows the response Cache-Control max-age or Expires headers and falls back to default_ttl.
+    stale_while_revalidate and stale_if_error are the RFC 5861 windows after expiration; the directives of the
+    same name in a response override them.
+
+    When negative_ttl is set, responses with negative_status_codes are kept for it unless their headers give
+    a lifetime, so repeated lookups of missing entities raise the same HttpError without touching the network.
+    """
+
+    DEFAULT_METHODS = frozenset(["GET"])
+    DEFAULT_STATUS_CODES = frozenset([200, 203, 204])
+    DEFAULT_NEGATIVE_STATUS_CODES = frozenset([404, 410])
+
+    def __init__(
+        self,
+        default_ttl: float = 0,
+        stale_while_revalidate: float = 0,
+        stale_if_error: float = 0,
+        methods: Iterable[str] = DEFAULT_METHODS,
+        status_codes: Iterable[int] = DEFAULT_STATUS_CODES,
+        key_headers: Iterable[str] = (),
+        negative_ttl: float = 0,
+        negative_status_codes: Iterable[int] = DEFAULT_NEGATIVE_STATUS_CODES,
+    ) -> None:
+        self._default_ttl = default_ttl
+        self._stale_while_revalidate = stale_while_revalidate
+        self._stale_if_error = stale_if_error
+        self._methods: FrozenSet[str] = frozenset(method.upper() for method in methods)
+        self._status_codes: FrozenSet[int] = frozenset(status_codes)
+        self._key_headers = tuple(name.lower() for name in key_headers)
+        self._negative_ttl = negative_ttl
+        self._negative_status_codes: FrozenSet[int] = frozenset(negative_status_codes)
+
+    def is_cacheable_request(self, request: Request) -> bool:
+        return request.method in self._methods and request.files is None
+
+    def key(self, request: Request) -> str:
+        """
+        :return: The method, path and key headers of the request, and a hash of its body or json when it has one, so
+                 that requests of a method with a body, such as POST in methods, don't share an entry.
+        """
+        parts = [f"{request.method} {request.full_path}"]
+        body_digest = self._body_digest(request)
+        if body_digest is not None:
+            parts.append(f"body: {body_digest}")
+        if self._key_headers:
+            values = {header.name.lower(): header.value for header in request.headers}
+            parts.extend(f"{name}: {values.get(name, '')}" for name in self._key_headers)
+        return "\n".join(parts)
+
+    @staticmethod
+    def _body_digest(request: Request) -> Optional[str]:
+        if request.json is not None:
+            digest = hashlib.blake2b(b"json:", digest_size=16)
+            digest.update(request.encode_json(default_json_encoder).encode("utf-8"))
+        elif request.body is not None:
+            digest = hashlib.blake2b(b"body:", digest_size=16)
+            body = request.body
+            digest.update(body.encode("utf-8") if isinstance(body, str) else body)
+        else:
+            return None
+        return digest.hexdigest()
+
+    def build_entry(self, sent_request: SentRequest, response: Response, now: float) -> Optional[CacheEntry]:
+        if response.status_code in self._negative_status_codes:
+            return self._build_negative_entry(sent_request, response, now)
+        if response.status_code not in self._status_codes:
+            return None
+
+        directives = parse_cache_control(response.headers.get("cache-control", ""))
+        if "no-store" in directives:
+            return None
+
+        entry = CacheEntry(
+            sent_request=sent_request,
+            status_code=response.status_code,
+            headers=tuple(response.headers.items()),
+            content=response.content,
+            elapsed=response.elapsed.total_seconds(),
+            stored_at=now,
+            expires_at=now + self._freshness_lifetime(directives, response.headers, now, self._default_ttl),
+            stale_while_revalidate=self._seconds(directives, "stale-while-revalidate", self._stale_while_revalidate),
+            stale_if_error=self._seconds(directives, "stale-if-error", self._stale_if_error),
+        )
+        if self._is_worth_storing(entry, now):
+            return entry
+        return None
+
+    def _build_negative_entry(self, sent_request: SentRequest, response: Response, now: float) -> Optional[CacheEntry]:
+        directives = parse_cache_control(response.headers.get("cache-control", ""))
+        if self._negative_ttl <= 0 or "no-store" in directives:
+            return None
+
+        lifetime = self._freshness_lifetime(directives, response.headers, now, self._negative_ttl)
+        if lifetime <= 0:
+            return None
+        return CacheEntry(
+            sent_request=sent_request,
+            status_code=response.status_code,
+            headers=tuple(response.headers.items()),
+            content=response.content,
+            elapsed=response.elapsed.total_seconds(),
+            stored_at=now,
+            expires_at=now + lifetime,
+        )
+
+    def revalidate(self, entry: CacheEntry, not_modified: Response, now: float) -> CacheEntry:
+        """
+        Refresh a stored entry with the headers of a 304 Not Modified response.
+        """
+        headers = Headers(list(entry.headers))
+        headers.update(not_modified.headers)
+        directives = parse_cache_control(headers.get("cache-control", ""))
+        return replace(
+            entry,
+            headers=tuple(headers.items()),
+            stored_at=now,
+            expires_at=now + self._freshness_lifetime(directives, headers, now, self._default_ttl),
+            stale_while_revalidate=self._seconds(directives, "stale-while-revalidate", self._stale_while_revalidate),
+            stale_if_error=self._seconds(directives, "stale-if-error", self._stale_if_error),
+        )
+
+    @staticmethod
+    def _is_worth_storing(entry: CacheEntry, now: float) -> bool:
+        return (
+            entry.is_fresh(now)
+            or entry.stale_while_revalidate > 0
+            or entry.stale_if_error > 0
+            or entry.etag is not None
+            or entry.last_modified is not None
+        )
+
+    def _freshness_lifetime(
+        self,
+        directives: Dict[str, Optional[str]],
+        headers: MutableMapping[str, str],
+        now: float,
+        default_ttl: float,
+    ) -> float:
+        if "no-cache" in directives:
+            return 0
+        max_age = directives.get("max-age")
+        if max_age is not None and re.match(r"^\d+$", max_age):
+            return max(0, int(max_age) - self._age(headers))
+        expires = self._http_date(headers.get("expires", ""))
+        if expires is not None:
+            date = self._http_date(headers.get("date", ""))
+            return max(0, expires - (date if date is not None else now))
+        return default_ttl
+
+    @staticmethod
+    def _seconds(directives: Dict[str, Optional[str]], name: str, default: float) -> float:
+        value = directives.get(name)
+        if value is not None and re.match(r"^\d+$", value):
+            return int(value)
+        return default
+
+    @staticmethod
+    def _age(headers: MutableMapping[str, str]) -> int:
+        age = headers.get("age", "")
+        return int(age) if re.match(r"^\d+$", age) else 0
+
+    @staticmethod
+    def _http_date(value: str) -> Optional[float]:
+        if not value:
+            return None
+        try:
+            return parsedate_to_datetime(value).timestamp()
+        except (TypeError, ValueError, IndexError):
+            return None
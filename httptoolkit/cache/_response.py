@@ -0,0 +1,148 @@
+import codecs
+import json
+from datetime import timedelta
+from typing import Any, AsyncIterator, Callable, Iterator, MutableMapping, Optional
+
+from httpx import Headers, codes
+
+from httptoolkit.response import Response
+from ._entry import CacheEntry
+
+
+class CachedOriginalResponse:
+    """
+    OriginalResponse implementation served from a CacheEntry instead of the network.
+    """
+
+    DEFAULT_ENCODING = "utf-8"
+
+    def __init__(self, entry: CacheEntry) -> None:
+        self._entry = entry
+        self._headers = Headers(list(entry.headers))
+        self._content: Optional[bytes] = None
+
+    @property
+    def is_success(self) -> bool:
+        return codes.is_success(self._entry.status_code)
+
+    @property
+    def status_code(self) -> int:
+        return self._entry.status_code
+
+    @property
+    def reason_phrase(self) -> str:
+        return codes.get_reason_phrase(self._entry.status_code)
+
+    @property
+    def headers(self) -> MutableMapping[str, str]:
+        return self._headers
+
+    @property
+    def elapsed(self) -> timedelta:
+        return timedelta(seconds=self._entry.elapsed)
+
+    @property
+    def content(self) -> bytes:
+        if self._content is None:
+            content = self._entry.content
+            self._content = content if isinstance(content, bytes) else bytes(content)
+        return self._content
+
+    @property
+    def content_view(self) -> memoryview:
+        return memoryview(self._entry.content)
+
+    @property
+    def text(self) -> str:
+        return str(self.content_view, self._encoding, "replace")
+
+    def json(
+        self,
+        object_hook: Optional[Callable] = None,
+        parse_float: Optional[Callable] = None,
+        parse_int: Optional[Callable] = None,
+        parse_constant: Optional[Callable] = None,
+        object_pairs_hook: Optional[Callable] = None,
+    ) -> Any:
+        return json.loads(
+            self.text,
+            object_hook=object_hook,
+            parse_float=parse_float,
+            parse_int=parse_int,
+            parse_constant=parse_constant,
+            object_pairs_hook=object_pairs_hook,
+        )
+
+    def iter_bytes(self, chunk_size: Optional[int] = None) -> Iterator[bytes]:
+        content = self.content_view
+        if not content:
+            return
+        chunk_size = chunk_size or len(content)
+        for start in range(0, len(content), chunk_size):
+            yield bytes(content[start : start + chunk_size])
+
+    def iter_text(self, chunk_size: Optional[int] = None) -> Iterator[str]:
+        text = self.text
+        if not text:
+            return
+        chunk_size = chunk_size or len(text)
+        for start in range(0, len(text), chunk_size):
+            yield text[start : start + chunk_size]
+
+    def iter_lines(self) -> Iterator[str]:
+        yield from self.text.splitlines()
+
+    def iter_raw(self, chunk_size: Optional[int] = None) -> Iterator[bytes]:
+        return self.iter_bytes(chunk_size)
+
+    def read(self) -> bytes:
+        return self.content
+
+    async def aiter_bytes(self, chunk_size: Optional[int] = None) -> AsyncIterator[bytes]:
+        for chunk in self.iter_bytes(chunk_size):
+            yield chunk
+
+    async def aiter_text(self, chunk_size: Optional[int] = None) -> AsyncIterator[str]:
+        for chunk in self.iter_text(chunk_size):
+            yield chunk
+
+    async def aiter_lines(self) -> AsyncIterator[str]:
+        for line in self.iter_lines():
+            yield line
+
+    async def aiter_raw(self, chunk_size: Optional[int] = None) -> AsyncIterator[bytes]:
+        for chunk in self.iter_bytes(chunk_size):
+            yield chunk
+
+    async def aread(self) -> bytes:
+        return self.content
+
+    @property
+    def _encoding(self) -> str:
+        content_type = self._headers.get("content-type", "")
+        for parameter in content_type.split(";")[1:]:
+            name, _, value = parameter.strip().partition("=")
+            if name.lower() == "charset" and value:
+                try:
+                    return codecs.lookup(value.strip("\"'")).name
+                except LookupError:
+                    break
+        return self.DEFAULT_ENCODING
+
+
+class CachedResponse(Response):
+    """
+    Response served from a cache store.
+    """
+
+    _response: CachedOriginalResponse
+
+    def __init__(self, response: CachedOriginalResponse) -> None:
+        super().__init__(response)
+
+    @property
+    def content_view(self) -> memoryview:
+        """
+        :return: The body without copying it, backed by a memory map for entries of DiskCacheStore.
+        """
+        return self._response.content_view
@@ -0,0 +1,54 @@
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Optional
+
+from ._entry import CacheEntry
+
+
+class BaseCacheStore(ABC):
+    @abstractmethod
+    def get(self, key: str) -> Optional[CacheEntry]:  # pragma: no cover
+        pass
+
+    @abstractmethod
+    def set(self, key: str, entry: CacheEntry) -> None:  # pragma: no cover
+        pass
+
+    @abstractmethod
+    def delete(self, key: str) -> None:  # pragma: no cover
+        pass
+
+
+class MemoryCacheStore(BaseCacheStore):
+    """
+    Thread-safe in-process store that evicts the least recently used entries.
+    """
+
+    DEFAULT_MAX_ENTRIES = 1024
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES) -> None:
+        self._max_entries = max_entries
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, entry: CacheEntry) -> None:
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
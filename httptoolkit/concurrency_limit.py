@@ -0,0 +1,297 @@
+import asyncio
+import math
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Deque, FrozenSet, Optional
+
+
+class LimitAlgorithm(ABC):
+    """
+    Computes the concurrency limit from the outcome of every request.
+
+    An algorithm may keep state between updates, so an instance belongs to one ConcurrencyLimiter.
+    """
+
+    def __init__(self, initial_limit: int, min_limit: int, max_limit: int) -> None:
+        if not 1 <= min_limit <= initial_limit <= max_limit:
+            raise RuntimeError("the limits must satisfy 1 <= min_limit <= initial_limit <= max_limit")
+        self.initial_limit = initial_limit
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+
+    @abstractmethod
+    def update(self, limit: float, rtt: float, in_flight: int, dropped: bool) -> float:  # pragma: no cover
+        """
+        :param rtt: Seconds from sending the request to its response, or to its failure.
+        :param in_flight: Requests in flight when the request was sent, itself included.
+        :param dropped: Whether the request failed or the upstream answered that it is overloaded.
+        :return: The new limit.
+        """
+
+    def _clamp(self, limit: float) -> float:
+        return max(self.min_limit, min(self.max_limit, limit))
+
+
+class AimdLimit(LimitAlgorithm):
+    """
+    Additive increase, multiplicative decrease: the limit grows by one after a success while at least half of it is in
+    use, and is multiplied by backoff_ratio after a drop or a response slower than timeout_in_seconds.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = 20,
+        min_limit: int = 1,
+        max_limit: int = 200,
+        backoff_ratio: float = 0.9,
+        timeout_in_seconds: Optional[float] = None,
+    ) -> None:
+        super().__init__(initial_limit, min_limit, max_limit)
+        if not 0 < backoff_ratio < 1:
+            raise RuntimeError("backoff_ratio must be between 0 and 1")
+        self._backoff_ratio = backoff_ratio
+        self._timeout_in_seconds = timeout_in_seconds
+
+    def update(self, limit: float, rtt: float, in_flight: int, dropped: bool) -> float:
+        if dropped or (self._timeout_in_seconds is not None and rtt > self._timeout_in_seconds):
+            return self._clamp(limit * self._backoff_ratio)
+        if in_flight * 2 >= limit:
+            return self._clamp(limit + 1)
+        return limit
+
+
+class GradientLimit(LimitAlgorithm):
+    """
+    Follows the ratio of a long-term average latency to the latest one: the limit shrinks when the latency grows above
+    tolerance times its average, and grows by sqrt(limit) while it does not. A drop halves the gradient.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = 20,
+        min_limit: int = 1,
+        max_limit: int = 200,
+        smoothing: float = 0.2,
+        tolerance: float = 1.5,
+        long_window: int = 600,
+    ) -> None:
+        """
+        :param smoothing: Weight of the new limit against the current one.
+        :param long_window: Number of requests the long-term average latency is taken over.
+        """
+        super().__init__(initial_limit, min_limit, max_limit)
+        self._smoothing = smoothing
+        self._tolerance = tolerance
+        self._long_factor = 2 / (long_window + 1)
+        self._long_rtt: Optional[float] = None
+
+    def update(self, limit: float, rtt: float, in_flight: int, dropped: bool) -> float:
+        rtt = max(rtt, 1e-6)
+        if self._long_rtt is None:
+            self._long_rtt = rtt
+        else:
+            self._long_rtt += (rtt - self._long_rtt) * self._long_factor
+        if self._long_rtt / rtt > 2:
+            # the latency has dropped for good: let the average catch up instead of growing the limit for long
+            self._long_rtt *= 0.95
+
+        if dropped:
+            gradient = 0.5
+        elif in_flight * 2 < limit:
+            # the limit is not what holds the requests back, so their latency says nothing about it
+            return limit
+        else:
+            gradient = max(0.5, min(1.0, self._tolerance * self._long_rtt / rtt))
+        new_limit = limit * gradient + math.sqrt(limit)
+        return self._clamp(limit * (1 - self._smoothing) + new_limit * self._smoothing)
+
+
+@dataclass(frozen=True)
+class ConcurrencyLimitStats:
+    limit: int
+    in_flight: int
+    queued: int
+    """Requests waiting for a slot."""
+    rejected: int
+    """Requests rejected since the limiter was made, because the queue was full or the wait timed out."""
+
+
+class Permit:
+    """
+    Slot of a request in a ConcurrencyLimiter, held until released.
+    """
+
+    def __init__(self, limiter: "ConcurrencyLimiter", in_flight: int) -> None:
+        self._limiter = limiter
+        self._started = time.perf_counter()
+        self.in_flight = in_flight
+        self.rtt: Optional[float] = None
+        self.dropped = False
+        self._released = False
+
+    def observe(self, status_code: int) -> None:
+        """
+        Record the response, as soon as its headers are received.
+        """
+        if self.rtt is None:
+            self.rtt = time.perf_counter() - self._started
+            self.dropped = status_code in self._limiter.drop_status_codes
+
+    def release(self, failed: bool = False) -> None:
+        """
+        :param failed: Whether the request raised; an error after the response was observed is not a drop.
+        """
+        if self._released:
+            return
+        self._released = True
+        if self.rtt is None:
+            self.rtt = time.perf_counter() - self._started
+            self.dropped = failed
+        self._limiter._release(self, update=True)
+
+    def ignore(self) -> None:
+        """
+        Release the slot without updating the limit, e.g. for a cancelled request.
+        """
+        if not self._released:
+            self._released = True
+            self._limiter._release(self, update=False)
+
+
+class _Waiter:
+    def __init__(self, wake: Callable[[], object]) -> None:
+        self.wake = wake
+        self.permit: Optional[Permit] = None
+
+
+class ConcurrencyLimiter:
+    """
+    Limits the requests in flight to a limit that a LimitAlgorithm adjusts from their latency and drops.
+
+    Requests above the limit wait in a FIFO queue of at most max_queue_size for queue_timeout_in_seconds, and are
+    rejected when it is full or the wait times out. Waiting is blocking for sync transports and awaitable for async
+    ones; a limiter can be shared by both.
+    """
+
+    DEFAULT_MAX_QUEUE_SIZE = 100
+    DEFAULT_QUEUE_TIMEOUT_IN_SECONDS = 1.0
+    DEFAULT_DROP_STATUS_CODES = frozenset({429, 503})
+
+    def __init__(
+        self,
+        algorithm: Optional[LimitAlgorithm] = None,
+        max_queue_size: int = DEFAULT_MAX_QUEUE_SIZE,
+        queue_timeout_in_seconds: Optional[float] = DEFAULT_QUEUE_TIMEOUT_IN_SECONDS,
+        drop_status_codes: FrozenSet[int] = DEFAULT_DROP_STATUS_CODES,
+    ) -> None:
+        """
+        :param max_queue_size: 0 rejects the requests above the limit at once.
+        :param queue_timeout_in_seconds: None waits for as long as it takes.
+        :param drop_status_codes: Response statuses that count as drops, as the upstream is overloaded.
+        """
+        self._algorithm = algorithm if algorithm is not None else AimdLimit()
+        self._max_queue_size = max_queue_size
+        self._queue_timeout_in_seconds = queue_timeout_in_seconds
+        self.drop_status_codes = drop_status_codes
+        self._limit = float(self._algorithm.initial_limit)
+        self._in_flight = 0
+        self._rejected = 0
+        self._waiters: Deque[_Waiter] = deque()
+        self._lock = threading.Lock()
+
+    @property
+    def limit(self) -> int:
+        return max(1, int(self._limit))
+
+    @property
+    def stats(self) -> ConcurrencyLimitStats:
+        with self._lock:
+            return ConcurrencyLimitStats(
+                limit=self.limit, in_flight=self._in_flight, queued=len(self._waiters), rejected=self._rejected
+            )
+
+    def acquire(self) -> Optional[Permit]:
+        """
+        Block until the request gets a slot.
+
+        :return: None if the request is rejected.
+        """
+        event = threading.Event()
+        with self._lock:
+            if self._in_flight < self.limit and not self._waiters:
+                return self._grant()
+            waiter = self._enqueue(event.set)
+            if waiter is None:
+                return None
+        event.wait(self._queue_timeout_in_seconds)
+        return self._resolve(waiter)
+
+    async def acquire_async(self) -> Optional[Permit]:
+        """
+        Wait until the request gets a slot.
+
+        :return: None if the request is rejected.
+        """
+        loop = asyncio.get_running_loop()
+        future: "asyncio.Future[None]" = loop.create_future()
+        with self._lock:
+            if self._in_flight < self.limit and not self._waiters:
+                return self._grant()
+            waiter = self._enqueue(lambda: loop.call_soon_threadsafe(_set_done, future))
+            if waiter is None:
+                return None
+        try:
+            await asyncio.wait_for(future, self._queue_timeout_in_seconds)
+        except asyncio.TimeoutError:
+            pass
+        except BaseException:
+            permit = self._resolve(waiter, rejected=False)
+            if permit is not None:
+                permit.ignore()
+            raise
+        return self._resolve(waiter)
+
+    def _grant(self) -> Permit:
+        self._in_flight += 1
+        return Permit(self, self._in_flight)
+
+    def _enqueue(self, wake: Callable[[], object]) -> Optional[_Waiter]:
+        if len(self._waiters) >= self._max_queue_size:
+            self._rejected += 1
+            return None
+        waiter = _Waiter(wake)
+        self._waiters.append(waiter)
+        return waiter
+
+    def _resolve(self, waiter: _Waiter, rejected: bool = True) -> Optional[Permit]:
+        """
+        :return: The permit the waiter was given, None after removing it from the queue if it was given none.
+        """
+        with self._lock:
+            if waiter.permit is not None:
+                return waiter.permit
+            self._waiters.remove(waiter)
+            if rejected:
+                self._rejected += 1
+            return None
+
+    def _release(self, permit: Permit, update: bool) -> None:
+        woken = []
+        with self._lock:
+            self._in_flight -= 1
+            if update and permit.rtt is not None:
+                self._limit = self._algorithm.update(self._limit, permit.rtt, permit.in_flight, permit.dropped)
+            while self._waiters and self._in_flight < self.limit:
+                waiter = self._waiters.popleft()
+                waiter.permit = self._grant()
+                woken.append(waiter)
+        for waiter in woken:
+            waiter.wake()
+
+
+def _set_done(future: "asyncio.Future[None]") -> None:
+    if not future.done():
+        future.set_result(None)
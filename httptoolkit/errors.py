@@ -13,16 +13,20 @@ class Error(Exception):
 
 
 class TransportError(Error):
-    def __init__(self, request) -> None:
+    def __init__(self, request, history=()) -> None:
         self.request = request
+        self.history = history
 
 
 class ServiceError(Error):
     MESSAGE_DELIMITER = "\n"
+    HISTORY_IN_MESSAGE = 5
+    """How many of the last records of the history the message shows."""
 
-    def __init__(self, request, response=None):
+    def __init__(self, request, response=None, history=()):
         self._request = request
         self._response = response
+        self._history = history
 
     def __str__(self):
         description = self._description()
@@ -33,10 +37,21 @@ class ServiceError(Error):
 
         return description
 
+    @property
+    def request(self):
+        return self._request
+
     @property
     def response(self):
         return self._response
 
+    @property
+    def history(self):
+        """
+        :return: Records of the last requests of the transport, oldest first, if it keeps a RequestHistory.
+        """
+        return self._history
+
     def response_code(self) -> Optional[int]:
         if self._response is not None:
             return self._response.status_code
@@ -48,7 +63,9 @@ class ServiceError(Error):
         return None
 
     def _description(self):
-        return self._concatenate(self._request_description(), self._response_description())
+        return self._concatenate(
+            self._request_description(), self._response_description(), self._history_description()
+        )
 
     def _request_description(self):
         return self._concatenate(
@@ -65,6 +82,14 @@ class ServiceError(Error):
                 "Response body: {}".format(self.response_body()),
             )
 
+    def _history_description(self):
+        if self._history:
+            shown = self._history[-self.HISTORY_IN_MESSAGE :]
+            return self._concatenate(
+                "Recent requests (last {} of {}):".format(len(shown), len(self._history)),
+                *(str(record) for record in shown),
+            )
+
     def __getstate__(self):
         contexts = [self.__cause__ or self.__context__]
         while contexts[len(contexts) - 1]:
@@ -82,15 +107,42 @@ class ServiceError(Error):
             context.__context__ = contexts[i]
 
     def __reduce__(self):
-        return (self.__class__, (self._request, self._response), self.__getstate__())
+        return (self.__class__, (self._request, self._response, self._history), self.__getstate__())
 
     def _concatenate(self, *strings):
         return self.MESSAGE_DELIMITER.join(filter(None, strings))
 
 
 class HttpError(ServiceError):
-    def __init__(self, request, response):
-        super().__init__(request, response)
+    def __init__(self, request, response, history=()):
+        super().__init__(request, response, history)
+
+
+class RequestRejectedError(ServiceError):
+    """
+    The transport rejected the request without sending it.
+    """
+
+    def _description(self):
+        return self._concatenate("{}: the request was not sent".format(type(self).__name__), super()._description())
+
+
+class ConcurrencyLimitError(RequestRejectedError):
+    """
+    The concurrency limiter of the transport had no slot for the request within its queue timeout.
+    """
+
+
+class RateLimitError(RequestRejectedError):
+    """
+    The rate limiter of the transport would have delayed the request longer than its max_wait_in_seconds.
+    """
+
+
+class ThrottledError(RequestRejectedError):
+    """
+    The adaptive throttle of the transport rejected the request, as the upstream accepts too few of them.
+    """
 
 
 class HttpErrorTypecast:
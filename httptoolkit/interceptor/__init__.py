@@ -0,0 +1,11 @@
+from ._sync import Interceptor, compile_send, compile_stream
+from ._async import AsyncInterceptor, compile_async_send, compile_async_stream
+
+__all__ = [
+    "Interceptor",
+    "AsyncInterceptor",
+    "compile_send",
+    "compile_stream",
+    "compile_async_send",
+    "compile_async_stream",
+]
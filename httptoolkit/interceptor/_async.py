@@ -0,0 +1,51 @@
+from contextlib import asynccontextmanager
+from functools import partial
+from typing import AsyncContextManager, AsyncIterator, Awaitable, Callable, Sequence, Tuple
+
+from httptoolkit.request import Request
+from httptoolkit.response import AsyncStreamResponse, Response
+from httptoolkit.sent_request import SentRequest
+
+AsyncSendHandler = Callable[[Request], Awaitable[Tuple[SentRequest, Response]]]
+AsyncStreamHandler = Callable[[Request], AsyncContextManager[Tuple[SentRequest, AsyncStreamResponse]]]
+
+
+class AsyncInterceptor:
+    """
+    Wraps transport.send and transport.stream of an async service; override either or both.
+
+    call_next sends the request through the rest of the chain. The response is not validated yet, so an interceptor
+    sees error statuses and may e.g. refresh a token and call call_next again.
+    """
+
+    async def send(self, request: Request, call_next: AsyncSendHandler) -> Tuple[SentRequest, Response]:
+        return await call_next(request)
+
+    @asynccontextmanager
+    async def stream(
+        self,
+        request: Request,
+        call_next: AsyncStreamHandler,
+    ) -> AsyncIterator[Tuple[SentRequest, AsyncStreamResponse]]:
+        async with call_next(request) as result:
+            yield result
+
+
+def compile_async_send(interceptors: Sequence[AsyncInterceptor], send: AsyncSendHandler) -> AsyncSendHandler:
+    """
+    :return: send wrapped by the interceptors that override it, the first one outermost; send itself if none does.
+    """
+    for interceptor in reversed(interceptors):
+        if type(interceptor).send is not AsyncInterceptor.send:
+            send = partial(interceptor.send, call_next=send)
+    return send
+
+
+def compile_async_stream(interceptors: Sequence[AsyncInterceptor], stream: AsyncStreamHandler) -> AsyncStreamHandler:
+    """
+    :return: stream wrapped by the interceptors that override it, the first one outermost; stream itself if none does.
+    """
+    for interceptor in reversed(interceptors):
+        if type(interceptor).stream is not AsyncInterceptor.stream:
+            stream = partial(interceptor.stream, call_next=stream)
+    return stream
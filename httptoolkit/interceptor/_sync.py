@@ -0,0 +1,47 @@
+from contextlib import contextmanager
+from functools import partial
+from typing import Callable, ContextManager, Iterator, Sequence, Tuple
+
+from httptoolkit.request import Request
+from httptoolkit.response import Response, StreamResponse
+from httptoolkit.sent_request import SentRequest
+
+SendHandler = Callable[[Request], Tuple[SentRequest, Response]]
+StreamHandler = Callable[[Request], ContextManager[Tuple[SentRequest, StreamResponse]]]
+
+
+class Interceptor:
+    """
+    Wraps transport.send and transport.stream of a service; override either or both.
+
+    call_next sends the request through the rest of the chain. The response is not validated yet, so an interceptor
+    sees error statuses and may e.g. refresh a token and call call_next again.
+    """
+
+    def send(self, request: Request, call_next: SendHandler) -> Tuple[SentRequest, Response]:
+        return call_next(request)
+
+    @contextmanager
+    def stream(self, request: Request, call_next: StreamHandler) -> Iterator[Tuple[SentRequest, StreamResponse]]:
+        with call_next(request) as result:
+            yield result
+
+
+def compile_send(interceptors: Sequence[Interceptor], send: SendHandler) -> SendHandler:
+    """
+    :return: send wrapped by the interceptors that override it, the first one outermost; send itself if none does.
+    """
+    for interceptor in reversed(interceptors):
+        if type(interceptor).send is not Interceptor.send:
+            send = partial(interceptor.send, call_next=send)
+    return send
+
+
+def compile_stream(interceptors: Sequence[Interceptor], stream: StreamHandler) -> StreamHandler:
+    """
+    :return: stream wrapped by the interceptors that override it, the first one outermost; stream itself if none does.
+    """
+    for interceptor in reversed(interceptors):
+        if type(interceptor).stream is not Interceptor.stream:
+            stream = partial(interceptor.stream, call_next=stream)
+    return stream
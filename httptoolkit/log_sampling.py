@@ -0,0 +1,143 @@
+import itertools
+import logging
+import random
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, List, Mapping, Optional
+
+from httptoolkit.sent_request import SentRequest
+
+
+class LogSampler(ABC):
+    """
+    Decides which request log records of a transport are emitted.
+
+    A record that is sampled out is still emitted if its request fails, gets a response without a 2xx status or
+    takes at least slow_request_threshold_in_seconds. The number of suppressed records is logged to the transport
+    logger once per report_interval_in_seconds. A sampler may be shared by several transports; its state is kept per
+    logger.
+    """
+
+    DEFAULT_REPORT_INTERVAL_IN_SECONDS = 60.0
+
+    def __init__(
+        self,
+        slow_request_threshold_in_seconds: Optional[float] = None,
+        report_interval_in_seconds: float = DEFAULT_REPORT_INTERVAL_IN_SECONDS,
+    ) -> None:
+        self._slow_request_threshold_in_seconds = slow_request_threshold_in_seconds
+        self._report_interval_in_seconds = report_interval_in_seconds
+        self._lock = threading.Lock()
+        self._suppressed: Dict[str, int] = {}
+        self._reported_at: Dict[str, float] = {}
+
+    def sample(self, logger: logging.Logger, request: SentRequest) -> bool:
+        """
+        :return: True if the record of the request should be emitted now.
+        """
+        self._report_suppressed(logger)
+        return self._sample(logger, request)
+
+    def is_slow(self, elapsed: float) -> bool:
+        return (
+            self._slow_request_threshold_in_seconds is not None and elapsed >= self._slow_request_threshold_in_seconds
+        )
+
+    def suppress(self, logger: logging.Logger) -> None:
+        with self._lock:
+            self._suppressed[logger.name] = self._suppressed.get(logger.name, 0) + 1
+
+    @abstractmethod
+    def _sample(self, logger: logging.Logger, request: SentRequest) -> bool:  # pragma: no cover
+        pass
+
+    def _report_suppressed(self, logger: logging.Logger) -> None:
+        now = time.monotonic()
+        reported_at = self._reported_at.setdefault(logger.name, now)
+        if now - reported_at < self._report_interval_in_seconds:
+            return
+        with self._lock:
+            suppressed = self._suppressed.pop(logger.name, 0)
+            self._reported_at[logger.name] = now
+        if suppressed:
+            logger.info(
+                "Suppressed %d request log records in the last %d s",
+                suppressed,
+                round(now - reported_at),
+                extra={"suppressed": suppressed},
+            )
+
+
+class EveryNthLogSampler(LogSampler):
+    """
+    Emits one record out of every n.
+    """
+
+    def __init__(
+        self,
+        n: int,
+        slow_request_threshold_in_seconds: Optional[float] = None,
+        report_interval_in_seconds: float = LogSampler.DEFAULT_REPORT_INTERVAL_IN_SECONDS,
+    ) -> None:
+        if n < 1:
+            raise RuntimeError("n must be positive")
+        super().__init__(slow_request_threshold_in_seconds, report_interval_in_seconds)
+        self._n = n
+        self._counter = itertools.count()
+
+    def _sample(self, logger: logging.Logger, request: SentRequest) -> bool:
+        return next(self._counter) % self._n == 0
+
+
+class RouteLogSampler(LogSampler):
+    """
+    Emits records with a probability from 0 to 1 set per route: the request path or the PreparedRequest path pattern.
+    """
+
+    def __init__(
+        self,
+        rates: Mapping[str, float],
+        default_rate: float = 1.0,
+        slow_request_threshold_in_seconds: Optional[float] = None,
+        report_interval_in_seconds: float = LogSampler.DEFAULT_REPORT_INTERVAL_IN_SECONDS,
+    ) -> None:
+        super().__init__(slow_request_threshold_in_seconds, report_interval_in_seconds)
+        self._rates = dict(rates)
+        self._default_rate = default_rate
+
+    def _sample(self, logger: logging.Logger, request: SentRequest) -> bool:
+        rate = self._rates.get(request.route, self._default_rate)
+        return rate >= 1 or random.random() < rate
+
+
+class TokenBucketLogSampler(LogSampler):
+    """
+    Emits at most rate records per second for each logger, allowing bursts of up to burst records.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: Optional[float] = None,
+        slow_request_threshold_in_seconds: Optional[float] = None,
+        report_interval_in_seconds: float = LogSampler.DEFAULT_REPORT_INTERVAL_IN_SECONDS,
+    ) -> None:
+        super().__init__(slow_request_threshold_in_seconds, report_interval_in_seconds)
+        self._rate = rate
+        self._burst = burst if burst is not None else max(rate, 1.0)
+        self._buckets: Dict[str, List[float]] = {}
+
+    def _sample(self, logger: logging.Logger, request: SentRequest) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(logger.name)
+            if bucket is None:
+                bucket = self._buckets[logger.name] = [self._burst, now]
+            tokens = min(self._burst, bucket[0] + (now - bucket[1]) * self._rate)
+            bucket[1] = now
+            if tokens < 1:
+                bucket[0] = tokens
+                return False
+            bucket[0] = tokens - 1
+            return True
@@ -0,0 +1,326 @@
+import threading
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from httpx import URL
+
+from httptoolkit.sent_request import SentRequest
+
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DEFAULT_SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+SeriesKey = Tuple[str, str, str]
+"""Transport, method and route."""
+
+
+@dataclass(frozen=True)
+class HistogramSnapshot:
+    """
+    Fixed-bucket histogram: counts[i] is the number of values <= buckets[i] and > buckets[i - 1]; the last count is
+    for values above all buckets.
+    """
+
+    buckets: Tuple[float, ...]
+    counts: Tuple[int, ...]
+    sum: float
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts)
+
+    def percentile(self, percent: float) -> Optional[float]:
+        """
+        :return: Upper bound of the bucket holding the percentile, inf if it is above all buckets, None if empty.
+        """
+        total = self.count
+        if not total:
+            return None
+        rank = total * percent / 100
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            cumulative += count
+            if cumulative >= rank:
+                return bound
+        return float("inf")  # pragma: no cover
+
+    def merge(self, other: "HistogramSnapshot") -> "HistogramSnapshot":
+        return HistogramSnapshot(
+            self.buckets, tuple(a + b for a, b in zip(self.counts, other.counts)), self.sum + other.sum
+        )
+
+
+@dataclass(frozen=True)
+class SeriesSnapshot:
+    transport: str
+    method: str
+    route: str
+    responses: Dict[str, int]
+    """Number of requests by status code, "error" for those without a response and the reason, e.g. "throttled", for
+    those the client rejected."""
+    latency: HistogramSnapshot
+    size: HistogramSnapshot
+    hedges: int = 0
+    """Duplicates sent by a hedging service; they are counted in responses as well."""
+    hedge_wins: int = 0
+    """Duplicates that responded before the original request."""
+
+    @property
+    def requests(self) -> int:
+        return sum(self.responses.values())
+
+    @property
+    def errors(self) -> int:
+        """
+        :return: Requests without a response or with a 5xx one.
+        """
+        return sum(count for status, count in self.responses.items() if status == "error" or status[0] == "5")
+
+
+@dataclass
+class _Series:
+    latency_counts: List[int]
+    size_counts: List[int]
+    latency_sum: float = 0.0
+    size_sum: float = 0.0
+    responses: Dict[str, int] = field(default_factory=dict)
+    hedges: int = 0
+    hedge_wins: int = 0
+
+
+def _merge_series(first: _Series, second: _Series) -> _Series:
+    responses = dict(first.responses)
+    for status, count in second.responses.items():
+        responses[status] = responses.get(status, 0) + count
+    return _Series(
+        latency_counts=[a + b for a, b in zip(first.latency_counts, second.latency_counts)],
+        size_counts=[a + b for a, b in zip(first.size_counts, second.size_counts)],
+        latency_sum=first.latency_sum + second.latency_sum,
+        size_sum=first.size_sum + second.size_sum,
+        responses=responses,
+        hedges=first.hedges + second.hedges,
+        hedge_wins=first.hedge_wins + second.hedge_wins,
+    )
+
+
+class MetricsRegistry:
+    """
+    In-process request metrics per transport and route: counters by status and latency and response size histograms.
+
+    Every thread records into its own shard, so recording takes no lock; a snapshot merges the shards. The shards of
+    finished threads are folded into one.
+
+    The route label of a request is the path pattern it was built from (see PreparedRequest), else the one given by
+    route_mapper, else its path if listed in routes, else OTHER_ROUTE: raw paths such as /users/123 would make a
+    series per id.
+    """
+
+    OTHER_ROUTE = "other"
+
+    def __init__(
+        self,
+        latency_buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS,
+        size_buckets: Sequence[float] = DEFAULT_SIZE_BUCKETS,
+        routes: Iterable[str] = (),
+        route_mapper: Optional[Callable[[SentRequest], Optional[str]]] = None,
+    ) -> None:
+        """
+        :param routes: Paths labelled as they are.
+        :param route_mapper: Route label of a request, None for OTHER_ROUTE.
+        """
+        self._latency_buckets = tuple(sorted(latency_buckets))
+        self._size_buckets = tuple(sorted(size_buckets))
+        self._routes = frozenset(routes)
+        self._route_mapper = route_mapper
+        self._local = threading.local()
+        self._shards: List[Tuple[threading.Thread, Dict[SeriesKey, _Series]]] = []
+        self._retired: Dict[SeriesKey, _Series] = {}
+        self._lock = threading.Lock()
+
+    def route(self, request: SentRequest) -> str:
+        """
+        :return: Route label of the request.
+        """
+        route = request.template_route
+        if route is None and self._route_mapper is not None:
+            route = self._route_mapper(request)
+        if route is None and request.route in self._routes:
+            route = request.route
+        return self.OTHER_ROUTE if route is None else route
+
+    def record(
+        self,
+        transport: str,
+        method: str,
+        route: str,
+        status_code: Optional[int],
+        elapsed: float,
+        size: Optional[int] = None,
+    ) -> None:
+        series = self._series(transport, method, route)
+        status = "error" if status_code is None else str(status_code)
+        series.responses[status] = series.responses.get(status, 0) + 1
+        series.latency_counts[bisect_left(self._latency_buckets, elapsed)] += 1
+        series.latency_sum += elapsed
+        if size is not None:
+            series.size_counts[bisect_left(self._size_buckets, size)] += 1
+            series.size_sum += size
+
+    def record_rejected(self, transport: str, method: str, route: str, reason: str) -> None:
+        """
+        Count a request that the client rejected without sending it, by the reason in place of the status code.
+        """
+        series = self._series(transport, method, route)
+        series.responses[reason] = series.responses.get(reason, 0) + 1
+
+    def record_hedge(self, transport: str, method: str, route: str, won: bool) -> None:
+        """
+        Count a duplicate sent by a hedging service, and whether it responded first.
+        """
+        series = self._series(transport, method, route)
+        series.hedges += 1
+        if won:
+            series.hedge_wins += 1
+
+    def snapshot(self) -> List[SeriesSnapshot]:
+        merged: Dict[SeriesKey, SeriesSnapshot] = {}
+        with self._lock:
+            self._retire_dead_shards()
+            shards = [dict(self._retired)] + [shard for _, shard in self._shards]
+        for shard in shards:
+            for key, series in dict(shard).items():
+                snapshot = self._series_snapshot(key, series)
+                previous = merged.get(key)
+                merged[key] = snapshot if previous is None else self._merge(previous, snapshot)
+        return [merged[key] for key in sorted(merged)]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._retired.clear()
+            for _, shard in self._shards:
+                shard.clear()
+
+    def _series(self, transport: str, method: str, route: str) -> _Series:
+        shard = self._shard()
+        key = (transport, method, route)
+        series = shard.get(key)
+        if series is None:
+            series = shard[key] = _Series(
+                latency_counts=[0] * (len(self._latency_buckets) + 1),
+                size_counts=[0] * (len(self._size_buckets) + 1),
+            )
+        return series
+
+    def _shard(self) -> Dict[SeriesKey, _Series]:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = {}
+            with self._lock:
+                self._retire_dead_shards()
+                self._shards.append((threading.current_thread(), shard))
+        return shard
+
+    def _retire_dead_shards(self) -> None:
+        """
+        Fold the shards of finished threads, which no longer write to them, into the retired one.
+        """
+        alive = []
+        for thread, shard in self._shards:
+            if thread.is_alive():
+                alive.append((thread, shard))
+                continue
+            for key, series in shard.items():
+                retired = self._retired.get(key)
+                # a new object, as a snapshot may be reading the old one outside the lock
+                self._retired[key] = series if retired is None else _merge_series(retired, series)
+        self._shards = alive
+
+    def _series_snapshot(self, key: SeriesKey, series: _Series) -> SeriesSnapshot:
+        return SeriesSnapshot(
+            transport=key[0],
+            method=key[1],
+            route=key[2],
+            responses=dict(series.responses),
+            latency=HistogramSnapshot(self._latency_buckets, tuple(series.latency_counts), series.latency_sum),
+            size=HistogramSnapshot(self._size_buckets, tuple(series.size_counts), series.size_sum),
+            hedges=series.hedges,
+            hedge_wins=series.hedge_wins,
+        )
+
+    @staticmethod
+    def _merge(first: SeriesSnapshot, second: SeriesSnapshot) -> SeriesSnapshot:
+        responses = dict(first.responses)
+        for status, count in second.responses.items():
+            responses[status] = responses.get(status, 0) + count
+        return SeriesSnapshot(
+            transport=first.transport,
+            method=first.method,
+            route=first.route,
+            responses=responses,
+            latency=first.latency.merge(second.latency),
+            size=first.size.merge(second.size),
+            hedges=first.hedges + second.hedges,
+            hedge_wins=first.hedge_wins + second.hedge_wins,
+        )
+
+
+def render_prometheus(snapshot: Iterable[SeriesSnapshot], prefix: str = "httptoolkit") -> str:
+    """
+    :return: The snapshot in the Prometheus text exposition format.
+    """
+    snapshot = list(snapshot)
+    lines = [
+        f"# HELP {prefix}_requests_total Requests by response status.",
+        f"# TYPE {prefix}_requests_total counter",
+    ]
+    for series in snapshot:
+        for status, count in sorted(series.responses.items()):
+            lines.append(f"{prefix}_requests_total{{{_labels(series, status=status)}}} {count}")
+    for name, help_text, attribute in (
+        ("hedges_total", "Duplicates sent by hedging.", "hedges"),
+        ("hedge_wins_total", "Duplicates that responded first.", "hedge_wins"),
+    ):
+        series_with_hedges = [series for series in snapshot if series.hedges]
+        if not series_with_hedges:
+            continue
+        lines.append(f"# HELP {prefix}_{name} {help_text}")
+        lines.append(f"# TYPE {prefix}_{name} counter")
+        for series in series_with_hedges:
+            lines.append(f"{prefix}_{name}{{{_labels(series)}}} {getattr(series, attribute)}")
+    for name, help_text, attribute in (
+        ("request_duration_seconds", "Request duration in seconds.", "latency"),
+        ("response_size_bytes", "Response size in bytes.", "size"),
+    ):
+        lines.append(f"# HELP {prefix}_{name} {help_text}")
+        lines.append(f"# TYPE {prefix}_{name} histogram")
+        for series in snapshot:
+            histogram: HistogramSnapshot = getattr(series, attribute)
+            cumulative = 0
+            for bound, count in zip(histogram.buckets + (float("inf"),), histogram.counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _number(bound)
+                lines.append(f"{prefix}_{name}_bucket{{{_labels(series, le=le)}}} {cumulative}")
+            lines.append(f"{prefix}_{name}_sum{{{_labels(series)}}} {_number(histogram.sum)}")
+            lines.append(f"{prefix}_{name}_count{{{_labels(series)}}} {cumulative}")
+    return "\n".join(lines) + "\n"
+
+
+def transport_label(url: str) -> str:
+    """
+    :return: Host and port of the URL, leaving out the credentials and the path it may carry.
+    """
+    parsed = URL(url)
+    return parsed.host if parsed.port is None else f"{parsed.host}:{parsed.port}"
+
+
+def _labels(series: SeriesSnapshot, **extra: str) -> str:
+    labels = {"transport": series.transport, "method": series.method, "route": series.route, **extra}
+    return ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items())
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(value: float) -> str:
+    return repr(int(value)) if float(value).is_integer() else repr(value)
@@ -0,0 +1,153 @@
+from typing import Any, BinaryIO, Dict, List, Mapping, Optional, Tuple, Union
+from urllib.parse import quote, urlencode
+
+from httptoolkit.header import Header
+from httptoolkit.http_method import HttpMethod
+from httptoolkit.request import Request
+
+
+class PreparedRequest:
+    """
+    Endpoint template compiled once: method, path pattern, static headers and static params.
+
+    Path pattern placeholders use str.format syntax, e.g. "/users/{user_id}"; their values are quoted as a single
+    path segment. Transports may keep their own compiled form of a template, so the parts that do not change between
+    calls are processed only once.
+    """
+
+    def __init__(
+        self,
+        method: HttpMethod,
+        path: str,
+        headers: Tuple[Header, ...] = (),
+        params: Optional[dict] = None,
+    ) -> None:
+        self._method = method
+        self._path = path
+        self._headers = headers
+        self._params: dict = params if params is not None else {}
+        self._query = urlencode(self._params)
+
+    @property
+    def method(self) -> HttpMethod:
+        return self._method
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    @property
+    def headers(self) -> Tuple[Header, ...]:
+        return self._headers
+
+    @property
+    def params(self) -> dict:
+        return self._params
+
+    @property
+    def query(self) -> str:
+        """
+        :return: The static params, already url-encoded.
+        """
+        return self._query
+
+    def build(
+        self,
+        path_params: Optional[Mapping[str, Any]] = None,
+        headers: Tuple[Header, ...] = (),
+        params: Optional[dict] = None,
+        body: Optional[Union[bytes, str]] = None,
+        json: Optional[Union[dict, List]] = None,
+        files: Optional[Dict[str, Union[BinaryIO, Tuple[str, BinaryIO, str]]]] = None,
+    ) -> "TemplateRequest":
+        if path_params:
+            path = self._path.format_map({name: quote(str(value), safe="") for name, value in path_params.items()})
+        else:
+            path = self._path
+        return TemplateRequest(
+            template=self,
+            path=path,
+            headers=headers,
+            params=params,
+            body=body,
+            json=json,
+            files=files,
+        )
+
+
+class TemplateRequest(Request):
+    """
+    Request built from a PreparedRequest; behaves as a regular Request for any transport.
+    """
+
+    def __init__(
+        self,
+        template: PreparedRequest,
+        path: str,
+        headers: Tuple[Header, ...] = (),
+        params: Optional[dict] = None,
+        body: Optional[Union[bytes, str]] = None,
+        json: Optional[Union[dict, List]] = None,
+        files: Optional[Dict[str, Union[BinaryIO, Tuple[str, BinaryIO, str]]]] = None,
+    ) -> None:
+        super().__init__(
+            method=template.method,
+            path=path,
+            params=params,
+            headers=template.headers + headers if headers else template.headers,
+            body=body,
+            json=json,
+            files=files,
+        )
+        self._template = template
+        self._dynamic_headers = headers
+
+    @property
+    def template(self) -> PreparedRequest:
+        return self._template
+
+    @property
+    def dynamic_headers(self) -> Tuple[Header, ...]:
+        """
+        :return: Headers passed to PreparedRequest.build, without the static ones.
+        """
+        return self._dynamic_headers
+
+    @property
+    def route(self) -> str:
+        return self._template.path
+
+    @property
+    def template_route(self) -> Optional[str]:
+        return self._template.path
+
+    @property
+    def params(self) -> Optional[dict]:
+        if not self._params:
+            return self._template.params
+        return {**self._template.params, **self._params}
+
+    @property
+    def full_path(self) -> str:
+        query = self._template.query
+        if self._params:
+            if query and self._template.params.keys().isdisjoint(self._params.keys()):
+                query = f"{query}&{urlencode(self._params)}"
+            else:
+                query = urlencode(self.params or {})
+        if not query:
+            return self.path
+        return f"{self.path}?{query}"
+
+    def set_new_headers(self, new_headers: Tuple[Header, ...]) -> "Request":
+        request = TemplateRequest(
+            template=self._template,
+            path=self.path,
+            headers=self._dynamic_headers + new_headers,
+            params=self._params,
+            body=self.body,
+            json=self.json,
+            files=self.files,
+        )
+        request._encoded_json = self._encoded_json
+        return request
@@ -0,0 +1,144 @@
+import re
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Mapping, Optional, Tuple
+
+from httptoolkit.retry import parse_retry_after
+
+_RATE_LIMIT_FIELD = re.compile(r"\b(remaining|reset)\s*=\s*([0-9]+)")
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    rate: float
+    """Requests per second."""
+    burst: int = 1
+    """Requests that can be sent at once after a quiet period."""
+
+
+@dataclass(frozen=True)
+class RateLimitStats:
+    delayed: int
+    """Requests that waited for the rate limit."""
+    rejected: int
+    """Requests rejected because they would have waited longer than max_wait_in_seconds."""
+    pauses: int
+    """Pauses taken at the request of the upstream, from Retry-After or RateLimit-* headers."""
+
+
+class _Gcra:
+    """
+    Generic cell rate algorithm: a token bucket kept as the theoretical arrival time of the next request.
+    """
+
+    def __init__(self, limit: RateLimit) -> None:
+        if limit.rate <= 0 or limit.burst < 1:
+            raise RuntimeError("rate must be positive and burst at least 1")
+        self._interval = 1 / limit.rate
+        self._tolerance = self._interval * (limit.burst - 1)
+        self._arrival = 0.0
+
+    def delay(self, now: float) -> float:
+        return max(0.0, self._arrival - self._tolerance - now)
+
+    def consume(self, at: float) -> None:
+        self._arrival = max(self._arrival, at) + self._interval
+
+
+class RateLimiter:
+    """
+    Client-side rate limits of a transport: a default one and overrides per route (the request path or the
+    PreparedRequest path pattern). Every route with its own limit has its own bucket; the others share the default
+    one. A limiter shared by several transports shares their quota.
+
+    A 429 or 503 response with Retry-After, or a response with RateLimit-Remaining: 0 and RateLimit-Reset, pauses the
+    requests of its bucket until then, even when the bucket has no configured rate.
+    """
+
+    OVERLOADED_STATUS_CODES = frozenset({429, 503})
+
+    def __init__(
+        self,
+        default: Optional[RateLimit] = None,
+        routes: Optional[Mapping[str, RateLimit]] = None,
+        max_wait_in_seconds: Optional[float] = None,
+    ) -> None:
+        """
+        :param max_wait_in_seconds: How long a request may wait for the limit before it is rejected; None waits for
+                                    as long as it takes, 0 fails fast.
+        """
+        self._buckets: Dict[str, _Gcra] = {route: _Gcra(limit) for route, limit in (routes or {}).items()}
+        if default is not None:
+            self._buckets[""] = _Gcra(default)
+        self._routes = frozenset(routes or ())
+        self._max_wait_in_seconds = max_wait_in_seconds
+        self._paused_until: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._delayed = 0
+        self._rejected = 0
+        self._pauses = 0
+
+    @property
+    def stats(self) -> RateLimitStats:
+        with self._lock:
+            return RateLimitStats(delayed=self._delayed, rejected=self._rejected, pauses=self._pauses)
+
+    def reserve(self, route: str, retry: bool = False) -> Optional[float]:
+        """
+        Take the next slot of the route.
+
+        :param retry: A retry of a request that was already let through always waits, whatever max_wait_in_seconds.
+        :return: Seconds to wait before sending the request, None if it is rejected.
+        """
+        scope = self._scope(route)
+        bucket = self._buckets.get(scope)
+        with self._lock:
+            now = time.monotonic()
+            delay = max(0.0, self._paused_until.get(scope, 0.0) - now)
+            if bucket is not None:
+                delay = max(delay, bucket.delay(now))
+            if not retry and self._max_wait_in_seconds is not None and delay > self._max_wait_in_seconds:
+                self._rejected += 1
+                return None
+            if bucket is not None:
+                bucket.consume(now + delay)
+            if delay:
+                self._delayed += 1
+            return delay
+
+    def update(self, route: str, status_code: int, headers: Mapping[str, str]) -> None:
+        """
+        Pause the route when the response asks to.
+        """
+        pause = 0.0
+        if status_code in self.OVERLOADED_STATUS_CODES:
+            pause = parse_retry_after(headers.get("Retry-After", ""))
+        remaining, reset = self._parse_rate_limit_headers(headers)
+        if remaining == 0 and reset is not None:
+            pause = max(pause, reset)
+        if not pause:
+            return
+        scope = self._scope(route)
+        with self._lock:
+            paused_until = time.monotonic() + pause
+            if paused_until > self._paused_until.get(scope, 0.0):
+                self._paused_until[scope] = paused_until
+                self._pauses += 1
+
+    def _scope(self, route: str) -> str:
+        return route if route in self._routes else ""
+
+    @staticmethod
+    def _parse_rate_limit_headers(headers: Mapping[str, str]) -> Tuple[Optional[int], Optional[int]]:
+        """
+        :return: Remaining requests and seconds until the quota resets, from the RateLimit-Remaining and
+                 RateLimit-Reset headers or from the combined RateLimit header.
+        """
+        fields = dict(_RATE_LIMIT_FIELD.findall(headers.get("RateLimit", "").lower()))
+        remaining = headers.get("RateLimit-Remaining", fields.get("remaining", ""))
+        reset = headers.get("RateLimit-Reset", fields.get("reset", ""))
+        return (
+            int(remaining) if remaining.strip().isdigit() else None,
+            int(reset) if reset.strip().isdigit() else None,
+        )
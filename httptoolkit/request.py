@@ -1,4 +1,4 @@
-from typing import Dict, List, Optional, Tuple, Union, BinaryIO
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union, BinaryIO
 from urllib.parse import urlencode
 
 from httptoolkit.header import Header
@@ -26,10 +26,25 @@ class Request:
         self._body = body
         self._json = json
         self._files = files
+        self._encoded_json: Optional[Tuple[Callable[[Any], str], str]] = None
 
     def build_absolute_url(self, base_url: str) -> str:
         return "/".join((base_url.rstrip("/"), self.full_path.lstrip("/")))
 
+    @property
+    def route(self) -> str:
+        """
+        :return: Path that groups the requests of one endpoint, e.g. for log sampling.
+        """
+        return self.path
+
+    @property
+    def template_route(self) -> Optional[str]:
+        """
+        :return: Path pattern of the endpoint when the request was built from one, e.g. by a PreparedRequest.
+        """
+        return None
+
     @property
     def full_path(self) -> str:
         if not self.params:
@@ -38,7 +53,7 @@ class Request:
             return f"{self.path}?{urlencode(self.params)}"
 
     def set_new_headers(self, new_headers: Tuple[Header, ...]) -> "Request":
-        return Request(
+        request = Request(
             method=self._method,
             path=self.path,
             params=self.params,
@@ -47,6 +62,16 @@ class Request:
             json=self.json,
             files=self.files,
         )
+        request._encoded_json = self._encoded_json
+        return request
+
+    def encode_json(self, json_encoder: Callable[[Any], str]) -> str:
+        """
+        :return: JSON encoded by json_encoder; the result is kept, so each encoder runs once per request.
+        """
+        if self._encoded_json is None or self._encoded_json[0] is not json_encoder:
+            self._encoded_json = (json_encoder, json_encoder(self._json))
+        return self._encoded_json[1]
 
     @property
     def headers(self) -> Tuple[Header, ...]:
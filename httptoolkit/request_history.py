@@ -0,0 +1,84 @@
+import itertools
+import time
+from datetime import datetime
+from typing import List, NamedTuple, Optional, Sequence
+
+from httptoolkit.retry import Attempt
+
+
+class RequestHistoryRecord(NamedTuple):
+    """
+    Compact record of a finished request. The URL is identified by the request route, so no URL is formatted.
+    """
+
+    sequence: int
+    finished_at: float
+    method: str
+    route: str
+    status_code: Optional[int]
+    elapsed: float
+    attempts: Sequence[Attempt]
+    error: Optional[str]
+
+    def __str__(self) -> str:
+        outcome = self.error if self.status_code is None else str(self.status_code)
+        return "{} {} {} {} in {} ms (attempts: {})".format(
+            datetime.fromtimestamp(self.finished_at).isoformat(timespec="milliseconds"),
+            self.method.upper(),
+            self.route,
+            outcome,
+            round(self.elapsed * 1000),
+            len(self.attempts),
+        )
+
+
+class RequestHistory:
+    """
+    Preallocated ring buffer with the records of the last requests of a transport.
+
+    Adding a record takes one tuple and no locking; under concurrent use a slot may be overwritten out of order,
+    which only affects which of the oldest records are kept.
+    """
+
+    DEFAULT_SIZE = 256
+
+    def __init__(self, size: int = DEFAULT_SIZE) -> None:
+        if size < 1:
+            raise RuntimeError("size must be positive")
+        self._size = size
+        self._records: List[Optional[RequestHistoryRecord]] = [None] * size
+        self._sequence = itertools.count()
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def add(
+        self,
+        method: str,
+        route: str,
+        status_code: Optional[int],
+        elapsed: float,
+        attempts: Sequence[Attempt] = (),
+        error: Optional[str] = None,
+    ) -> None:
+        sequence = next(self._sequence)
+        self._records[sequence % self._size] = RequestHistoryRecord(
+            sequence, time.time(), method, route, status_code, elapsed, attempts, error
+        )
+
+    def records(self) -> List[RequestHistoryRecord]:
+        """
+        :return: The kept records, oldest first.
+        """
+        records = list(self._records)
+        sequences = [-1 if record is None else record.sequence for record in records]
+        newest = sequences.index(max(sequences))
+        # the slots are filled in turn, so the oldest record follows the newest one
+        return [record for record in records[newest + 1 :] + records[: newest + 1] if record is not None]
+
+    def dump(self) -> str:
+        return "\n".join(str(record) for record in self.records())
+
+    def clear(self) -> None:
+        self._records = [None] * self._size
@@ -1,6 +1,8 @@
 from datetime import timedelta
 from typing import MutableMapping, Optional, Any, Iterator, AsyncIterator, Protocol, Callable
 
+from httptoolkit.timings import Timings
+
 
 class OriginalResponse(Protocol):
     @property
@@ -73,8 +75,9 @@ class OriginalResponse(Protocol):
 
 
 class BaseResponse:
-    def __init__(self, response: OriginalResponse) -> None:
+    def __init__(self, response: OriginalResponse, timings: Optional[Timings] = None) -> None:
         self._response = response
+        self._timings = timings
 
     @property
     def ok(self) -> bool:
@@ -95,3 +98,10 @@ class BaseResponse:
     @property
     def elapsed(self) -> timedelta:
         return self._response.elapsed
+
+    @property
+    def timings(self) -> Optional[Timings]:
+        """
+        :return: Phase timings of the attempt that received the response, if the transport collects them.
+        """
+        return self._timings
@@ -0,0 +1,78 @@
+import time
+from typing import List, Optional
+
+from httpx import Response as OriginalHttpxResponse
+
+from httptoolkit.retry import Attempt
+from httptoolkit.sent_request import SentRequest
+from httptoolkit.timings import TimingsRecorder
+from httptoolkit.tracing import RequestTrace
+
+
+class ResponseLogRecord:
+    """
+    Completion record of a request: status, duration, received bytes and attempts.
+
+    It is created before the request is sent and finished once the response is received or the stream is closed.
+    Nothing is formatted until the record is emitted, and the response body is never read for it.
+    """
+
+    _TEMPLATE = (
+        "Received {status_code} for {method} {url} in {elapsed_ms} ms (size: {response_size}, attempts: {attempts})"
+    )
+    _ERROR_TEMPLATE = "Failed {method} {url} in {elapsed_ms} ms (attempts: {attempts}): {error}"
+
+    def __init__(self, request: SentRequest) -> None:
+        self._request = request
+        self._started = time.perf_counter()
+        self._elapsed = 0.0
+        self._response: Optional[OriginalHttpxResponse] = None
+        self._error: Optional[BaseException] = None
+        self.attempts: List[Attempt] = []
+        self.sampled_out = False
+        self.suppressed = False
+        self.slow_threshold: Optional[float] = None
+        self.timings: Optional[TimingsRecorder] = None
+        self.trace: Optional[RequestTrace] = None
+
+    def finish(self, response: Optional[OriginalHttpxResponse] = None, error: Optional[BaseException] = None) -> None:
+        self._elapsed = time.perf_counter() - self._started
+        self._response = response
+        self._error = error
+
+    @property
+    def request(self) -> SentRequest:
+        return self._request
+
+    @property
+    def elapsed(self) -> float:
+        return self._elapsed
+
+    @property
+    def response(self) -> Optional[OriginalHttpxResponse]:
+        return self._response
+
+    @property
+    def error(self) -> Optional[BaseException]:
+        return self._error
+
+    def __str__(self) -> str:
+        template = self._ERROR_TEMPLATE if self._error is not None else self._TEMPLATE
+        return template.format(
+            **{
+                **self.args(),
+                "elapsed_ms": round(self._elapsed * 1000),
+                "attempts": len(self.attempts),
+                "error": type(self._error).__name__,
+            }
+        )
+
+    def args(self) -> dict:
+        return {
+            "method": self._request.method.upper(),
+            "url": self._request.url,
+            "status_code": None if self._response is None else self._response.status_code,
+            "elapsed": self._elapsed,
+            "response_size": None if self._response is None else self._response.num_bytes_downloaded,
+            "attempts": tuple(self.attempts),
+        }
@@ -1,12 +1,45 @@
 import re
 import time
 from contextlib import suppress
+from dataclasses import dataclass
 from email.utils import mktime_tz, parsedate_tz
 from typing import FrozenSet, Iterable, Iterator, Optional, Type
 
 from httptoolkit.response import OriginalResponse
 
 
+@dataclass(frozen=True)
+class Attempt:
+    """
+    One attempt to send a request: its duration in seconds and the response status code or the error name.
+    """
+
+    elapsed: float
+    status_code: Optional[int] = None
+    error: Optional[str] = None
+
+
+def parse_retry_after(value: str) -> float:
+    """
+    :return: Seconds to wait according to a Retry-After header value, in seconds or as an HTTP date; 0 if invalid.
+    """
+    if not value:
+        return 0
+
+    # Whitespace: https://tools.ietf.org/html/rfc7230#section-3.2.4
+    if re.match(r"^\s*[0-9]+\s*$", value):
+        return max(0, int(value))
+
+    retry_date_tuple = parsedate_tz(value)
+
+    if retry_date_tuple is None:
+        return 0
+
+    retry_date = mktime_tz(retry_date_tuple)
+
+    return max(0, retry_date - time.time())
+
+
 class Retry(suppress):
     class _RetryForResponseException(Exception):
         def __init__(self, response: OriginalResponse) -> None:
@@ -50,21 +83,7 @@ class Retry(suppress):
 
     @staticmethod
     def _parse_retry_header(value: str) -> float:
-        if not value:
-            return 0
-
-        # Whitespace: https://tools.ietf.org/html/rfc7230#section-3.2.4
-        if re.match(r"^\s*[0-9]+\s*$", value):
-            return max(0, int(value))
-
-        retry_date_tuple = parsedate_tz(value)
-
-        if retry_date_tuple is None:
-            return 0
-
-        retry_date = mktime_tz(retry_date_tuple)
-
-        return max(0, retry_date - time.time())
+        return parse_retry_after(value)
 
     def __exit__(self, exc_type, exc_val, exc_tb) -> bool:
         return not self._is_last and super().__exit__(exc_type, exc_val, exc_tb)
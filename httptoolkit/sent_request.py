@@ -14,13 +14,16 @@ class SentRequest:
         headers: Tuple[Header, ...] = (),
     ):
         self._request = request
-        self._url = self._request.build_absolute_url(base_url)
+        self._base_url = base_url
+        self._url: Optional[str] = None
         self._headers = headers
         self._body = body
         self._proxies = {} if proxies is None else proxies
 
     @property
     def url(self) -> str:
+        if self._url is None:
+            self._url = self._request.build_absolute_url(self._base_url)
         return self._url
 
     @property
@@ -41,6 +44,14 @@ class SentRequest:
     def method(self) -> str:
         return self._request.method
 
+    @property
+    def route(self) -> str:
+        return self._request.route
+
+    @property
+    def template_route(self) -> Optional[str]:
+        return self._request.template_route
+
     @property
     def proxies(self) -> Optional[dict]:
         return self._proxies
@@ -1,6 +1,23 @@
+from typing import Optional, Union
+
 from httptoolkit.sent_request import SentRequest
 
 
+class HeadersLogValue:
+    """
+    Request headers for the log record extras; they are joined into one string only when a formatter renders them.
+    """
+
+    def __init__(self, request: SentRequest) -> None:
+        self._request = request
+
+    def __str__(self) -> str:
+        return "\n".join(str(header) for header in self._request.headers)
+
+    def __repr__(self) -> str:
+        return repr(str(self))
+
+
 class RequestLogRecord:
     _METHOD_TEMPLATES = {"get": "Sending {method} {url}"}
     _DEFAULT_TEMPLATE = "Sending {method} {url} (body: {body_size})"
@@ -19,10 +36,18 @@ class RequestLogRecord:
         return {
             "method": self._request.method.upper(),
             "url": self._url,
-            "headers": "\n".join(str(header) for header in self._request.headers),
-            "body_size": 0 if not self._request.body else len(str(self._request.body)),
+            "headers": HeadersLogValue(self._request),
+            "body_size": self._body_size(self._request.body),
         }
 
+    @staticmethod
+    def _body_size(body: Optional[Union[bytes, str]]) -> int:
+        if not body:
+            return 0
+        if isinstance(body, str):
+            return len(body.encode())
+        return len(body)
+
     @property
     def _template(self) -> str:
         return self._METHOD_TEMPLATES.get(self._request.method.lower(), self._DEFAULT_TEMPLATE)
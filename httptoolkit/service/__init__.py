@@ -1,4 +1,20 @@
 from ._async import AsyncService
+from ._batch import BatchResult, ErrorPolicy
+from ._dispatch import AsyncDispatchQueue, DispatchQueue, DispatchStats, OverflowPolicy
+from ._hedge import HedgePolicy, HedgeStats
+from ._loader import BatchLoader
 from ._sync import Service
 
-__all__ = ["Service", "AsyncService"]
+__all__ = [
+    "Service",
+    "AsyncService",
+    "BatchResult",
+    "ErrorPolicy",
+    "BatchLoader",
+    "DispatchQueue",
+    "AsyncDispatchQueue",
+    "DispatchStats",
+    "OverflowPolicy",
+    "HedgePolicy",
+    "HedgeStats",
+]
@@ -1,13 +1,37 @@
+import asyncio
+import time
 from contextlib import asynccontextmanager, contextmanager
-from typing import Optional, AsyncIterator, Union, Tuple, List, Dict, BinaryIO, Iterator
+from operator import attrgetter
+from typing import (
+    Optional,
+    AsyncGenerator,
+    AsyncIterator,
+    Union,
+    Tuple,
+    List,
+    Dict,
+    BinaryIO,
+    Iterator,
+    Sequence,
+    Iterable,
+    Callable,
+    Mapping,
+)
 
+from httptoolkit.cache import Memoizer
 from httptoolkit.errors import HttpError, TransportError, ServiceError
 from httptoolkit.header import Header
+from httptoolkit.interceptor import AsyncInterceptor, compile_async_send, compile_async_stream
+from httptoolkit.prepared_request import PreparedRequest
 from httptoolkit.request import Request
 from httptoolkit.response import AsyncStreamResponse, BaseResponse, Response
 from httptoolkit.http_method import HttpMethod
 from httptoolkit.sent_request import SentRequest
 from httptoolkit.transport import BaseAsyncTransport
+from ._batch import BatchResult, ErrorPolicy, batch_concurrency
+from ._dispatch import AsyncDispatchQueue, BaseDispatchQueue, OverflowPolicy
+from ._hedge import HedgePolicy
+from ._loader import BatchLoader, K, V
 
 
 class AsyncService:
@@ -15,22 +39,221 @@ class AsyncService:
         self,
         transport: BaseAsyncTransport,
         headers: Tuple[Header, ...] = (),
+        memoizer: Optional[Memoizer] = None,
+        interceptors: Sequence[AsyncInterceptor] = (),
+        hedge: Optional[HedgePolicy] = None,
     ) -> None:
+        """
+        :param interceptors: Wrap every transport.send and transport.stream call, the first one outermost.
+        :param hedge: Send a duplicate of a slow idempotent request and take the first response, cancelling the
+                      other. Streams are not hedged.
+        """
         self._transport = transport
         self._headers: Tuple[Header, ...] = headers
+        self._memoizer = memoizer
+        self._hedge = hedge
+        self._send_chain = compile_async_send(interceptors, transport.send)
+        self._stream_chain = compile_async_stream(interceptors, transport.stream)
 
     @property
     def headers(self) -> Tuple[Header, ...]:
         return self._headers
 
+    def prepare(
+        self,
+        method: HttpMethod,
+        path: str,
+        headers: Tuple[Header, ...] = (),
+        params: Optional[dict] = None,
+    ) -> PreparedRequest:
+        """
+        Compile an endpoint template together with the service headers.
+
+        Send it with self.request(prepared.build(path_params=..., ...)), passing only the parts that vary.
+        """
+        return PreparedRequest(method=method, path=path, headers=self.headers + headers, params=params)
+
     async def request(
         self,
         request: Request,
+        memoize: bool = False,
     ) -> Response:
-        with self._managed_transport() as async_transport:
-            sent_request, response = await async_transport.send(request)
-            await self._validate_response(sent_request, response)
+        """
+        :param memoize: Serve the response from the memoizer of the service, storing it there on a miss.
+        """
+        if memoize:
+            memoizer = self._get_memoizer()
+            key = memoizer.fingerprint(request)
+            response = memoizer.get(key)
+            if response is None:
+                response = await self._send(request)
+                memoizer.set(key, response)
             return response
+        return await self._send(request)
+
+    async def _send(self, request: Request) -> Response:
+        if self._hedge is None or not self._hedge.applies(request):
+            return await self._send_once(request)
+        return await self._send_hedged(request, self._hedge)
+
+    async def _send_hedged(self, request: Request, hedge: HedgePolicy) -> Response:
+        delay = hedge.delay
+        if delay is None:
+            return (await self._send_timed(request, hedge))[1]
+
+        attempts = [asyncio.ensure_future(self._send_timed(request, hedge))]
+        try:
+            done, _ = await asyncio.wait(attempts, timeout=delay)
+            if not done and hedge.try_hedge():
+                attempts.append(asyncio.ensure_future(self._send_timed(request, hedge)))
+
+            error: Optional[BaseException] = None
+            pending = set(attempts)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for attempt in filter(done.__contains__, attempts):
+                    attempt_error = attempt.exception()
+                    if attempt_error is None:
+                        sent_request, response = attempt.result()
+                        if len(attempts) > 1:
+                            hedge.record_hedge(sent_request, won=attempt is not attempts[0])
+                        return response
+                    error = error or attempt_error
+            assert error is not None
+            if len(attempts) > 1:
+                hedge.record_hedge(error.request if isinstance(error, ServiceError) else None, won=False)
+            raise error
+        finally:
+            for attempt in attempts:
+                attempt.cancel()
+            await asyncio.gather(*attempts, return_exceptions=True)
+
+    async def _send_timed(self, request: Request, hedge: HedgePolicy) -> Tuple[SentRequest, Response]:
+        started = time.monotonic()
+        sent_request, response = await self._exchange(request)
+        hedge.record_latency(time.monotonic() - started)
+        return sent_request, response
+
+    async def _send_once(self, request: Request) -> Response:
+        return (await self._exchange(request))[1]
+
+    async def _exchange(self, request: Request) -> Tuple[SentRequest, Response]:
+        with self._managed_transport():
+            sent_request, response = await self._send_chain(request)
+            await self._validate_response(sent_request, response)
+            return sent_request, response
+
+    def _get_memoizer(self) -> Memoizer:
+        if self._memoizer is None:
+            raise RuntimeError("memoize requires a memoizer passed to the service")
+        return self._memoizer
+
+    async def map(
+        self,
+        requests: Iterable[Request],
+        concurrency: Optional[int] = None,
+        errors: ErrorPolicy = ErrorPolicy.RAISE,
+        timeout_in_seconds: Optional[float] = None,
+    ) -> AsyncGenerator[BatchResult, None]:
+        """
+        Send the requests with at most concurrency of them in flight, yielding the results in completion order. By
+        default concurrency is the connection limit of the transport.
+
+        Requests are taken from the iterable only when there is room for them. When the batch stops, because of an
+        error, the deadline or the consumer closing the iterator, the requests in flight are cancelled and awaited;
+        call aclose() on the iterator when leaving the loop early.
+
+        :param errors: What to do with a request that raised ServiceError.
+        :param timeout_in_seconds: Deadline for the whole batch; asyncio.TimeoutError is raised when it is reached.
+        """
+        concurrency = batch_concurrency(concurrency, self._transport.max_connections)
+        errors = ErrorPolicy(errors)
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout_in_seconds is None else loop.time() + timeout_in_seconds
+        items = enumerate(requests)
+        pending: Dict["asyncio.Future[Response]", Tuple[int, Request]] = {}
+        try:
+            while True:
+                while len(pending) < concurrency:
+                    item = next(items, None)
+                    if item is None:
+                        break
+                    pending[asyncio.ensure_future(self.request(item[1]))] = item
+                if not pending:
+                    return
+
+                timeout = None if deadline is None else deadline - loop.time()
+                if timeout is not None and timeout <= 0:
+                    raise asyncio.TimeoutError()
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    raise asyncio.TimeoutError()
+
+                for future in done:
+                    index, request = pending.pop(future)
+                    try:
+                        response = future.result()
+                    except ServiceError as exc:
+                        if errors is ErrorPolicy.RAISE:
+                            raise
+                        if errors is ErrorPolicy.COLLECT:
+                            yield BatchResult(index=index, request=request, error=exc)
+                        continue
+                    yield BatchResult(index=index, request=request, response=response)
+        finally:
+            for future in pending:
+                future.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+    def loader(
+        self,
+        build_request: Callable[[Sequence[K]], Request],
+        parse_response: Callable[[Sequence[K], Response], Mapping[K, Union[V, Exception]]],
+        max_batch_size: int = 100,
+        window_in_seconds: float = 0.005,
+    ) -> BatchLoader[K, V]:
+        """
+        :return: Loader sending the keys looked up within the window as one bulk request of this service.
+        """
+        return BatchLoader(
+            self,
+            build_request=build_request,
+            parse_response=parse_response,
+            max_batch_size=max_batch_size,
+            window_in_seconds=window_in_seconds,
+        )
+
+    async def gather(
+        self,
+        requests: Iterable[Request],
+        concurrency: Optional[int] = None,
+        errors: ErrorPolicy = ErrorPolicy.RAISE,
+        timeout_in_seconds: Optional[float] = None,
+    ) -> List[BatchResult]:
+        """
+        Like map, but waits for the whole batch.
+
+        :return: The results in the order of the requests.
+        """
+        results = [
+            result
+            async for result in self.map(
+                requests, concurrency=concurrency, errors=errors, timeout_in_seconds=timeout_in_seconds
+            )
+        ]
+        return sorted(results, key=attrgetter("index"))
+
+    def dispatch_queue(
+        self,
+        max_size: int = BaseDispatchQueue.DEFAULT_MAX_SIZE,
+        overflow: OverflowPolicy = OverflowPolicy.DROP_OLDEST,
+        workers: int = BaseDispatchQueue.DEFAULT_WORKERS,
+    ) -> AsyncDispatchQueue:
+        """
+        :return: Queue sending requests of this service in the background, e.g. for telemetry or audit calls.
+        """
+        return AsyncDispatchQueue(self, max_size=max_size, overflow=overflow, workers=workers)
 
     async def post(
         self,
@@ -40,6 +263,7 @@ class AsyncService:
         body: Optional[str] = None,
         json: Optional[Union[dict, List]] = None,
         files: Optional[Dict[str, Union[BinaryIO, Tuple[str, BinaryIO, str]]]] = None,
+        memoize: bool = False,
     ) -> Response:
         request = Request(
             method=HttpMethod.POST,
@@ -50,7 +274,7 @@ class AsyncService:
             json=json,
             files=files,
         )
-        return await self.request(request)
+        return await self.request(request, memoize=memoize)
 
     async def patch(
         self,
@@ -60,6 +284,7 @@ class AsyncService:
         body: Optional[str] = None,
         json: Optional[Union[dict, List]] = None,
         files: Optional[Dict[str, Union[BinaryIO, Tuple[str, BinaryIO, str]]]] = None,
+        memoize: bool = False,
     ) -> Response:
         request = Request(
             method=HttpMethod.PATCH,
@@ -70,7 +295,7 @@ class AsyncService:
             json=json,
             files=files,
         )
-        return await self.request(request)
+        return await self.request(request, memoize=memoize)
 
     async def put(
         self,
@@ -80,6 +305,7 @@ class AsyncService:
         body: Optional[str] = None,
         json: Optional[Union[dict, List]] = None,
         files: Optional[Dict[str, Union[BinaryIO, Tuple[str, BinaryIO, str]]]] = None,
+        memoize: bool = False,
     ) -> Response:
         request = Request(
             method=HttpMethod.PUT,
@@ -90,7 +316,7 @@ class AsyncService:
             json=json,
             files=files,
         )
-        return await self.request(request)
+        return await self.request(request, memoize=memoize)
 
     async def delete(
         self,
@@ -100,6 +326,7 @@ class AsyncService:
         body: Optional[str] = None,
         json: Optional[Union[dict, List]] = None,
         files: Optional[Dict[str, Union[BinaryIO, Tuple[str, BinaryIO, str]]]] = None,
+        memoize: bool = False,
     ) -> Response:
         request = Request(
             method=HttpMethod.DELETE,
@@ -110,13 +337,14 @@ class AsyncService:
             json=json,
             files=files,
         )
-        return await self.request(request)
+        return await self.request(request, memoize=memoize)
 
     async def get(
         self,
         path: str,
         headers: Tuple[Header, ...] = (),
         params: Optional[dict] = None,
+        memoize: bool = False,
     ) -> Response:
         request = Request(
             method=HttpMethod.GET,
@@ -127,22 +355,22 @@ class AsyncService:
             json=None,
             files=None,
         )
-        return await self.request(request)
+        return await self.request(request, memoize=memoize)
 
-    @staticmethod
-    async def _validate_response(sent_request: SentRequest, response: BaseResponse) -> None:
+    async def _validate_response(self, sent_request: SentRequest, response: BaseResponse) -> None:
         if not response.ok:
             if isinstance(response, AsyncStreamResponse):
                 await response.read()
-            raise HttpError(sent_request, response)
+            history = self._transport.history
+            raise HttpError(sent_request, response, history=() if history is None else tuple(history.records()))
 
     @asynccontextmanager
     async def stream_request(
         self,
         request: Request,
     ) -> AsyncIterator[AsyncStreamResponse]:
-        with self._managed_transport() as transport:
-            async with transport.stream(request) as (sent_request, async_stream_response):
+        with self._managed_transport():
+            async with self._stream_chain(request) as (sent_request, async_stream_response):
                 await self._validate_response(sent_request, async_stream_response)
                 yield async_stream_response
 
@@ -259,4 +487,4 @@ class AsyncService:
             yield self._transport
 
         except TransportError as exc:
-            raise ServiceError(exc.request) from exc
+            raise ServiceError(exc.request, history=exc.history) from exc
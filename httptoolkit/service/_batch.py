@@ -0,0 +1,42 @@
+from dataclasses import dataclass
+from enum import Enum
+from typing import Optional
+
+from httptoolkit.errors import ServiceError
+from httptoolkit.request import Request
+from httptoolkit.response import Response
+
+DEFAULT_BATCH_CONCURRENCY = 10
+
+
+class ErrorPolicy(Enum):
+    RAISE = "raise"
+    """The first failed request stops the batch and its error is raised."""
+    COLLECT = "collect"
+    """Failed requests are returned with their error."""
+    SKIP = "skip"
+    """Failed requests are left out of the results."""
+
+
+@dataclass(frozen=True)
+class BatchResult:
+    index: int
+    """Position of the request in the batch."""
+    request: Request
+    response: Optional[Response] = None
+    error: Optional[ServiceError] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def batch_concurrency(concurrency: Optional[int], max_connections: Optional[int]) -> int:
+    """
+    :return: concurrency, or the connection limit of the transport when it is None.
+    """
+    if concurrency is None:
+        concurrency = max_connections or DEFAULT_BATCH_CONCURRENCY
+    if concurrency < 1:
+        raise RuntimeError("concurrency must be at least 1")
+    return concurrency
@@ -0,0 +1,282 @@
+import asyncio
+import contextvars
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from dataclasses import dataclass
+from enum import Enum
+from typing import TYPE_CHECKING, Any, Deque, List, Optional, Tuple
+
+from httptoolkit.request import Request
+
+if TYPE_CHECKING:  # pragma: no cover
+    from ._async import AsyncService
+    from ._sync import Service
+
+
+class OverflowPolicy(Enum):
+    DROP_OLDEST = "drop_oldest"
+    """The longest queued request is dropped to make room for the new one."""
+    DROP_NEWEST = "drop_newest"
+    """The new request is dropped."""
+    BLOCK = "block"
+    """The caller waits for room in the queue."""
+
+
+@dataclass(frozen=True)
+class DispatchStats:
+    sent: int
+    """Requests that got a successful response."""
+    failed: int
+    """Requests that raised an error."""
+    dropped: int
+    """Requests never sent, because of an overflow or of a close that did not drain in time."""
+    queued: int
+    """Requests waiting for a worker."""
+
+
+class BaseDispatchQueue(ABC):
+    DEFAULT_MAX_SIZE = 1000
+    DEFAULT_WORKERS = 1
+
+    def __init__(
+        self,
+        max_size: int = DEFAULT_MAX_SIZE,
+        overflow: OverflowPolicy = OverflowPolicy.DROP_OLDEST,
+        workers: int = DEFAULT_WORKERS,
+    ) -> None:
+        """
+        :param max_size: How many requests can wait for a worker.
+        :param overflow: What to do with a request submitted to a full queue.
+        :param workers: How many requests are sent at the same time.
+        """
+        if max_size < 1 or workers < 1:
+            raise RuntimeError("max_size and workers must be at least 1")
+        self._max_size = max_size
+        self._overflow = OverflowPolicy(overflow)
+        self._workers = workers
+        self._logger = logging.getLogger(self.__class__.__module__)
+
+        self._closed = False
+        self._sent = 0
+        self._failed = 0
+        self._dropped = 0
+
+    @property
+    def stats(self) -> DispatchStats:
+        return DispatchStats(sent=self._sent, failed=self._failed, dropped=self._dropped, queued=len(self._queue))
+
+    @property
+    @abstractmethod
+    def _queue(self) -> Deque[Any]:  # pragma: no cover
+        pass
+
+    def _enqueue(self, item: Any) -> bool:
+        """
+        Add the item to a queue that is not full, or apply the overflow policy to it.
+
+        :return: Whether the item was queued.
+        """
+        if len(self._queue) >= self._max_size:
+            self._dropped += 1
+            if self._overflow is OverflowPolicy.DROP_NEWEST:
+                return False
+            self._queue.popleft()
+        self._queue.append(item)
+        return True
+
+    def _drop_queued(self) -> None:
+        if self._queue:
+            self._logger.warning("Dropped %d queued requests on close", len(self._queue))
+            self._dropped += len(self._queue)
+            self._queue.clear()
+
+    def _record_failure(self, request: Request, error: Exception) -> None:
+        self._failed += 1
+        self._logger.warning("Dispatched %s %s failed: %s", request.method, request.path, type(error).__name__)
+
+
+class DispatchQueue(BaseDispatchQueue):
+    """
+    Sends requests of a Service from worker threads, without the caller waiting for the responses.
+
+    Every request runs in a copy of the context it was submitted from. close() waits for the queued requests to be
+    sent; the ones left when its timeout is reached are dropped, and the ones in flight finish in the background.
+    """
+
+    def __init__(
+        self,
+        service: "Service",
+        max_size: int = BaseDispatchQueue.DEFAULT_MAX_SIZE,
+        overflow: OverflowPolicy = OverflowPolicy.DROP_OLDEST,
+        workers: int = BaseDispatchQueue.DEFAULT_WORKERS,
+    ) -> None:
+        super().__init__(max_size=max_size, overflow=overflow, workers=workers)
+        self._service = service
+        self._items: Deque[Tuple[Request, contextvars.Context]] = deque()
+        self._condition = threading.Condition()
+        self._threads = [
+            threading.Thread(target=self._work, name=f"httptoolkit-dispatch-{number}", daemon=True)
+            for number in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    @property
+    def _queue(self) -> Deque[Tuple[Request, contextvars.Context]]:
+        return self._items
+
+    def submit(self, request: Request) -> bool:
+        """
+        :return: Whether the request was queued; False when it was dropped by the DROP_NEWEST policy.
+        """
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("the dispatch queue is closed")
+            if self._overflow is OverflowPolicy.BLOCK:
+                self._condition.wait_for(lambda: len(self._items) < self._max_size or self._closed)
+                if self._closed:
+                    raise RuntimeError("the dispatch queue is closed")
+            queued = self._enqueue((request, contextvars.copy_context()))
+            self._condition.notify_all()
+            return queued
+
+    def close(self, timeout_in_seconds: Optional[float] = None) -> DispatchStats:
+        """
+        Stop taking requests and wait for the queued ones to be sent.
+
+        :param timeout_in_seconds: How long to wait; the requests still queued then are dropped.
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        deadline = None if timeout_in_seconds is None else time.monotonic() + timeout_in_seconds
+        for thread in self._threads:
+            thread.join(None if deadline is None else max(0.0, deadline - time.monotonic()))
+        with self._condition:
+            self._drop_queued()
+            self._condition.notify_all()
+        return self.stats
+
+    def __enter__(self) -> "DispatchQueue":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def _work(self) -> None:
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._items or self._closed)
+                if not self._items:
+                    return
+                request, context = self._items.popleft()
+                self._condition.notify_all()
+            try:
+                context.run(self._service.request, request)
+            except Exception as exc:
+                with self._condition:
+                    self._record_failure(request, exc)
+            else:
+                with self._condition:
+                    self._sent += 1
+
+
+class AsyncDispatchQueue(BaseDispatchQueue):
+    """
+    Sends requests of an AsyncService from worker tasks, without the caller waiting for the responses.
+
+    Every request runs in a copy of the context it was submitted from. The workers are started by the first submit.
+    close() waits for the queued requests to be sent; when its timeout is reached the requests still queued are
+    dropped and the ones in flight are cancelled.
+    """
+
+    def __init__(
+        self,
+        service: "AsyncService",
+        max_size: int = BaseDispatchQueue.DEFAULT_MAX_SIZE,
+        overflow: OverflowPolicy = OverflowPolicy.DROP_OLDEST,
+        workers: int = BaseDispatchQueue.DEFAULT_WORKERS,
+    ) -> None:
+        super().__init__(max_size=max_size, overflow=overflow, workers=workers)
+        self._service = service
+        self._items: Deque[Tuple[Request, contextvars.Context]] = deque()
+        self._condition: Optional[asyncio.Condition] = None
+        self._tasks: List["asyncio.Task[None]"] = []
+
+    @property
+    def _queue(self) -> Deque[Tuple[Request, contextvars.Context]]:
+        return self._items
+
+    async def submit(self, request: Request) -> bool:
+        """
+        Returns at once, unless the queue is full and its overflow policy is BLOCK.
+
+        :return: Whether the request was queued; False when it was dropped by the DROP_NEWEST policy.
+        """
+        condition = self._get_condition()
+        async with condition:
+            if self._closed:
+                raise RuntimeError("the dispatch queue is closed")
+            if self._overflow is OverflowPolicy.BLOCK:
+                await condition.wait_for(lambda: len(self._items) < self._max_size or self._closed)
+                if self._closed:
+                    raise RuntimeError("the dispatch queue is closed")
+            if not self._tasks:
+                self._tasks = [asyncio.ensure_future(self._work()) for _ in range(self._workers)]
+            queued = self._enqueue((request, contextvars.copy_context()))
+            condition.notify_all()
+            return queued
+
+    async def close(self, timeout_in_seconds: Optional[float] = None) -> DispatchStats:
+        """
+        Stop taking requests and wait for the queued ones to be sent.
+
+        :param timeout_in_seconds: How long to wait; the requests still queued then are dropped and the ones in
+                                   flight are cancelled.
+        """
+        condition = self._get_condition()
+        async with condition:
+            self._closed = True
+            condition.notify_all()
+        if self._tasks:
+            _, pending = await asyncio.wait(self._tasks, timeout=timeout_in_seconds)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+        self._drop_queued()
+        return self.stats
+
+    async def __aenter__(self) -> "AsyncDispatchQueue":
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        await self.close()
+
+    def _get_condition(self) -> asyncio.Condition:
+        # created on first use, so that the queue can be made outside of the event loop
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        return self._condition
+
+    async def _work(self) -> None:
+        condition = self._get_condition()
+        while True:
+            async with condition:
+                await condition.wait_for(lambda: self._items or self._closed)
+                if not self._items:
+                    return
+                request, context = self._items.popleft()
+                condition.notify_all()
+            try:
+                # the workers were started from the context of the first submit, the request gets its own
+                await context.run(asyncio.ensure_future, self._service.request(request))
+            except asyncio.CancelledError:
+                self._dropped += 1
+                raise
+            except Exception as exc:
+                self._record_failure(request, exc)
+            else:
+                self._sent += 1
@@ -0,0 +1,144 @@
+import math
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, FrozenSet, Iterable, List, Optional
+
+from httptoolkit.metrics import MetricsRegistry, transport_label
+from httptoolkit.request import Request
+from httptoolkit.sent_request import SentRequest
+
+
+@dataclass(frozen=True)
+class HedgeStats:
+    requests: int
+    """Requests that could be hedged."""
+    hedges: int
+    """Duplicates sent."""
+    hedge_wins: int
+    """Duplicates that responded before the original request."""
+
+
+class HedgePolicy:
+    """
+    When and how often a service sends a duplicate of a slow idempotent request.
+
+    The duplicate is sent once the request has not responded within delay_in_seconds or, without it, within the
+    percentile of the recent latencies; nothing is hedged until min_samples latencies are known. The duplicates are
+    kept under max_extra_load_percent of the requests by a budget that every request adds to and every duplicate
+    spends. The duplicates and the ones that responded first are counted in stats and, with a MetricsRegistry, in
+    the series of the request.
+    """
+
+    DEFAULT_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+    DEFAULT_PERCENTILE = 95.0
+    DEFAULT_MAX_EXTRA_LOAD_PERCENT = 10.0
+    DEFAULT_MIN_SAMPLES = 20
+    DEFAULT_WINDOW = 1000
+    MAX_BUDGET = 10.0
+    """Duplicates that can be saved up during quiet periods and sent in a row."""
+
+    def __init__(
+        self,
+        delay_in_seconds: Optional[float] = None,
+        percentile: float = DEFAULT_PERCENTILE,
+        max_extra_load_percent: float = DEFAULT_MAX_EXTRA_LOAD_PERCENT,
+        min_samples: int = DEFAULT_MIN_SAMPLES,
+        window: int = DEFAULT_WINDOW,
+        methods: Iterable[str] = DEFAULT_METHODS,
+        metrics: Optional[MetricsRegistry] = None,
+        metrics_name: Optional[str] = None,
+    ) -> None:
+        """
+        :param window: How many recent latencies the percentile is taken over.
+        :param methods: Idempotent methods that may be hedged.
+        :param metrics_name: Transport label of the hedges, by default the host and port of the request URL; set it to
+                             the metrics_name of the transport when that has one.
+        """
+        if not 0 < percentile < 100 or max_extra_load_percent < 0 or window < 1:
+            raise RuntimeError("percentile must be between 0 and 100, max_extra_load_percent positive, window >= 1")
+        self._delay_in_seconds = delay_in_seconds
+        self._percentile = percentile
+        self._budget_per_request = max_extra_load_percent / 100
+        self._min_samples = min(min_samples, window)
+        self._methods: FrozenSet[str] = frozenset(method.upper() for method in methods)
+        self._metrics = metrics
+        self._metrics_name = metrics_name
+        self._latencies: Deque[float] = deque(maxlen=window)
+        self._observed_delay: Optional[float] = None
+        self._unsorted = 0
+        self._budget = 0.0
+        self._requests = 0
+        self._hedges = 0
+        self._hedge_wins = 0
+        self._lock = threading.Lock()
+
+    @property
+    def stats(self) -> HedgeStats:
+        with self._lock:
+            return HedgeStats(requests=self._requests, hedges=self._hedges, hedge_wins=self._hedge_wins)
+
+    @property
+    def delay(self) -> Optional[float]:
+        """
+        :return: Seconds after which a request is hedged, None while too few latencies are known.
+        """
+        if self._delay_in_seconds is not None:
+            return self._delay_in_seconds
+        with self._lock:
+            return self._observed_delay
+
+    def applies(self, request: Request) -> bool:
+        """
+        Count the request if its method may be hedged.
+        """
+        if request.method.upper() not in self._methods:
+            return False
+        with self._lock:
+            self._requests += 1
+            self._budget = min(self.MAX_BUDGET, self._budget + self._budget_per_request)
+        return True
+
+    def try_hedge(self) -> bool:
+        """
+        :return: Whether the budget allows a duplicate now; it is spent if so.
+        """
+        with self._lock:
+            if self._budget < 1:
+                return False
+            self._budget -= 1
+            self._hedges += 1
+            return True
+
+    def record_latency(self, elapsed: float) -> None:
+        with self._lock:
+            self._latencies.append(elapsed)
+            self._unsorted += 1
+            # sorting the window on every response would cost more than the requests it saves
+            if len(self._latencies) >= self._min_samples and (
+                self._observed_delay is None or self._unsorted * 20 >= len(self._latencies)
+            ):
+                self._observed_delay = _percentile(sorted(self._latencies), self._percentile)
+                self._unsorted = 0
+
+    def record_hedge(self, sent_request: Optional[SentRequest], won: bool) -> None:
+        """
+        Record the outcome of a request that was hedged.
+
+        :param sent_request: The attempt that responded, or failed, first; None if not known.
+        :param won: Whether the duplicate responded before the original request.
+        """
+        if won:
+            with self._lock:
+                self._hedge_wins += 1
+        if self._metrics is not None and sent_request is not None:
+            self._metrics.record_hedge(
+                transport=self._metrics_name or transport_label(sent_request.url),
+                method=sent_request.method.upper(),
+                route=self._metrics.route(sent_request),
+                won=won,
+            )
+
+
+def _percentile(values: List[float], percent: float) -> float:
+    return values[min(len(values) - 1, math.ceil(len(values) * percent / 100) - 1)]
@@ -0,0 +1,115 @@
+import asyncio
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Dict,
+    Generic,
+    Hashable,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Set,
+    TypeVar,
+    Union,
+)
+
+from httptoolkit.request import Request
+from httptoolkit.response import Response
+
+if TYPE_CHECKING:  # pragma: no cover
+    from ._async import AsyncService
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class BatchLoader(Generic[K, V]):
+    """
+    Collects single-key lookups into bulk requests and hands every caller the result for its key.
+
+    A batch is sent once window_in_seconds has passed since its first key, or at once when it reaches max_batch_size.
+    A key that is waiting or in flight is not sent again; its callers share the result.
+    """
+
+    def __init__(
+        self,
+        service: "AsyncService",
+        build_request: Callable[[Sequence[K]], Request],
+        parse_response: Callable[[Sequence[K], Response], Mapping[K, Union[V, Exception]]],
+        max_batch_size: int = 100,
+        window_in_seconds: float = 0.005,
+    ) -> None:
+        """
+        :param build_request: Makes the bulk request for the keys of a batch.
+        :param parse_response: Maps the keys of a batch to their values; a key mapped to an exception raises it to
+                               its callers, a missing key raises KeyError.
+        """
+        if max_batch_size < 1:
+            raise RuntimeError("max_batch_size must be at least 1")
+        self._service = service
+        self._build_request = build_request
+        self._parse_response = parse_response
+        self._max_batch_size = max_batch_size
+        self._window_in_seconds = window_in_seconds
+        self._batch: Dict[K, "asyncio.Future[V]"] = {}
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._in_flight: Dict[K, "asyncio.Future[V]"] = {}
+        self._tasks: Set["asyncio.Task[None]"] = set()
+
+    async def load(self, key: K) -> V:
+        future = self._in_flight.get(key) or self._batch.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = self._batch[key] = loop.create_future()
+            if len(self._batch) >= self._max_batch_size:
+                self._flush()
+            elif self._flush_handle is None:
+                self._flush_handle = loop.call_later(self._window_in_seconds, self._flush)
+        # a cancelled caller must not cancel the result shared with the other callers
+        return await asyncio.shield(future)
+
+    async def load_many(self, keys: Iterable[K]) -> List[V]:
+        """
+        :return: The values in the order of the keys; the first failed key raises its error.
+        """
+        return list(await asyncio.gather(*(self.load(key) for key in keys)))
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._batch = self._batch, {}
+        if not batch:
+            return
+        self._in_flight.update(batch)
+        task = asyncio.ensure_future(self._dispatch(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _dispatch(self, batch: Dict[K, "asyncio.Future[V]"]) -> None:
+        keys = list(batch)
+        try:
+            response = await self._service.request(self._build_request(keys))
+            results = self._parse_response(keys, response)
+        except Exception as exc:
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(exc)
+        else:
+            for key, future in batch.items():
+                if future.done():
+                    continue
+                if key not in results:
+                    future.set_exception(KeyError(key))
+                    continue
+                value = results[key]
+                if isinstance(value, Exception):
+                    future.set_exception(value)
+                else:
+                    future.set_result(value)
+        finally:
+            for key in keys:
+                if self._in_flight.get(key) is batch[key]:
+                    del self._in_flight[key]
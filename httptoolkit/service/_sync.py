@@ -1,34 +1,248 @@
+import contextvars
+import threading
+import time
+from concurrent import futures
 from contextlib import contextmanager
-from typing import Iterator, List, Optional, Tuple, Union, Dict, BinaryIO
+from operator import attrgetter
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple, Union, Dict, BinaryIO
 
+from httptoolkit.cache import Memoizer
 from httptoolkit.errors import HttpError, TransportError, ServiceError
 from httptoolkit.header import Header
+from httptoolkit.interceptor import Interceptor, compile_send, compile_stream
+from httptoolkit.prepared_request import PreparedRequest
 from httptoolkit.request import Request
 from httptoolkit.response import BaseResponse, Response, StreamResponse
 
 from httptoolkit.sent_request import SentRequest
 from httptoolkit.http_method import HttpMethod
 from httptoolkit.transport import BaseTransport
+from ._batch import BatchResult, ErrorPolicy, batch_concurrency
+from ._dispatch import BaseDispatchQueue, DispatchQueue, OverflowPolicy
+from ._hedge import HedgePolicy
 
 
 class Service:
+    HEDGE_WORKERS = int(HedgePolicy.MAX_BUDGET)
+    """Duplicates in flight at most; the budget of a HedgePolicy never allows more in a row."""
+
     def __init__(
         self,
         transport: BaseTransport,
         headers: Tuple[Header, ...] = (),
+        memoizer: Optional[Memoizer] = None,
+        interceptors: Sequence[Interceptor] = (),
+        hedge: Optional[HedgePolicy] = None,
     ) -> None:
+        """
+        :param interceptors: Wrap every transport.send and transport.stream call, the first one outermost.
+        :param hedge: Send a duplicate of a slow idempotent request and take the first response. The other one can't
+                      be interrupted and finishes in the background within the transport timeouts. Streams are not
+                      hedged.
+        """
         self._transport = transport
         self._headers: Tuple[Header, ...] = headers
+        self._memoizer = memoizer
+        self._hedge = hedge
+        self._hedge_executor: Optional[futures.ThreadPoolExecutor] = None
+        self._hedge_executor_lock = threading.Lock()
+        self._hedge_primaries = batch_concurrency(None, transport.max_connections)
+        self._hedge_primary_slots = threading.BoundedSemaphore(self._hedge_primaries)
+        self._hedge_slots = threading.BoundedSemaphore(self.HEDGE_WORKERS)
+        self._send_chain = compile_send(interceptors, transport.send)
+        self._stream_chain = compile_stream(interceptors, transport.stream)
 
     @property
     def headers(self) -> Tuple[Header, ...]:
         return self._headers
 
-    def request(self, request: Request) -> Response:
-        with self._managed_transport() as transport:
-            sent_request, response = transport.send(request)
-            self._validate_response(sent_request, response)
+    def prepare(
+        self,
+        method: HttpMethod,
+        path: str,
+        headers: Tuple[Header, ...] = (),
+        params: Optional[dict] = None,
+    ) -> PreparedRequest:
+        """
+        Compile an endpoint template together with the service headers.
+
+        Send it with self.request(prepared.build(path_params=..., ...)), passing only the parts that vary.
+        """
+        return PreparedRequest(method=method, path=path, headers=self.headers + headers, params=params)
+
+    def request(self, request: Request, memoize: bool = False) -> Response:
+        """
+        :param memoize: Serve the response from the memoizer of the service, storing it there on a miss.
+        """
+        if memoize:
+            memoizer = self._get_memoizer()
+            key = memoizer.fingerprint(request)
+            response = memoizer.get(key)
+            if response is None:
+                response = self._send(request)
+                memoizer.set(key, response)
             return response
+        return self._send(request)
+
+    def _send(self, request: Request) -> Response:
+        if self._hedge is None or not self._hedge.applies(request):
+            return self._send_once(request)
+        return self._send_hedged(request, self._hedge)
+
+    def _send_hedged(self, request: Request, hedge: HedgePolicy) -> Response:
+        """
+        The primary attempt and the duplicate run on the hedge pool, leaving the caller free to take whichever
+        responds first. The pool has a thread for every connection of the transport and every duplicate the budget
+        allows, so neither waits in its queue, which would count against the delay. When all the primary threads are
+        busy the request is sent on the caller thread without hedging.
+        """
+        delay = hedge.delay
+        if delay is None or not self._hedge_primary_slots.acquire(blocking=False):
+            return self._send_timed(request, hedge)[1]
+
+        primary = self._submit_attempt(request, hedge, self._hedge_primary_slots)
+        attempts = [primary]
+        done, _ = futures.wait(attempts, timeout=delay)
+        if not done and self._hedge_slots.acquire(blocking=False):
+            if hedge.try_hedge():
+                attempts.append(self._submit_attempt(request, hedge, self._hedge_slots))
+            else:
+                self._hedge_slots.release()
+
+        error: Optional[BaseException] = None
+        pending = set(attempts)
+        while pending:
+            done, pending = futures.wait(pending, return_when=futures.FIRST_COMPLETED)
+            for attempt in filter(done.__contains__, attempts):
+                attempt_error = attempt.exception()
+                if attempt_error is None:
+                    sent_request, response = attempt.result()
+                    if len(attempts) > 1:
+                        hedge.record_hedge(sent_request, won=attempt is not primary)
+                    return response
+                error = error or attempt_error
+        assert error is not None
+        if len(attempts) > 1:
+            hedge.record_hedge(error.request if isinstance(error, ServiceError) else None, won=False)
+        raise error
+
+    def _submit_attempt(
+        self, request: Request, hedge: HedgePolicy, slots: threading.BoundedSemaphore
+    ) -> "futures.Future[Tuple[SentRequest, Response]]":
+        attempt = self._get_hedge_executor().submit(contextvars.copy_context().run, self._send_timed, request, hedge)
+        attempt.add_done_callback(lambda _: slots.release())
+        return attempt
+
+    def _send_timed(self, request: Request, hedge: HedgePolicy) -> Tuple[SentRequest, Response]:
+        started = time.monotonic()
+        sent_request, response = self._exchange(request)
+        hedge.record_latency(time.monotonic() - started)
+        return sent_request, response
+
+    def _get_hedge_executor(self) -> futures.ThreadPoolExecutor:
+        with self._hedge_executor_lock:
+            if self._hedge_executor is None:
+                self._hedge_executor = futures.ThreadPoolExecutor(
+                    max_workers=self._hedge_primaries + self.HEDGE_WORKERS, thread_name_prefix="httptoolkit-hedge"
+                )
+            return self._hedge_executor
+
+    def _send_once(self, request: Request) -> Response:
+        return self._exchange(request)[1]
+
+    def _exchange(self, request: Request) -> Tuple[SentRequest, Response]:
+        with self._managed_transport():
+            sent_request, response = self._send_chain(request)
+            self._validate_response(sent_request, response)
+            return sent_request, response
+
+    def _get_memoizer(self) -> Memoizer:
+        if self._memoizer is None:
+            raise RuntimeError("memoize requires a memoizer passed to the service")
+        return self._memoizer
+
+    def map(
+        self,
+        requests: Iterable[Request],
+        concurrency: Optional[int] = None,
+        errors: ErrorPolicy = ErrorPolicy.RAISE,
+        timeout_in_seconds: Optional[float] = None,
+    ) -> Iterator[BatchResult]:
+        """
+        Send the requests from a thread pool with at most concurrency of them in flight, yielding the results in
+        completion order. By default concurrency is the connection limit of the transport.
+
+        Requests are taken from the iterable only when a thread is free. When the batch stops, because of an error,
+        the deadline or the consumer closing the iterator, no more requests are sent; the ones in flight can't be
+        interrupted and finish in the background within the transport timeouts.
+
+        :param errors: What to do with a request that raised ServiceError.
+        :param timeout_in_seconds: Deadline for the whole batch; concurrent.futures.TimeoutError is raised when it is
+                                   reached.
+        """
+        concurrency = batch_concurrency(concurrency, self._transport.max_connections)
+        errors = ErrorPolicy(errors)
+        deadline = None if timeout_in_seconds is None else time.monotonic() + timeout_in_seconds
+        items = enumerate(requests)
+        pending: Dict["futures.Future[Response]", Tuple[int, Request]] = {}
+        executor = futures.ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="httptoolkit-batch")
+        try:
+            while True:
+                while len(pending) < concurrency:
+                    item = next(items, None)
+                    if item is None:
+                        break
+                    # every request runs in a copy of the caller context, e.g. to keep its current span
+                    pending[executor.submit(contextvars.copy_context().run, self.request, item[1])] = item
+                if not pending:
+                    return
+
+                timeout = None if deadline is None else deadline - time.monotonic()
+                if timeout is not None and timeout <= 0:
+                    raise futures.TimeoutError()
+                done, _ = futures.wait(pending, timeout=timeout, return_when=futures.FIRST_COMPLETED)
+                if not done:
+                    raise futures.TimeoutError()
+
+                for future in done:
+                    index, request = pending.pop(future)
+                    try:
+                        response = future.result()
+                    except ServiceError as exc:
+                        if errors is ErrorPolicy.RAISE:
+                            raise
+                        if errors is ErrorPolicy.COLLECT:
+                            yield BatchResult(index=index, request=request, error=exc)
+                        continue
+                    yield BatchResult(index=index, request=request, response=response)
+        finally:
+            executor.shutdown(wait=False)
+
+    def gather(
+        self,
+        requests: Iterable[Request],
+        concurrency: Optional[int] = None,
+        errors: ErrorPolicy = ErrorPolicy.RAISE,
+        timeout_in_seconds: Optional[float] = None,
+    ) -> List[BatchResult]:
+        """
+        Like map, but waits for the whole batch.
+
+        :return: The results in the order of the requests.
+        """
+        results = self.map(requests, concurrency=concurrency, errors=errors, timeout_in_seconds=timeout_in_seconds)
+        return sorted(results, key=attrgetter("index"))
+
+    def dispatch_queue(
+        self,
+        max_size: int = BaseDispatchQueue.DEFAULT_MAX_SIZE,
+        overflow: OverflowPolicy = OverflowPolicy.DROP_OLDEST,
+        workers: int = BaseDispatchQueue.DEFAULT_WORKERS,
+    ) -> DispatchQueue:
+        """
+        :return: Queue sending requests of this service in the background, e.g. for telemetry or audit calls.
+        """
+        return DispatchQueue(self, max_size=max_size, overflow=overflow, workers=workers)
 
     def post(
         self,
@@ -38,6 +252,7 @@ class Service:
         body: Optional[str] = None,
         json: Optional[Union[dict, List]] = None,
         files: Optional[Dict[str, Union[BinaryIO, Tuple[str, BinaryIO, str]]]] = None,
+        memoize: bool = False,
     ) -> Response:
         request = Request(
             method=HttpMethod.POST,
@@ -48,7 +263,7 @@ class Service:
             json=json,
             files=files,
         )
-        return self.request(request)
+        return self.request(request, memoize=memoize)
 
     def patch(
         self,
@@ -58,6 +273,7 @@ class Service:
         body: Optional[str] = None,
         json: Optional[Union[dict, List]] = None,
         files: Optional[Dict[str, Union[BinaryIO, Tuple[str, BinaryIO, str]]]] = None,
+        memoize: bool = False,
     ) -> Response:
         request = Request(
             method=HttpMethod.PATCH,
@@ -68,7 +284,7 @@ class Service:
             json=json,
             files=files,
         )
-        return self.request(request)
+        return self.request(request, memoize=memoize)
 
     def put(
         self,
@@ -78,6 +294,7 @@ class Service:
         body: Optional[str] = None,
         json: Optional[Union[dict, List]] = None,
         files: Optional[Dict[str, Union[BinaryIO, Tuple[str, BinaryIO, str]]]] = None,
+        memoize: bool = False,
     ) -> Response:
         request = Request(
             method=HttpMethod.PUT,
@@ -88,7 +305,7 @@ class Service:
             json=json,
             files=files,
         )
-        return self.request(request)
+        return self.request(request, memoize=memoize)
 
     def delete(
         self,
@@ -98,6 +315,7 @@ class Service:
         body: Optional[str] = None,
         json: Optional[Union[dict, List]] = None,
         files: Optional[Dict[str, Union[BinaryIO, Tuple[str, BinaryIO, str]]]] = None,
+        memoize: bool = False,
     ) -> Response:
         request = Request(
             method=HttpMethod.DELETE,
@@ -108,13 +326,14 @@ class Service:
             json=json,
             files=files,
         )
-        return self.request(request)
+        return self.request(request, memoize=memoize)
 
     def get(
         self,
         path: str,
         headers: Tuple[Header, ...] = (),
         params: Optional[dict] = None,
+        memoize: bool = False,
     ) -> Response:
         request = Request(
             method=HttpMethod.GET,
@@ -125,22 +344,22 @@ class Service:
             json=None,
             files=None,
         )
-        return self.request(request)
+        return self.request(request, memoize=memoize)
 
-    @staticmethod
-    def _validate_response(sent_request: SentRequest, response: BaseResponse) -> None:
+    def _validate_response(self, sent_request: SentRequest, response: BaseResponse) -> None:
         if not response.ok:
             if isinstance(response, StreamResponse):
                 response.read()
-            raise HttpError(sent_request, response)
+            history = self._transport.history
+            raise HttpError(sent_request, response, history=() if history is None else tuple(history.records()))
 
     @contextmanager
     def stream_request(
         self,
         request: Request,
     ) -> Iterator[StreamResponse]:
-        with self._managed_transport() as transport:
-            with transport.stream(request) as (sent_request, stream_response):
+        with self._managed_transport():
+            with self._stream_chain(request) as (sent_request, stream_response):
                 self._validate_response(sent_request, stream_response)
                 yield stream_response
 
@@ -257,4 +476,4 @@ class Service:
             yield self._transport
 
         except TransportError as exc:
-            raise ServiceError(exc.request) from exc
+            raise ServiceError(exc.request, history=exc.history) from exc
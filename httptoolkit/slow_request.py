@@ -0,0 +1,80 @@
+from dataclasses import asdict
+from typing import Dict, Mapping, Optional, Tuple
+
+from httptoolkit.response_log_record import ResponseLogRecord
+from httptoolkit.timings import Timings
+
+
+class SlowRequestThresholds:
+    """
+    Durations in seconds above which a request is logged as slow: a default one and overrides per route (the request
+    path or the PreparedRequest path pattern). None disables the detection.
+    """
+
+    def __init__(
+        self, default: Optional[float] = None, routes: Optional[Mapping[str, Optional[float]]] = None
+    ) -> None:
+        self.default = default
+        self.routes: Dict[str, Optional[float]] = dict(routes or {})
+
+    def get(self, route: str) -> Optional[float]:
+        return self.routes.get(route, self.default)
+
+
+slow_request_thresholds = SlowRequestThresholds()
+"""Global thresholds, used by transports that are not given their own."""
+
+
+class SlowRequestLogRecord:
+    """
+    Record of a request that took longer than its threshold, with the per-attempt breakdown, the phase timings of
+    every attempt and a request summary.
+    """
+
+    _TEMPLATE = "Slow request {method} {url}: {elapsed_ms} ms (threshold: {threshold_ms} ms, attempts: {attempts})"
+    _ATTEMPT_TEMPLATE = "; attempt {number}: {phases}"
+
+    def __init__(self, completion: ResponseLogRecord, threshold: float) -> None:
+        self._completion = completion
+        self._threshold = threshold
+
+    def __str__(self) -> str:
+        message = self._TEMPLATE.format(
+            **{
+                **self.args(),
+                "elapsed_ms": round(self._completion.elapsed * 1000),
+                "threshold_ms": round(self._threshold * 1000),
+                "attempts": len(self._completion.attempts),
+            }
+        )
+        for number, timings in enumerate(self._timings(), start=1):
+            phases = ", ".join(
+                f"{phase} {round(duration * 1000)} ms"
+                for phase, duration in asdict(timings).items()
+                if duration is not None
+            )
+            if phases:
+                message += self._ATTEMPT_TEMPLATE.format(number=number, phases=phases)
+        return message
+
+    def args(self) -> dict:
+        request = self._completion.request
+        response = self._completion.response
+        error = self._completion.error
+        return {
+            "method": request.method.upper(),
+            "url": request.url,
+            "route": request.route,
+            "request_headers": request.filtered_headers,
+            "status_code": None if response is None else response.status_code,
+            "error": None if error is None else type(error).__name__,
+            "elapsed": self._completion.elapsed,
+            "threshold": self._threshold,
+            "attempts": tuple(self._completion.attempts),
+            "timings": self._timings(),
+        }
+
+    def _timings(self) -> Tuple[Timings, ...]:
+        if self._completion.timings is None:
+            return ()
+        return tuple(self._completion.timings.attempts)
@@ -0,0 +1,114 @@
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, FrozenSet, List, Optional
+
+
+@dataclass(frozen=True)
+class ThrottleStats:
+    requests: int
+    """Requests in the window, the rejected ones included."""
+    accepts: int
+    """Requests in the window that the upstream accepted."""
+    rejected: int
+    """Requests rejected since the throttle was made."""
+    rejection_probability: float
+
+
+class AdaptiveThrottle:
+    """
+    Client-side adaptive throttling: once the upstream accepts too few requests, the client rejects new ones locally
+    with probability max(0, (requests - k * accepts) / (requests + 1)) over a sliding window.
+
+    A request is accepted when it gets a response with a status other than the overload ones; errors without a
+    response are not. An allowed request is counted only once its outcome is recorded, so requests that never reach
+    the upstream, e.g. rejected by a rate limiter, don't raise the rejection probability. Lower k rejects sooner;
+    k = 2 lets through twice the requests the upstream accepts.
+    """
+
+    DEFAULT_K = 2.0
+    DEFAULT_WINDOW_IN_SECONDS = 120.0
+    DEFAULT_BUCKETS = 120
+    DEFAULT_OVERLOAD_STATUS_CODES = frozenset({429, 503})
+
+    def __init__(
+        self,
+        k: float = DEFAULT_K,
+        window_in_seconds: float = DEFAULT_WINDOW_IN_SECONDS,
+        buckets: int = DEFAULT_BUCKETS,
+        overload_status_codes: FrozenSet[int] = DEFAULT_OVERLOAD_STATUS_CODES,
+        random_source: Callable[[], float] = random.random,
+    ) -> None:
+        """
+        :param buckets: How many parts the window slides by.
+        """
+        if k <= 0 or window_in_seconds <= 0 or buckets < 1:
+            raise RuntimeError("k and window_in_seconds must be positive and buckets at least 1")
+        self._k = k
+        self._bucket_width = window_in_seconds / buckets
+        self._overload_status_codes = overload_status_codes
+        self._random = random_source
+        self._requests: List[int] = [0] * buckets
+        self._accepts: List[int] = [0] * buckets
+        self._total_requests = 0
+        self._total_accepts = 0
+        self._position = 0
+        self._bucket_end = time.monotonic() + self._bucket_width
+        self._rejected = 0
+        self._lock = threading.Lock()
+
+    @property
+    def stats(self) -> ThrottleStats:
+        with self._lock:
+            self._slide(time.monotonic())
+            return ThrottleStats(
+                requests=self._total_requests,
+                accepts=self._total_accepts,
+                rejected=self._rejected,
+                rejection_probability=self._probability(),
+            )
+
+    def allow(self) -> bool:
+        """
+        Decide on a new request; a rejected one is counted at once.
+
+        :return: False if the request should be rejected locally.
+        """
+        with self._lock:
+            self._slide(time.monotonic())
+            probability = self._probability()
+            if probability and self._random() < probability:
+                self._requests[self._position] += 1
+                self._total_requests += 1
+                self._rejected += 1
+                return False
+            return True
+
+    def record(self, status_code: Optional[int]) -> None:
+        """
+        Count an allowed request that was sent, with its response status or None for an error without a response.
+        """
+        accepted = status_code is not None and status_code not in self._overload_status_codes
+        with self._lock:
+            self._slide(time.monotonic())
+            self._requests[self._position] += 1
+            self._total_requests += 1
+            if accepted:
+                self._accepts[self._position] += 1
+                self._total_accepts += 1
+
+    def _probability(self) -> float:
+        return max(0.0, (self._total_requests - self._k * self._total_accepts) / (self._total_requests + 1))
+
+    def _slide(self, now: float) -> None:
+        if now < self._bucket_end:
+            return
+        passed = int((now - self._bucket_end) // self._bucket_width) + 1
+        for _ in range(min(passed, len(self._requests))):
+            self._position = (self._position + 1) % len(self._requests)
+            self._total_requests -= self._requests[self._position]
+            self._total_accepts -= self._accepts[self._position]
+            self._requests[self._position] = 0
+            self._accepts[self._position] = 0
+        self._bucket_end += passed * self._bucket_width
@@ -0,0 +1,83 @@
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+
+@dataclass
+class Timings:
+    """
+    Durations in seconds of the phases of one attempt to send a request; None for a phase that did not happen, e.g.
+    connect and tls on a reused connection.
+
+    pool_wait: from the start of the attempt until a connection was being opened or used.
+    connect: TCP connect, including the DNS lookup, which httpcore does not trace separately.
+    tls: TLS handshake.
+    request_write: writing the request headers and body.
+    ttfb: from the end of the request write until the response headers were received.
+    body: receiving the response body; for streams it lasts until the body is consumed.
+    """
+
+    pool_wait: Optional[float] = None
+    connect: Optional[float] = None
+    tls: Optional[float] = None
+    request_write: Optional[float] = None
+    ttfb: Optional[float] = None
+    body: Optional[float] = None
+
+
+class TimingsRecorder:
+    """
+    Collects Timings for every attempt from the httpcore trace extension of a request.
+    """
+
+    _PHASES = {
+        "connect_tcp": "connect",
+        "start_tls": "tls",
+        "receive_response_body": "body",
+    }
+
+    def __init__(self) -> None:
+        self.attempts: List[Timings] = []
+        self._attempt_started = 0.0
+        self._phase_started: Dict[str, float] = {}
+        self._written_at: Optional[float] = None
+
+    @property
+    def last(self) -> Optional[Timings]:
+        return self.attempts[-1] if self.attempts else None
+
+    def start_attempt(self) -> None:
+        self.attempts.append(Timings())
+        self._attempt_started = time.perf_counter()
+        self._phase_started = {}
+        self._written_at = None
+
+    def trace(self, name: str, info: Dict[str, Any]) -> None:
+        """
+        Callback of the httpcore trace extension; name is e.g. "http11.send_request_headers.started".
+        """
+        timings = self.last
+        if timings is None:
+            return
+        now = time.perf_counter()
+        phase, _, stage = name.partition(".")[2].rpartition(".")
+
+        if stage == "started":
+            if timings.pool_wait is None:
+                timings.pool_wait = now - self._attempt_started
+            self._phase_started[phase] = now
+            return
+
+        started = self._phase_started.pop(phase, None)
+        if started is None:
+            return
+        if phase in ("send_request_headers", "send_request_body"):
+            timings.request_write = (timings.request_write or 0.0) + now - started
+            self._written_at = now
+        elif phase == "receive_response_headers":
+            timings.ttfb = now - (self._written_at or started)
+        elif phase in self._PHASES:
+            setattr(timings, self._PHASES[phase], now - started)
+
+    async def atrace(self, name: str, info: Dict[str, Any]) -> None:
+        self.trace(name, info)
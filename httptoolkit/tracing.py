@@ -0,0 +1,285 @@
+import random
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, MutableMapping, Optional, Union
+from urllib.parse import SplitResult, unquote_plus, urlsplit
+
+from httptoolkit.header import KnownSensitiveHeaders, known_sensitive_headers
+from httptoolkit.retry import Attempt
+from httptoolkit.sent_request import SentRequest
+
+
+@dataclass(frozen=True)
+class SpanContext:
+    """
+    Ids of a span and its sampled flag, as propagated by the W3C traceparent header; ids are lowercase hex.
+    """
+
+    trace_id: str
+    span_id: str
+    sampled: bool = True
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.sampled else '00'}"
+
+    @classmethod
+    def from_traceparent(cls, traceparent: str) -> Optional["SpanContext"]:
+        """
+        :return: The remote parent described by the header, e.g. of the incoming request being served; None if the
+                 header is not valid.
+        """
+        parts = traceparent.strip().split("-")
+        if len(parts) < 4 or (parts[0] == "00" and len(parts) != 4):
+            return None
+        version, trace_id, span_id, flags = parts[:4]
+        if (
+            [len(part) for part in (version, trace_id, span_id, flags)] != [2, 32, 16, 2]
+            or not all(_is_lower_hex(part) for part in (version, trace_id, span_id, flags))
+            or version == "ff"
+            or int(trace_id, 16) == 0
+            or int(span_id, 16) == 0
+        ):
+            return None
+        return cls(trace_id=trace_id, span_id=span_id, sampled=bool(int(flags, 16) & 1))
+
+
+def _is_lower_hex(value: str) -> bool:
+    return all(char in "0123456789abcdef" for char in value)
+
+
+Parent = Union["Span", SpanContext]
+
+# one variable for all the tracers, so that a span of any of them is the parent of the spans started inside
+_current_parent: ContextVar[Optional[Parent]] = ContextVar("httptoolkit_current_span", default=None)
+
+# names of the query parameters, besides the known sensitive headers, whose values are filtered out of url.full
+known_sensitive_query_params = KnownSensitiveHeaders(
+    [
+        "access_token",
+        "api_key",
+        "apikey",
+        "AWSAccessKeyId",
+        "password",
+        "Signature",
+        "sig",
+        "token",
+        "X-Goog-Signature",
+    ]
+)
+
+
+@dataclass
+class Span:
+    """
+    Finished or running span; ids are lowercase hex as in the W3C trace context. A span that is not sampled, because
+    its parent was not, is propagated but not exported.
+    """
+
+    name: str
+    trace_id: str
+    span_id: str
+    parent_span_id: Optional[str]
+    kind: str
+    start_time_ns: int
+    end_time_ns: Optional[int] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    status: str = "UNSET"
+    status_description: Optional[str] = None
+    sampled: bool = True
+
+    @property
+    def context(self) -> SpanContext:
+        return SpanContext(trace_id=self.trace_id, span_id=self.span_id, sampled=self.sampled)
+
+    @property
+    def traceparent(self) -> str:
+        return self.context.traceparent
+
+
+class BaseSpanExporter(ABC):
+    @abstractmethod
+    def export(self, span: Span) -> None:  # pragma: no cover
+        pass
+
+
+class InMemorySpanExporter(BaseSpanExporter):
+    """
+    Keeps finished spans in memory, for tests and debugging.
+    """
+
+    def __init__(self) -> None:
+        self._spans: List[Span] = []
+        self._lock = threading.Lock()
+
+    @property
+    def spans(self) -> List[Span]:
+        with self._lock:
+            return list(self._spans)
+
+    def export(self, span: Span) -> None:
+        with self._lock:
+            self._spans.append(span)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._spans.clear()
+
+
+class Tracer:
+    """
+    Creates spans following the OpenTelemetry HTTP semantic conventions and exports them once they end.
+
+    The current parent is kept in a context variable shared by all the tracers, so spans started with
+    start_as_current_span, and remote parents attached with attach, become the parents of the request spans started in
+    the same thread or task, whichever tracer started them. A span has the sampled flag of its parent; root spans are
+    sampled. The credentials of url.full, and the values of its sensitive query parameters, are filtered out.
+    """
+
+    def __init__(self, exporter: BaseSpanExporter) -> None:
+        self._exporter = exporter
+
+    @property
+    def current_span(self) -> Optional[Parent]:
+        return _current_parent.get()
+
+    def start_span(
+        self,
+        name: str,
+        kind: str = "INTERNAL",
+        parent: Optional[Parent] = None,
+        attributes: Optional[Dict[str, Any]] = None,
+    ) -> Span:
+        if parent is None:
+            parent = _current_parent.get()
+        return Span(
+            name=name,
+            trace_id=parent.trace_id if parent is not None else f"{random.getrandbits(128):032x}",
+            span_id=f"{random.getrandbits(64):016x}",
+            parent_span_id=None if parent is None else parent.span_id,
+            kind=kind,
+            start_time_ns=time.time_ns(),
+            attributes=attributes or {},
+            sampled=True if parent is None else parent.sampled,
+        )
+
+    def end_span(self, span: Span, error: Optional[str] = None) -> None:
+        span.end_time_ns = time.time_ns()
+        if error is not None:
+            span.status = "ERROR"
+            span.status_description = error
+        if span.sampled:
+            self._exporter.export(span)
+
+    @contextmanager
+    def attach(self, parent: Optional[Parent]) -> Iterator[None]:
+        """
+        Make the parent, e.g. SpanContext.from_traceparent of the incoming request or the context of the span of
+        another tracing library, the parent of the spans started inside; None leaves the current parent.
+        """
+        if parent is None:
+            yield
+            return
+        token = _current_parent.set(parent)
+        try:
+            yield
+        finally:
+            _current_parent.reset(token)
+
+    @contextmanager
+    def start_as_current_span(
+        self, name: str, attributes: Optional[Dict[str, Any]] = None, parent: Optional[Parent] = None
+    ) -> Iterator[Span]:
+        span = self.start_span(name, parent=parent, attributes=attributes)
+        token = _current_parent.set(span)
+        error = None
+        try:
+            yield span
+        except BaseException as exc:
+            error = type(exc).__name__
+            raise
+        finally:
+            _current_parent.reset(token)
+            self.end_span(span, error)
+
+
+class RequestTrace:
+    """
+    Span of one logical request with a child span per attempt; the traceparent of the attempt span is injected into
+    the request headers before every attempt.
+    """
+
+    def __init__(self, tracer: Tracer, request: SentRequest) -> None:
+        self._tracer = tracer
+        self._attributes = self._request_attributes(request)
+        self._span = tracer.start_span(request.method.upper(), kind="CLIENT", attributes=dict(self._attributes))
+        self._attempt_span: Optional[Span] = None
+        self._attempt_count = 0
+
+    @property
+    def span(self) -> Span:
+        return self._span
+
+    def start_attempt(self, headers: MutableMapping[str, str]) -> None:
+        attributes = dict(self._attributes)
+        if self._attempt_count:
+            attributes["http.request.resend_count"] = self._attempt_count
+        self._attempt_count += 1
+        self._attempt_span = self._tracer.start_span(
+            self._span.name, kind="CLIENT", parent=self._span, attributes=attributes
+        )
+        headers["traceparent"] = self._attempt_span.traceparent
+
+    def end_attempt(self, attempt: Attempt) -> None:
+        if self._attempt_span is None:
+            return
+        self._end(self._attempt_span, attempt.status_code, attempt.error)
+        self._attempt_span = None
+
+    def finish(self, status_code: Optional[int] = None, error: Optional[str] = None) -> None:
+        if self._attempt_count > 1:
+            self._span.attributes["http.request.resend_count"] = self._attempt_count - 1
+        self._end(self._span, status_code, error)
+
+    def _end(self, span: Span, status_code: Optional[int], error: Optional[str]) -> None:
+        if status_code is not None:
+            span.attributes["http.response.status_code"] = status_code
+            if status_code >= 400 and error is None:
+                error = str(status_code)
+        if error is not None:
+            span.attributes["error.type"] = error
+        self._tracer.end_span(span, error)
+
+    @staticmethod
+    def _request_attributes(request: SentRequest) -> Dict[str, Any]:
+        url = urlsplit(request.url)
+        attributes: Dict[str, Any] = {
+            "http.request.method": request.method.upper(),
+            "url.full": _filtered_url(url),
+            "server.address": url.hostname,
+            "server.port": url.port or (443 if url.scheme == "https" else 80),
+            "http.route": request.route,
+        }
+        for header in request.headers:
+            attributes[f"http.request.header.{header.name.lower()}"] = [header.filtered_value]
+        return attributes
+
+
+def _filtered_url(url: SplitResult) -> str:
+    netloc = url.netloc
+    if "@" in netloc:
+        netloc = "[filtered]@" + netloc.rpartition("@")[2]
+    query = "&".join(_filtered_query_param(param) for param in url.query.split("&")) if url.query else ""
+    return url._replace(netloc=netloc, query=query).geturl()
+
+
+def _filtered_query_param(param: str) -> str:
+    name, separator, _ = param.partition("=")
+    name_text = unquote_plus(name)
+    if separator and (name_text in known_sensitive_query_params or name_text in known_sensitive_headers):
+        return f"{name}=[filtered]"
+    return param
@@ -3,6 +3,9 @@ from ._async_base import BaseAsyncTransport
 from ._httpx._base import BaseHttpxTransport
 from ._httpx._sync import HttpxTransport
 from ._httpx._async import AsyncHttpxTransport
+from ._caching._sync import CachingTransport
+from ._caching._async import AsyncCachingTransport
+from ._loop import BackgroundLoop, BackgroundLoopTransport
 
 __all__ = [
     "BaseTransport",
@@ -10,4 +13,8 @@ __all__ = [
     "BaseHttpxTransport",
     "HttpxTransport",
     "AsyncHttpxTransport",
+    "CachingTransport",
+    "AsyncCachingTransport",
+    "BackgroundLoop",
+    "BackgroundLoopTransport",
 ]
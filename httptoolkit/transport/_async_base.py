@@ -1,8 +1,9 @@
 from abc import abstractmethod, ABC
 from contextlib import asynccontextmanager
-from typing import Tuple, AsyncIterator
+from typing import AsyncIterator, Optional, Tuple
 
 from httptoolkit.request import Request
+from httptoolkit.request_history import RequestHistory
 from httptoolkit.response import Response, AsyncStreamResponse
 from httptoolkit.sent_request import SentRequest
 
@@ -16,3 +17,17 @@ class BaseAsyncTransport(ABC):
     @abstractmethod
     def stream(self, request: Request) -> AsyncIterator[Tuple[SentRequest, AsyncStreamResponse]]:  # pragma: no cover
         pass
+
+    @property
+    def max_connections(self) -> Optional[int]:
+        """
+        :return: How many connections the transport opens at most, None if it is not limited or not known.
+        """
+        return None
+
+    @property
+    def history(self) -> Optional[RequestHistory]:
+        """
+        :return: The records of the last requests of the transport, None if it doesn't keep them.
+        """
+        return None
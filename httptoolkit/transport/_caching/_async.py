@@ -0,0 +1,85 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional, Tuple
+
+from httptoolkit.cache import BaseCacheStore, CacheEntry, CachePolicy
+from httptoolkit.errors import TransportError
+from httptoolkit.request import Request
+from httptoolkit.request_history import RequestHistory
+from httptoolkit.response import AsyncStreamResponse, Response
+from httptoolkit.sent_request import SentRequest
+from httptoolkit.transport import BaseAsyncTransport
+from ._base import BaseCachingTransport
+
+
+class AsyncCachingTransport(BaseAsyncTransport, BaseCachingTransport):
+    """
+    Serves regular requests from a cache in front of another async transport.
+
+    Stale entries within the stale-while-revalidate window are returned at once and refreshed by a
+    background task, one per key. Streams are passed through to the wrapped transport.
+    """
+
+    def __init__(
+        self,
+        transport: BaseAsyncTransport,
+        store: Optional[BaseCacheStore] = None,
+        policy: Optional[CachePolicy] = None,
+        namespace: str = "",
+    ) -> None:
+        super().__init__(store=store, policy=policy, namespace=namespace)
+        self._transport = transport
+        self._refreshing: Dict[str, "asyncio.Task[None]"] = {}
+
+    @property
+    def max_connections(self) -> Optional[int]:
+        return self._transport.max_connections
+
+    @property
+    def history(self) -> Optional[RequestHistory]:
+        return self._transport.history
+
+    async def send(self, request: Request) -> Tuple[SentRequest, Response]:
+        if not self._policy.is_cacheable_request(request):
+            return await self._transport.send(request)
+
+        key = self._key(request)
+        entry = self._store.get(key)
+        if entry is not None:
+            now = time.time()
+            if entry.is_fresh(now):
+                return self._from_entry(entry)
+            if entry.is_usable_while_revalidating(now):
+                self._refresh_in_background(key, request, entry)
+                return self._from_entry(entry)
+
+        return await self._fetch(key, request, entry)
+
+    @asynccontextmanager
+    async def stream(self, request: Request) -> AsyncIterator[Tuple[SentRequest, AsyncStreamResponse]]:
+        async with self._transport.stream(request) as (sent_request, async_stream_response):
+            yield sent_request, async_stream_response
+
+    async def _fetch(self, key: str, request: Request, entry: Optional[CacheEntry]) -> Tuple[SentRequest, Response]:
+        try:
+            sent_request, response = await self._transport.send(self._conditional_request(request, entry))
+        except TransportError:
+            stale = self._stale_on_error(entry)
+            if stale is None:
+                raise
+            return stale
+        return self._process_response(key, entry, sent_request, response)
+
+    def _refresh_in_background(self, key: str, request: Request, entry: CacheEntry) -> None:
+        if key in self._refreshing:
+            return
+        task = asyncio.ensure_future(self._refresh(request, entry, key))
+        self._refreshing[key] = task
+        task.add_done_callback(lambda _: self._refreshing.pop(key, None))
+
+    async def _refresh(self, request: Request, entry: CacheEntry, key: str) -> None:
+        try:
+            await self._fetch(key, request, entry)
+        except Exception:
+            self._logger.warning("Background revalidation of %s failed", entry.sent_request.url, exc_info=True)
@@ -0,0 +1,78 @@
+import logging
+import time
+from typing import Optional, Tuple
+
+from httptoolkit.cache import (
+    BaseCacheStore,
+    CacheEntry,
+    CachedOriginalResponse,
+    CachedResponse,
+    CachePolicy,
+    MemoryCacheStore,
+)
+from httptoolkit.header import Header
+from httptoolkit.request import Request
+from httptoolkit.response import Response
+from httptoolkit.sent_request import SentRequest
+
+
+class BaseCachingTransport:
+    HTTP_NOT_MODIFIED_CODE = 304
+    HTTP_SERVER_ERROR_CODE = 500
+
+    def __init__(
+        self,
+        store: Optional[BaseCacheStore] = None,
+        policy: Optional[CachePolicy] = None,
+        namespace: str = "",
+    ) -> None:
+        self._store = store if store is not None else MemoryCacheStore()
+        self._policy = policy if policy is not None else CachePolicy()
+        self._namespace = namespace
+        self._logger = logging.getLogger(self.__class__.__module__)
+
+    def _key(self, request: Request) -> str:
+        return self._namespace + self._policy.key(request)
+
+    @staticmethod
+    def _from_entry(entry: CacheEntry) -> Tuple[SentRequest, Response]:
+        return entry.sent_request, CachedResponse(CachedOriginalResponse(entry))
+
+    @staticmethod
+    def _conditional_request(request: Request, entry: Optional[CacheEntry]) -> Request:
+        if entry is None:
+            return request
+        validators: Tuple[Header, ...] = ()
+        if entry.etag is not None:
+            validators += (Header(name="If-None-Match", value=entry.etag, is_sensitive=False),)
+        if entry.last_modified is not None:
+            validators += (Header(name="If-Modified-Since", value=entry.last_modified, is_sensitive=False),)
+        return request.set_new_headers(validators) if validators else request
+
+    def _process_response(
+        self,
+        key: str,
+        entry: Optional[CacheEntry],
+        sent_request: SentRequest,
+        response: Response,
+    ) -> Tuple[SentRequest, Response]:
+        now = time.time()
+        if entry is not None:
+            if response.status_code == self.HTTP_NOT_MODIFIED_CODE:
+                entry = self._policy.revalidate(entry, response, now)
+                self._store.set(key, entry)
+                return self._from_entry(entry)
+            if response.status_code >= self.HTTP_SERVER_ERROR_CODE and entry.is_usable_on_error(now):
+                self._logger.warning("Serving stale %s after response %s", sent_request.url, response.status_code)
+                return self._from_entry(entry)
+
+        new_entry = self._policy.build_entry(sent_request, response, now)
+        if new_entry is not None:
+            self._store.set(key, new_entry)
+        return sent_request, response
+
+    def _stale_on_error(self, entry: Optional[CacheEntry]) -> Optional[Tuple[SentRequest, Response]]:
+        if entry is not None and entry.is_usable_on_error(time.time()):
+            self._logger.warning("Serving stale %s after transport error", entry.sent_request.url, exc_info=True)
+            return self._from_entry(entry)
+        return None
@@ -0,0 +1,89 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional, Set, Tuple
+
+from httptoolkit.cache import BaseCacheStore, CacheEntry, CachePolicy
+from httptoolkit.errors import TransportError
+from httptoolkit.request import Request
+from httptoolkit.request_history import RequestHistory
+from httptoolkit.response import Response, StreamResponse
+from httptoolkit.sent_request import SentRequest
+from httptoolkit.transport import BaseTransport
+from ._base import BaseCachingTransport
+
+
+class CachingTransport(BaseTransport, BaseCachingTransport):
+    """
+    Serves regular requests from a cache in front of another transport.
+
+    Stale entries within the stale-while-revalidate window are returned at once and refreshed by a
+    background thread, one per key. Streams are passed through to the wrapped transport.
+    """
+
+    def __init__(
+        self,
+        transport: BaseTransport,
+        store: Optional[BaseCacheStore] = None,
+        policy: Optional[CachePolicy] = None,
+        namespace: str = "",
+    ) -> None:
+        super().__init__(store=store, policy=policy, namespace=namespace)
+        self._transport = transport
+        self._refreshing: Set[str] = set()
+        self._refreshing_lock = threading.Lock()
+
+    @property
+    def max_connections(self) -> Optional[int]:
+        return self._transport.max_connections
+
+    @property
+    def history(self) -> Optional[RequestHistory]:
+        return self._transport.history
+
+    def send(self, request: Request) -> Tuple[SentRequest, Response]:
+        if not self._policy.is_cacheable_request(request):
+            return self._transport.send(request)
+
+        key = self._key(request)
+        entry = self._store.get(key)
+        if entry is not None:
+            now = time.time()
+            if entry.is_fresh(now):
+                return self._from_entry(entry)
+            if entry.is_usable_while_revalidating(now):
+                self._refresh_in_background(key, request, entry)
+                return self._from_entry(entry)
+
+        return self._fetch(key, request, entry)
+
+    @contextmanager
+    def stream(self, request: Request) -> Iterator[Tuple[SentRequest, StreamResponse]]:
+        with self._transport.stream(request) as (sent_request, stream_response):
+            yield sent_request, stream_response
+
+    def _fetch(self, key: str, request: Request, entry: Optional[CacheEntry]) -> Tuple[SentRequest, Response]:
+        try:
+            sent_request, response = self._transport.send(self._conditional_request(request, entry))
+        except TransportError:
+            stale = self._stale_on_error(entry)
+            if stale is None:
+                raise
+            return stale
+        return self._process_response(key, entry, sent_request, response)
+
+    def _refresh_in_background(self, key: str, request: Request, entry: CacheEntry) -> None:
+        with self._refreshing_lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+        threading.Thread(target=self._refresh, args=(key, request, entry), daemon=True).start()
+
+    def _refresh(self, key: str, request: Request, entry: CacheEntry) -> None:
+        try:
+            self._fetch(key, request, entry)
+        except Exception:
+            self._logger.warning("Background revalidation of %s failed", entry.sent_request.url, exc_info=True)
+        finally:
+            with self._refreshing_lock:
+                self._refreshing.discard(key)
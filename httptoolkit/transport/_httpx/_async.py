@@ -1,7 +1,10 @@
+import asyncio
 from contextlib import asynccontextmanager
-from typing import AsyncIterator, Tuple
+from typing import AsyncIterator, Optional, Tuple
 
+from httptoolkit.concurrency_limit import Permit
 from httptoolkit.request import Request
+from httptoolkit.request_history import RequestHistory
 from httptoolkit.response import Response, AsyncStreamResponse
 from httptoolkit.transport._httpx._session._async import AsyncHttpxSession
 
@@ -13,16 +16,51 @@ from httptoolkit.transport import BaseAsyncTransport
 class AsyncHttpxTransport(BaseAsyncTransport, BaseHttpxTransport):
     _session_class = AsyncHttpxSession
 
+    @property
+    def max_connections(self) -> Optional[int]:
+        return self._max_connections
+
+    @property
+    def history(self) -> Optional[RequestHistory]:
+        return self._history
+
     async def send(self, request: Request) -> Tuple[SentRequest, Response]:
         httpx_request = self._build_httpx_request(request)
         sent_request = self._prepare_sent_request(request, httpx_request)
-        with self._managed_session(sent_request) as async_session:
-            return sent_request, Response(await async_session.send(httpx_request))
+        permit = await self._admit(sent_request)
+        completion = self._start_completion(sent_request)
+        with self._holding(permit) as observe:
+            with self._managed_session(sent_request, completion) as async_session:
+                response = await async_session.send(httpx_request, **self._session_kwargs(sent_request, completion))
+            observe(response)
+        self._finish_completion(completion, response)
+        return sent_request, Response(response, timings=self._last_timings(completion))
 
     @asynccontextmanager
     async def stream(self, request: Request) -> AsyncIterator[Tuple[SentRequest, AsyncStreamResponse]]:
         httpx_request = self._build_httpx_request(request)
         sent_request = self._prepare_sent_request(request, httpx_request)
-        with self._managed_session(sent_request) as async_session:
-            async with async_session.stream(httpx_request) as response:
-                yield sent_request, AsyncStreamResponse(response)
+        permit = await self._admit(sent_request)
+        completion = self._start_completion(sent_request)
+        with self._holding(permit) as observe:
+            with self._managed_session(sent_request, completion) as async_session:
+                async with async_session.stream(
+                    httpx_request, **self._session_kwargs(sent_request, completion)
+                ) as response:
+                    observe(response)
+                    yield sent_request, AsyncStreamResponse(response, timings=self._last_timings(completion))
+        self._finish_completion(completion, response)
+
+    async def _admit(self, request: SentRequest) -> Optional[Permit]:
+        """
+        Wait for the throttle, the rate limiter and the concurrency limiter to let the request through.
+
+        :return: The permit of the concurrency limiter, if there is one.
+        """
+        self._check_throttle(request)
+        delay = self._rate_limit_delay(request)
+        if delay:
+            await asyncio.sleep(delay)
+        if self._concurrency_limiter is None:
+            return None
+        return self._check_permit(request, await self._concurrency_limiter.acquire_async())
@@ -1,17 +1,37 @@
 import logging
 from abc import abstractmethod, ABC
 from contextlib import contextmanager
-from typing import Any, Callable, Iterator, List, Optional, Tuple, Type, Union, Iterable
+from typing import Any, Callable, Dict, Iterator, Optional, Sequence, Tuple, Type, Union, Iterable
+from weakref import WeakKeyDictionary
 
-from httpx import Request as OriginalRequest, ConnectError, ConnectTimeout
+from httpx import (
+    Headers,
+    Limits,
+    Request as OriginalRequest,
+    Response as OriginalResponse,
+    ConnectError,
+    ConnectTimeout,
+)
 
+from httptoolkit.concurrency_limit import ConcurrencyLimiter, Permit
 from httptoolkit.encoder import default_json_encoder
-from httptoolkit.errors import TransportError
+from httptoolkit.errors import ConcurrencyLimitError, RateLimitError, ThrottledError, TransportError
 from httptoolkit.header import Header
+from httptoolkit.log_sampling import LogSampler
+from httptoolkit.metrics import MetricsRegistry, transport_label
+from httptoolkit.prepared_request import PreparedRequest, TemplateRequest
+from httptoolkit.rate_limit import RateLimiter
 from httptoolkit.request import Request
+from httptoolkit.request_history import RequestHistory, RequestHistoryRecord
+from httptoolkit.response_log_record import ResponseLogRecord
 from httptoolkit.retry import RetryManager
 from httptoolkit.sent_request import SentRequest
+from httptoolkit.throttle import AdaptiveThrottle
+from httptoolkit.timings import Timings, TimingsRecorder
+from httptoolkit.tracing import RequestTrace, Tracer
+from httptoolkit.slow_request import SlowRequestLogRecord, SlowRequestThresholds, slow_request_thresholds
 from httptoolkit.sent_request_log_record import RequestLogRecord
+from ._sent_request import HttpxSentRequest
 
 
 class BaseHttpxTransport(ABC):
@@ -22,6 +42,8 @@ class BaseHttpxTransport(ABC):
     DEFAULT_RETRY_MAX_ATTEMPTS = 10
     DEFAULT_RETRY_BACKOFF_FACTOR = 0.1
     DEFAULT_ALLOW_POST_RETRY = False
+    DEFAULT_MAX_CONNECTIONS = 100
+    DEFAULT_MAX_KEEPALIVE_CONNECTIONS = 20
 
     def __init__(
         self,
@@ -35,6 +57,19 @@ class BaseHttpxTransport(ABC):
         proxies: Optional[dict] = None,
         json_encoder: Callable[[Any], str] = default_json_encoder,
         retry_status_codes: Iterable[int] = RetryManager.DEFAULT_STATUS_CODES,
+        log_completion: bool = False,
+        log_sampler: Optional[LogSampler] = None,
+        history: Optional[RequestHistory] = None,
+        slow_request_thresholds: Optional[SlowRequestThresholds] = None,
+        collect_timings: bool = False,
+        timings_hook: Optional[Callable[[SentRequest, Sequence[Timings]], None]] = None,
+        metrics: Optional[MetricsRegistry] = None,
+        metrics_name: Optional[str] = None,
+        tracer: Optional[Tracer] = None,
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+        concurrency_limiter: Optional[ConcurrencyLimiter] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        throttle: Optional[AdaptiveThrottle] = None,
     ) -> None:
         if proxies is None:
             proxies = {}
@@ -47,6 +82,7 @@ class BaseHttpxTransport(ABC):
         self._open_timeout_in_seconds = open_timeout_in_seconds
         self._read_timeout_in_seconds = read_timeout_in_seconds
         self._proxies = proxies
+        self._max_connections = max_connections
         self._session = self._session_class(
             retry_manager=RetryManager(
                 exceptions=self.DEFAULT_EXCEPTIONS,
@@ -58,9 +94,35 @@ class BaseHttpxTransport(ABC):
             ),
             allow_unverified_peer=allow_unverified_peer,
             proxies=self._proxies,
+            limits=Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=min(max_connections, self.DEFAULT_MAX_KEEPALIVE_CONNECTIONS),
+            ),
         )
         self._logger = logging.getLogger(self.__class__.__module__)
         self._json_encoder = json_encoder
+        self._log_completion = log_completion
+        self._log_sampler = log_sampler
+        self._history = history
+        self._slow_request_thresholds = slow_request_thresholds
+        self._collect_timings = collect_timings or timings_hook is not None
+        self._timings_hook = timings_hook
+        self._metrics = metrics
+        self._metrics_name = metrics_name or transport_label(base_url)
+        self._tracer = tracer
+        self._concurrency_limiter = concurrency_limiter
+        self._rate_limiter = rate_limiter
+        self._throttle = throttle
+        self._timeout_extension = {
+            "connect": self._open_timeout_in_seconds,
+            "read": self._read_timeout_in_seconds,
+            "write": None,
+            "pool": None,
+        }
+        self._url_prefix = self._base_url.rstrip("/") + "/"
+        self._compiled_templates: "WeakKeyDictionary[PreparedRequest, Dict[Tuple[Header, ...], Headers]]" = (
+            WeakKeyDictionary()
+        )
 
     @property
     @abstractmethod
@@ -71,6 +133,9 @@ class BaseHttpxTransport(ABC):
         self,
         request: Request,
     ) -> OriginalRequest:
+        if isinstance(request, TemplateRequest):
+            return self._build_httpx_request_from_template(request)
+
         headers, content, data = self._prepare_content(request)
         dict_headers = {header.name.lower(): header.value for header in headers + request.headers}
         httpx_request = self._session.build_request(
@@ -80,29 +145,131 @@ class BaseHttpxTransport(ABC):
             content=content,
             files=request.files,
             data=data,
-            extensions={
-                "timeout": {
-                    "connect": self._open_timeout_in_seconds,
-                    "read": self._read_timeout_in_seconds,
-                    "write": None,
-                    "pool": None,
-                }
-            },
+            extensions={"timeout": self._timeout_extension},
         )
         return httpx_request
 
+    def _build_httpx_request_from_template(self, request: TemplateRequest) -> OriginalRequest:
+        """
+        Build the request without Client.build_request: the session, content and static headers of the template are
+        merged once per transport, and the URL is a plain concatenation with the static query encoded in advance.
+        """
+        content_headers, content, data = self._prepare_content(request)
+
+        compiled = self._compiled_templates.get(request.template)
+        if compiled is None:
+            compiled = self._compiled_templates[request.template] = {}
+        headers = compiled.get(content_headers)
+        if headers is None:
+            headers = self._session.headers.copy()
+            headers.update(
+                {header.name.lower(): header.value for header in content_headers + request.template.headers}
+            )
+            compiled[content_headers] = headers
+
+        if request.dynamic_headers:
+            headers = headers.copy()
+            headers.update({header.name.lower(): header.value for header in request.dynamic_headers})
+
+        return OriginalRequest(
+            method=request.method,
+            url=self._url_prefix + request.full_path.lstrip("/"),
+            headers=headers,
+            content=content,
+            files=request.files,
+            data=data,
+            cookies=self._session.cookies or None,
+            extensions={"timeout": self._timeout_extension},
+        )
+
     @contextmanager
-    def _managed_session(self, request: SentRequest) -> Iterator[Any]:
-        self._log(request)
+    def _managed_session(
+        self,
+        request: SentRequest,
+        completion: Optional[ResponseLogRecord] = None,
+    ) -> Iterator[Any]:
+        if self._log(request) and completion is not None:
+            completion.sampled_out = True
 
         try:
             yield self._session
 
         except Exception as exc:
-            raise TransportError(request) from exc
+            self._finish_completion(completion, error=exc)
+            raise TransportError(request, history=self._history_records()) from exc
+
+    def _check_throttle(self, request: SentRequest) -> None:
+        if self._throttle is None or self._throttle.allow():
+            return
+        self._record_rejected(request, "throttled")
+        raise ThrottledError(request, history=self._history_records())
+
+    def _rate_limit_delay(self, request: SentRequest) -> float:
+        """
+        :return: Seconds to wait for the rate limiter before sending the request.
+        """
+        if self._rate_limiter is None:
+            return 0.0
+        delay = self._rate_limiter.reserve(request.route)
+        if delay is None:
+            self._record_rejected(request, "rate_limited")
+            raise RateLimitError(request, history=self._history_records())
+        return delay
+
+    def _record_rejected(self, request: SentRequest, reason: str) -> None:
+        if self._metrics is not None:
+            self._metrics.record_rejected(
+                transport=self._metrics_name,
+                method=request.method.upper(),
+                route=self._metrics.route(request),
+                reason=reason,
+            )
+
+    def _check_permit(self, request: SentRequest, permit: Optional[Permit]) -> Permit:
+        if permit is None:
+            self._record_rejected(request, "concurrency_limited")
+            raise ConcurrencyLimitError(request, history=self._history_records())
+        return permit
+
+    @contextmanager
+    def _holding(self, permit: Optional[Permit]) -> Iterator[Callable[[OriginalResponse], None]]:
+        """
+        Release the permit of the concurrency limiter once the request, or its stream, is done, and count its outcome
+        in the throttle.
 
-    def _encode_json(self, request_json: Union[dict, List]) -> Tuple[Tuple[Header, ...], Union[bytes, str]]:
-        body = self._json_encoder(request_json)
+        :return: Function to call with the response as soon as its headers are received.
+        """
+        throttle = self._throttle
+        if permit is None and throttle is None:
+            yield _ignore_response
+            return
+        observed = False
+
+        def observe(response: OriginalResponse) -> None:
+            nonlocal observed
+            observed = True
+            if permit is not None:
+                permit.observe(response.status_code)
+            if throttle is not None:
+                throttle.record(response.status_code)
+
+        try:
+            yield observe
+        except Exception:
+            if permit is not None:
+                permit.release(failed=True)
+            if throttle is not None and not observed:
+                throttle.record(None)
+            raise
+        except BaseException:
+            if permit is not None:
+                permit.ignore()
+            raise
+        if permit is not None:
+            permit.release()
+
+    def _encode_json(self, request: Request) -> Tuple[Tuple[Header, ...], Union[bytes, str]]:
+        body = request.encode_json(self._json_encoder)
         headers = (Header(name="Content-Type", value="application/json", is_sensitive=False),)
         return headers, body
 
@@ -119,7 +286,7 @@ class BaseHttpxTransport(ABC):
         if request.json is not None:
             if request.body is not None:
                 raise RuntimeError("json and body can't be sent together")
-            return *self._encode_json(request.json), None
+            return *self._encode_json(request), None
         return (), request.body, None
 
     def _prepare_sent_request(
@@ -127,21 +294,124 @@ class BaseHttpxTransport(ABC):
         request: Request,
         httpx_request: OriginalRequest,
     ) -> SentRequest:
-        set_headers_with_sensitive = {header.name.lower(): header.is_sensitive for header in request.headers}
         httpx_request.read()
-        content = httpx_request.content
-        httpx_headers = tuple(
-            Header(
-                name=header_name,
-                value=httpx_request.headers[header_name],
-                is_sensitive=set_headers_with_sensitive.get(header_name, False),
-            )
-            for header_name in httpx_request.headers
-        )
-        return SentRequest(
-            request=request, base_url=self._base_url, body=content, proxies=self._proxies, headers=httpx_headers
+        return HttpxSentRequest(
+            request=request, base_url=self._base_url, httpx_request=httpx_request, proxies=self._proxies
         )
 
-    def _log(self, request: SentRequest) -> None:
+    def _history_records(self) -> Tuple[RequestHistoryRecord, ...]:
+        if self._history is None:
+            return ()
+        return tuple(self._history.records())
+
+    def _start_completion(self, request: SentRequest) -> Optional[ResponseLogRecord]:
+        thresholds = self._slow_request_thresholds or slow_request_thresholds
+        slow_threshold = thresholds.get(request.route) if self._logger.isEnabledFor(logging.WARNING) else None
+        if (
+            slow_threshold is None
+            and self._history is None
+            and self._metrics is None
+            and self._tracer is None
+            and not self._collect_timings
+            and not (
+                (self._log_completion or self._log_sampler is not None) and self._logger.isEnabledFor(logging.INFO)
+            )
+        ):
+            return None
+        completion = ResponseLogRecord(request)
+        completion.slow_threshold = slow_threshold
+        if self._collect_timings or slow_threshold is not None:
+            # the phases of a slow request are part of its record
+            completion.timings = TimingsRecorder()
+        if self._tracer is not None:
+            completion.trace = RequestTrace(self._tracer, request)
+        return completion
+
+    def _session_kwargs(self, request: SentRequest, completion: Optional[ResponseLogRecord]) -> Dict[str, Any]:
+        kwargs: Dict[str, Any] = {}
+        if completion is not None:
+            kwargs.update(attempts=completion.attempts, timings=completion.timings, trace=completion.trace)
+        if self._rate_limiter is not None:
+            kwargs.update(rate_limiter=self._rate_limiter, route=request.route)
+        return kwargs
+
+    def _last_timings(self, completion: Optional[ResponseLogRecord]) -> Optional[Timings]:
+        if not self._collect_timings or completion is None or completion.timings is None:
+            return None
+        return completion.timings.last
+
+    def _finish_completion(
+        self,
+        completion: Optional[ResponseLogRecord],
+        response: Optional[OriginalResponse] = None,
+        error: Optional[BaseException] = None,
+    ) -> None:
+        if completion is None:
+            return
+        completion.finish(response, error)
+        if completion.sampled_out:
+            self._finish_sampled_out(completion)
+        if completion.trace is not None:
+            completion.trace.finish(
+                status_code=None if response is None else response.status_code,
+                error=None if error is None else type(error).__name__,
+            )
+        if self._timings_hook is not None and completion.timings is not None:
+            self._timings_hook(completion.request, tuple(completion.timings.attempts))
+        if self._metrics is not None:
+            self._metrics.record(
+                transport=self._metrics_name,
+                method=completion.request.method.upper(),
+                route=self._metrics.route(completion.request),
+                status_code=None if response is None else response.status_code,
+                elapsed=completion.elapsed,
+                size=None if response is None else response.num_bytes_downloaded,
+            )
+        if self._history is not None:
+            self._history.add(
+                method=completion.request.method,
+                route=completion.request.route,
+                status_code=None if response is None else response.status_code,
+                elapsed=completion.elapsed,
+                attempts=completion.attempts,
+                error=None if error is None else type(error).__name__,
+            )
+        if completion.slow_threshold is not None and completion.elapsed > completion.slow_threshold:
+            slow_request_log_record = SlowRequestLogRecord(completion, completion.slow_threshold)
+            self._logger.warning(slow_request_log_record, extra=slow_request_log_record.args())
+        if self._log_completion and not completion.suppressed and self._logger.isEnabledFor(logging.INFO):
+            self._logger.info(completion, extra=completion.args())
+
+    def _log(self, request: SentRequest) -> bool:
+        """
+        :return: Whether the record was sampled out; it is emitted later if the request fails, gets an unsuccessful
+                 response or is slow.
+        """
+        if not self._logger.isEnabledFor(logging.INFO):
+            return False
+        if self._log_sampler is not None and not self._log_sampler.sample(self._logger, request):
+            return True
+        self._emit_log(request)
+        return False
+
+    def _emit_log(self, request: SentRequest) -> None:
         request_log_record = RequestLogRecord(request)
         self._logger.info(request_log_record, extra=request_log_record.args())
+
+    def _finish_sampled_out(self, completion: ResponseLogRecord) -> None:
+        if self._log_sampler is None:  # pragma: no cover
+            return
+        response = completion.response
+        if (
+            completion.error is not None
+            or (response is not None and not response.is_success)
+            or self._log_sampler.is_slow(completion.elapsed)
+        ):
+            self._emit_log(completion.request)
+            return
+        self._log_sampler.suppress(self._logger)
+        completion.suppressed = True
+
+
+def _ignore_response(response: OriginalResponse) -> None:
+    pass
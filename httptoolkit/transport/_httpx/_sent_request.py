@@ -0,0 +1,46 @@
+from typing import Optional, Tuple, Union
+
+from httpx import Request as OriginalRequest
+
+from httptoolkit.header import Header
+from httptoolkit.request import Request
+from httptoolkit.sent_request import SentRequest
+
+
+class HttpxSentRequest(SentRequest):
+    """
+    SentRequest viewing the httpx request: the URL, headers and body are materialized only when accessed,
+    e.g. for logging or ServiceError. The headers are read from the httpx request on every access, so they include
+    the ones added to it later, such as the traceparent of each attempt. Pickling stores a plain SentRequest with the
+    materialized values.
+    """
+
+    def __init__(
+        self,
+        request: Request,
+        base_url: str,
+        httpx_request: OriginalRequest,
+        proxies: Optional[dict] = None,
+    ) -> None:
+        super().__init__(request=request, base_url=base_url, body=None, proxies=proxies)
+        self._httpx_request = httpx_request
+
+    @property
+    def headers(self) -> Tuple[Header, ...]:
+        sensitive_headers = {header.name.lower(): header.is_sensitive for header in self._request.headers}
+        httpx_headers = self._httpx_request.headers
+        return tuple(
+            Header(
+                name=header_name,
+                value=httpx_headers[header_name],
+                is_sensitive=sensitive_headers.get(header_name, False),
+            )
+            for header_name in httpx_headers
+        )
+
+    @property
+    def body(self) -> Optional[Union[bytes, str]]:
+        return self._httpx_request.content
+
+    def __reduce__(self):
+        return SentRequest, (self._request, self._base_url, self.body, self._proxies, self.headers)
@@ -1,11 +1,15 @@
 import time
 from contextlib import contextmanager
-from typing import Iterator, Optional
+from typing import Iterator, List, Optional
 
-from httpx import Client, HTTPTransport
+from httpx import Client, HTTPTransport, Limits
+from httpx._config import DEFAULT_LIMITS
 from httpx import Request as OriginalHttpxRequest
 from httpx import Response as OriginalHttpxResponse
-from httptoolkit.retry import RetryManager
+from httptoolkit.rate_limit import RateLimiter
+from httptoolkit.retry import Attempt, RetryManager
+from httptoolkit.timings import TimingsRecorder
+from httptoolkit.tracing import RequestTrace
 
 
 class HttpxSession(Client):
@@ -14,26 +18,78 @@ class HttpxSession(Client):
         retry_manager: RetryManager,
         allow_unverified_peer: Optional[bool] = False,
         proxies: Optional[dict] = None,
+        limits: Limits = DEFAULT_LIMITS,
     ) -> None:
         super().__init__(
             transport=HTTPTransport(
                 verify=not allow_unverified_peer,
+                limits=limits,
             ),
             proxies=proxies,
+            limits=limits,
         )
 
         self._retry_manager = retry_manager
 
-    def send(self, request: OriginalHttpxRequest, *args, **kwargs) -> OriginalHttpxResponse:
-        for retry in self._retry_manager.get_retries(request.method):
+    def send(
+        self,
+        request: OriginalHttpxRequest,
+        *args,
+        attempts: Optional[List[Attempt]] = None,
+        timings: Optional[TimingsRecorder] = None,
+        trace: Optional[RequestTrace] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        route: str = "",
+        **kwargs,
+    ) -> OriginalHttpxResponse:
+        """
+        :param attempts: If passed, every attempt is appended to it.
+        :param timings: If passed, it records the phase timings of every attempt.
+        :param trace: If passed, every attempt gets a span and its traceparent header.
+        :param rate_limiter: If passed, every retry waits for the rate limit of the route, and every response updates
+                             it; the first attempt is let through by the transport.
+        """
+        if timings is not None:
+            request.extensions = {**request.extensions, "trace": timings.trace}
+        for index, retry in enumerate(self._retry_manager.get_retries(request.method)):
+            if rate_limiter is not None and index:
+                time.sleep(rate_limiter.reserve(route, retry=True) or 0.0)
+            started = time.perf_counter()
+            if timings is not None:
+                timings.start_attempt()
+            if trace is not None:
+                trace.start_attempt(request.headers)
             with retry:
-                response = super().send(request, *args, **kwargs)
+                try:
+                    response = super().send(request, *args, **kwargs)
+                except Exception as exc:
+                    self._record_attempt(started, attempts, trace, error=type(exc).__name__)
+                    raise
+                self._record_attempt(started, attempts, trace, status_code=response.status_code)
+                if rate_limiter is not None:
+                    rate_limiter.update(route, response.status_code, response.headers)
                 retry.process_response(response)
                 return response
 
             # noinspection PyUnreachableCode
             time.sleep(retry.backoff)
 
+    @staticmethod
+    def _record_attempt(
+        started: float,
+        attempts: Optional[List[Attempt]],
+        trace: Optional[RequestTrace],
+        status_code: Optional[int] = None,
+        error: Optional[str] = None,
+    ) -> None:
+        if attempts is None and trace is None:
+            return
+        attempt = Attempt(elapsed=time.perf_counter() - started, status_code=status_code, error=error)
+        if attempts is not None:
+            attempts.append(attempt)
+        if trace is not None:
+            trace.end_attempt(attempt)
+
     @contextmanager
     def stream(self, request: OriginalHttpxRequest, *args, **kwargs) -> Iterator[OriginalHttpxResponse]:
         kwargs.update(request=request, stream=True)
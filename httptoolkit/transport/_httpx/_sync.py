@@ -1,7 +1,10 @@
+import time
 from contextlib import contextmanager
-from typing import Iterator, Tuple
+from typing import Iterator, Optional, Tuple
 
+from httptoolkit.concurrency_limit import Permit
 from httptoolkit.request import Request
+from httptoolkit.request_history import RequestHistory
 from httptoolkit.response import Response, StreamResponse
 from httptoolkit.transport._httpx._session._sync import HttpxSession
 
@@ -13,16 +16,49 @@ from httptoolkit.transport import BaseTransport
 class HttpxTransport(BaseTransport, BaseHttpxTransport):
     _session_class = HttpxSession
 
+    @property
+    def max_connections(self) -> Optional[int]:
+        return self._max_connections
+
+    @property
+    def history(self) -> Optional[RequestHistory]:
+        return self._history
+
     def send(self, request: Request) -> Tuple[SentRequest, Response]:
         httpx_request = self._build_httpx_request(request)
         sent_request = self._prepare_sent_request(request, httpx_request)
-        with self._managed_session(sent_request) as session:
-            return sent_request, Response(session.send(httpx_request))
+        permit = self._admit(sent_request)
+        completion = self._start_completion(sent_request)
+        with self._holding(permit) as observe:
+            with self._managed_session(sent_request, completion) as session:
+                response = session.send(httpx_request, **self._session_kwargs(sent_request, completion))
+            observe(response)
+        self._finish_completion(completion, response)
+        return sent_request, Response(response, timings=self._last_timings(completion))
 
     @contextmanager
     def stream(self, request: Request) -> Iterator[Tuple[SentRequest, StreamResponse]]:
         httpx_request = self._build_httpx_request(request)
         sent_request = self._prepare_sent_request(request, httpx_request)
-        with self._managed_session(sent_request) as session:
-            with session.stream(httpx_request) as response:
-                yield sent_request, StreamResponse(response)
+        permit = self._admit(sent_request)
+        completion = self._start_completion(sent_request)
+        with self._holding(permit) as observe:
+            with self._managed_session(sent_request, completion) as session:
+                with session.stream(httpx_request, **self._session_kwargs(sent_request, completion)) as response:
+                    observe(response)
+                    yield sent_request, StreamResponse(response, timings=self._last_timings(completion))
+        self._finish_completion(completion, response)
+
+    def _admit(self, request: SentRequest) -> Optional[Permit]:
+        """
+        Wait for the throttle, the rate limiter and the concurrency limiter to let the request through.
+
+        :return: The permit of the concurrency limiter, if there is one.
+        """
+        self._check_throttle(request)
+        delay = self._rate_limit_delay(request)
+        if delay:
+            time.sleep(delay)
+        if self._concurrency_limiter is None:
+            return None
+        return self._check_permit(request, self._concurrency_limiter.acquire())
@@ -0,0 +1,212 @@
+import asyncio
+import json
+import sys
+import threading
+from contextlib import contextmanager
+from datetime import timedelta
+from typing import Any, AsyncIterator, Callable, Coroutine, Iterator, MutableMapping, Optional, Tuple, TypeVar
+
+from httptoolkit.request import Request
+from httptoolkit.request_history import RequestHistory
+from httptoolkit.response import AsyncStreamResponse, Response, StreamResponse
+from httptoolkit.sent_request import SentRequest
+from ._async_base import BaseAsyncTransport
+from ._sync_base import BaseTransport
+
+T = TypeVar("T")
+
+_END = object()
+
+
+class BackgroundLoop:
+    """
+    Event loop running in a daemon thread, started on first use.
+
+    Coroutines are run on it from other threads, each in a copy of the context of the calling thread.
+    """
+
+    def __init__(self, name: str = "httptoolkit-loop") -> None:
+        self._name = name
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        if self._loop is None:
+            with self._lock:
+                if self._loop is None:
+                    loop = asyncio.new_event_loop()
+                    self._thread = threading.Thread(target=loop.run_forever, name=self._name, daemon=True)
+                    self._thread.start()
+                    self._loop = loop
+        return self._loop
+
+    def run(self, coroutine: Coroutine[Any, Any, T]) -> T:
+        """
+        Run the coroutine on the loop and block until it is done.
+        """
+        loop = self.loop
+        if threading.current_thread() is self._thread:
+            # it would never start, as the loop is blocked by this call
+            coroutine.close()
+            raise RuntimeError("the background loop can't wait for itself")
+        return asyncio.run_coroutine_threadsafe(coroutine, loop).result()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._loop is None:
+                return
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            if self._thread is not None:
+                self._thread.join()
+            self._loop.close()
+            self._loop = None
+            self._thread = None
+
+
+background_loop = BackgroundLoop()
+"""Loop shared by the BackgroundLoopTransports that are not given one."""
+
+
+class LoopOriginalResponse:
+    """
+    OriginalResponse implementation reading an AsyncStreamResponse through a BackgroundLoop.
+
+    Every chunk is received on the loop and handed to the calling thread.
+    """
+
+    def __init__(self, response: AsyncStreamResponse, loop: BackgroundLoop) -> None:
+        self._response = response
+        self._loop = loop
+        self._content: Optional[bytes] = None
+
+    @property
+    def is_success(self) -> bool:
+        return self._response.ok
+
+    @property
+    def status_code(self) -> int:
+        return self._response.status_code
+
+    @property
+    def reason_phrase(self) -> str:
+        return self._response.reason
+
+    @property
+    def headers(self) -> MutableMapping[str, str]:
+        return self._response.headers
+
+    @property
+    def elapsed(self) -> timedelta:
+        return self._response.elapsed
+
+    @property
+    def content(self) -> bytes:
+        return self.read()
+
+    @property
+    def text(self) -> str:
+        self.read()
+        return self._response.text
+
+    def json(
+        self,
+        object_hook: Optional[Callable] = None,
+        parse_float: Optional[Callable] = None,
+        parse_int: Optional[Callable] = None,
+        parse_constant: Optional[Callable] = None,
+        object_pairs_hook: Optional[Callable] = None,
+    ) -> Any:
+        return json.loads(
+            self.text,
+            object_hook=object_hook,
+            parse_float=parse_float,
+            parse_int=parse_int,
+            parse_constant=parse_constant,
+            object_pairs_hook=object_pairs_hook,
+        )
+
+    def iter_bytes(self, chunk_size: Optional[int] = None) -> Iterator[bytes]:
+        return self._iterate(self._response.iter_bytes(chunk_size))
+
+    def iter_text(self, chunk_size: Optional[int] = None) -> Iterator[str]:
+        return self._iterate(self._response.iter_text(chunk_size))
+
+    def iter_lines(self) -> Iterator[str]:
+        return self._iterate(self._response.iter_lines())
+
+    def iter_raw(self, chunk_size: Optional[int] = None) -> Iterator[bytes]:
+        return self._iterate(self._response.iter_raw(chunk_size))
+
+    def read(self) -> bytes:
+        if self._content is None:
+            self._content = self._loop.run(self._response.read())
+        return self._content
+
+    def aiter_bytes(self, chunk_size: Optional[int] = None) -> AsyncIterator[bytes]:
+        return self._response.iter_bytes(chunk_size)
+
+    def aiter_text(self, chunk_size: Optional[int] = None) -> AsyncIterator[str]:
+        return self._response.iter_text(chunk_size)
+
+    def aiter_lines(self) -> AsyncIterator[str]:
+        return self._response.iter_lines()
+
+    def aiter_raw(self, chunk_size: Optional[int] = None) -> AsyncIterator[bytes]:
+        return self._response.iter_raw(chunk_size)
+
+    async def aread(self) -> bytes:
+        return await self._response.read()
+
+    def _iterate(self, iterator: AsyncIterator[T]) -> Iterator[T]:
+        while True:
+            item = self._loop.run(_next(iterator))
+            if item is _END:
+                return
+            yield item
+
+
+async def _next(iterator: AsyncIterator[T]) -> Any:
+    try:
+        return await iterator.__anext__()
+    except StopAsyncIteration:
+        return _END
+
+
+class BackgroundLoopTransport(BaseTransport):
+    """
+    Sync transport sending the requests through an async transport on a background event loop.
+
+    Blocking callers in any number of threads share the connection pool of the one async transport instead of holding
+    a thread per request in flight each. Streams are read chunk by chunk on the loop.
+    """
+
+    def __init__(self, transport: BaseAsyncTransport, loop: Optional[BackgroundLoop] = None) -> None:
+        self._transport = transport
+        self._loop = loop if loop is not None else background_loop
+
+    @property
+    def max_connections(self) -> Optional[int]:
+        return self._transport.max_connections
+
+    @property
+    def history(self) -> Optional[RequestHistory]:
+        return self._transport.history
+
+    def send(self, request: Request) -> Tuple[SentRequest, Response]:
+        return self._loop.run(self._transport.send(request))
+
+    @contextmanager
+    def stream(self, request: Request) -> Iterator[Tuple[SentRequest, StreamResponse]]:
+        stream = self._transport.stream(request)
+        sent_request, async_stream_response = self._loop.run(stream.__aenter__())
+        try:
+            yield sent_request, StreamResponse(
+                LoopOriginalResponse(async_stream_response, self._loop), timings=async_stream_response.timings
+            )
+        except BaseException:
+            if not self._loop.run(stream.__aexit__(*sys.exc_info())):
+                raise
+        else:
+            self._loop.run(stream.__aexit__(None, None, None))
@@ -1,8 +1,9 @@
 from abc import ABC, abstractmethod
 from contextlib import contextmanager
-from typing import Tuple, Iterator
+from typing import Iterator, Optional, Tuple
 
 from httptoolkit.request import Request
+from httptoolkit.request_history import RequestHistory
 from httptoolkit.response import Response, StreamResponse
 from httptoolkit.sent_request import SentRequest
 
@@ -16,3 +17,17 @@ class BaseTransport(ABC):
     @contextmanager
     def stream(self, request: Request) -> Iterator[Tuple[SentRequest, StreamResponse]]:  # pragma: no cover
         pass
+
+    @property
+    def max_connections(self) -> Optional[int]:
+        """
+        :return: How many connections the transport opens at most, None if it is not limited or not known.
+        """
+        return None
+
+    @property
+    def history(self) -> Optional[RequestHistory]:
+        """
+        :return: The records of the last requests of the transport, None if it doesn't keep them.
+        """
+        return None
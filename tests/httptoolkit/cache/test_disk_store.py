@@ -0,0 +1,181 @@
+import multiprocessing
+import os
+
+from pytest_httpx import HTTPXMock
+
+from httptoolkit import Header, HttpMethod, Service
+from httptoolkit.cache import CachedResponse, CacheEntry, CachePolicy, DiskCacheStore
+from httptoolkit.request import Request
+from httptoolkit.sent_request import SentRequest
+from httptoolkit.transport import CachingTransport, HttpxTransport
+
+NOW = 1_700_000_000.0
+
+
+def make_entry(content: bytes = b"body") -> CacheEntry:
+    request = Request(method=HttpMethod.GET, path="/some/path", params={"page": 2})
+    return CacheEntry(
+        sent_request=SentRequest(
+            request,
+            base_url="https://example.com:4321",
+            body=None,
+            headers=(
+                Header(name="Accept", value="*/*", is_sensitive=False),
+                Header(name="Authorization", value="Bearer secret", is_sensitive=True),
+            ),
+        ),
+        status_code=200,
+        headers=(("content-type", "text/plain; charset=utf-8"), ("etag", '"v1"')),
+        content=content,
+        elapsed=0.25,
+        stored_at=NOW,
+        expires_at=NOW + 60,
+        stale_while_revalidate=10,
+        stale_if_error=20,
+    )
+
+
+def write_entry(directory: str, key: str) -> None:
+    DiskCacheStore(directory).set(key, make_entry(b"from another process"))
+
+
+def test_roundtrip(tmp_path):
+    store = DiskCacheStore(str(tmp_path))
+    store.set("key", make_entry())
+
+    entry = store.get("key")
+
+    assert entry is not None
+    assert isinstance(entry.content, memoryview)
+    assert entry.content == b"body"
+    assert entry.headers == make_entry().headers
+    assert entry.expires_at == NOW + 60
+    assert entry.stale_if_error == 20
+    assert entry.sent_request.method == "GET"
+    assert entry.sent_request.url == "https://example.com:4321/some/path?page=2"
+    assert entry.sent_request.filtered_headers == {"Accept": "*/*", "Authorization": "[filtered]"}
+
+
+def test_secrets_are_not_written(tmp_path):
+    DiskCacheStore(str(tmp_path)).set("key", make_entry())
+
+    for directory, _, names in os.walk(tmp_path):
+        for name in names:
+            with open(os.path.join(directory, name), "rb") as file:
+                assert b"secret" not in file.read()
+
+
+def test_missing_and_corrupted_entries(tmp_path):
+    store = DiskCacheStore(str(tmp_path))
+    store.set("key", make_entry())
+
+    assert store.get("another key") is None
+
+    path = store._path("key")
+    with open(path, "r+b") as file:
+        file.truncate(os.path.getsize(path) - 1)
+
+    assert store.get("key") is None
+    assert not os.path.exists(path)
+
+
+def test_delete(tmp_path):
+    store = DiskCacheStore(str(tmp_path))
+    store.set("key", make_entry())
+    store.delete("key")
+
+    assert store.get("key") is None
+
+
+def test_eviction_by_size(tmp_path):
+    store = DiskCacheStore(str(tmp_path), max_size=10_000)
+
+    for index in range(20):
+        path_key = f"key-{index}"
+        store.set(path_key, make_entry(b"x" * 1000))
+        os.utime(store._path(path_key), (NOW + index, NOW + index))
+        store.evict()
+
+    assert store.size <= 10_000
+    assert store.get("key-19") is not None
+    assert store.get("key-0") is None
+
+
+def test_eviction_follows_reads_without_scanning(tmp_path, monkeypatch):
+    DiskCacheStore(str(tmp_path)).set("key-0", make_entry(b"x" * 1000))
+    store = DiskCacheStore(str(tmp_path), max_size=5_000)
+    assert store.size > 1000
+
+    def walk(*args):
+        raise AssertionError("the directory is scanned")
+
+    monkeypatch.setattr(os, "walk", walk)
+    for index in range(1, 6):
+        store.set(f"key-{index}", make_entry(b"x" * 1000))
+        assert store.get("key-0") is not None
+
+    assert store.size <= 5_000
+    assert store.get("key-0") is not None
+    assert store.get("key-1") is None
+
+
+def test_limit_covers_every_process(tmp_path):
+    first = DiskCacheStore(str(tmp_path), max_size=5_000)
+    second = DiskCacheStore(str(tmp_path), max_size=5_000)
+
+    for index in range(6):
+        first.set(f"first-{index}", make_entry(b"x" * 1000))
+        second.set(f"second-{index}", make_entry(b"x" * 1000))
+
+    files_size = sum(
+        os.path.getsize(os.path.join(directory, name))
+        for directory, _, names in os.walk(tmp_path)
+        for name in names
+        if name.endswith(DiskCacheStore.FILE_SUFFIX)
+    )
+    assert first.size == second.size == files_size
+    assert files_size <= 5_000
+
+
+def test_file_removed_elsewhere_is_not_counted(tmp_path):
+    store = DiskCacheStore(str(tmp_path))
+    store.set("key", make_entry())
+
+    os.remove(store._path("key"))
+
+    assert store.get("key") is None
+    assert store.size == 0
+
+
+def test_shared_between_processes(tmp_path):
+    process = multiprocessing.get_context("spawn").Process(target=write_entry, args=(str(tmp_path), "key"))
+    process.start()
+    process.join(30)
+
+    entry = DiskCacheStore(str(tmp_path)).get("key")
+
+    assert entry is not None
+    assert bytes(entry.content) == b"from another process"
+
+
+def test_transport_warms_other_workers(tmp_path, httpx_mock: HTTPXMock):
+    httpx_mock.add_response(
+        url="https://example.com:4321/some/path", text="shared", headers={"Cache-Control": "max-age=60"}
+    )
+
+    def make_service() -> Service:
+        return Service(
+            transport=CachingTransport(
+                HttpxTransport(base_url="https://example.com:4321", retry_max_attempts=1),
+                store=DiskCacheStore(str(tmp_path)),
+                policy=CachePolicy(),
+            )
+        )
+
+    make_service().get("/some/path")
+    response = make_service().get("/some/path")
+
+    assert isinstance(response, CachedResponse)
+    assert response.text == "shared"
+    assert response.content_view.tobytes() == b"shared"
+    assert len(httpx_mock.get_requests()) == 1
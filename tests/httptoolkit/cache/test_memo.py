@@ -0,0 +1,135 @@
+import json
+import time
+from typing import BinaryIO, Dict, Optional, Tuple, Union
+
+import pytest
+from pytest_httpx import HTTPXMock
+
+from httptoolkit import AsyncService, Header, HttpMethod, Service
+from httptoolkit.cache import Memoizer, request_fingerprint
+from httptoolkit.request import Request
+from httptoolkit.transport import AsyncHttpxTransport, HttpxTransport
+
+URL = "https://example.com:4321/search"
+
+
+def make_request(
+    method: HttpMethod = HttpMethod.POST,
+    path: str = "/search",
+    params: Optional[dict] = None,
+    headers: Tuple[Header, ...] = (),
+    body: Optional[str] = None,
+    json: Optional[dict] = None,
+    files: Optional[Dict[str, Union[BinaryIO, Tuple[str, BinaryIO, str]]]] = None,
+) -> Request:
+    return Request(method=method, path=path, params=params, headers=headers, body=body, json=json, files=files)
+
+
+def test_fingerprint_sorts_params():
+    first = make_request(params={"a": 1, "b": 2})
+    second = make_request(params={"b": 2, "a": 1})
+
+    assert request_fingerprint(first) == request_fingerprint(second)
+
+
+@pytest.mark.parametrize(
+    "other",
+    [
+        make_request(method=HttpMethod.PUT, json={"query": "x"}),
+        make_request(path="/other", json={"query": "x"}),
+        make_request(json={"query": "y"}),
+        make_request(body='{"query": "x"}'),
+        make_request(params={"query": "x"}),
+    ],
+)
+def test_fingerprint_differs(other: Request):
+    assert request_fingerprint(make_request(json={"query": "x"})) != request_fingerprint(other)
+
+
+def test_fingerprint_headers():
+    def with_tenant(tenant: str) -> Request:
+        return make_request(
+            headers=(
+                Header(name="X-Tenant", value=tenant, is_sensitive=False),
+                Header(name="X-Request-Id", value=tenant + "-id", is_sensitive=False),
+            )
+        )
+
+    assert request_fingerprint(with_tenant("a")) == request_fingerprint(with_tenant("b"))
+    assert request_fingerprint(with_tenant("a"), headers=("x-tenant",)) != request_fingerprint(
+        with_tenant("b"), headers=("x-tenant",)
+    )
+
+
+def test_fingerprint_files(test_file):
+    with pytest.raises(RuntimeError):
+        request_fingerprint(make_request(files={"file": test_file}))
+
+
+def test_json_is_encoded_once(httpx_mock: HTTPXMock):
+    calls = []
+
+    def encoder(content) -> str:
+        calls.append(content)
+        return json.dumps(content)
+
+    httpx_mock.add_response(method="POST", url=URL, json={"found": 1})
+    service = Service(
+        transport=HttpxTransport(base_url="https://example.com:4321", json_encoder=encoder),
+        memoizer=Memoizer(ttl=60, json_encoder=encoder),
+    )
+
+    service.post("/search", json={"query": "x"}, memoize=True)
+
+    assert len(calls) == 1
+
+
+def test_memoizer_ttl_and_lru():
+    memoizer = Memoizer(ttl=0.05, max_entries=2)
+    responses = [object(), object(), object()]
+
+    for index, response in enumerate(responses):
+        memoizer.set(str(index), response)  # type: ignore[arg-type]
+
+    assert memoizer.get("0") is None
+    assert memoizer.get("2") is responses[2]
+
+    time.sleep(0.06)
+
+    assert memoizer.get("2") is None
+
+
+def test_service_memoize(httpx_mock: HTTPXMock):
+    httpx_mock.add_response(method="POST", url=URL, json={"found": 1})
+    service = Service(
+        transport=HttpxTransport(base_url="https://example.com:4321"),
+        memoizer=Memoizer(ttl=60),
+    )
+
+    assert service.post("/search", json={"query": "x"}, memoize=True).json() == {"found": 1}
+    assert service.post("/search", json={"query": "x"}, memoize=True).json() == {"found": 1}
+    service.post("/search", json={"query": "x"})
+
+    assert len(httpx_mock.get_requests()) == 2
+
+
+def test_service_memoize_without_memoizer():
+    service = Service(transport=HttpxTransport(base_url="https://example.com:4321"))
+
+    with pytest.raises(RuntimeError):
+        service.post("/search", json={"query": "x"}, memoize=True)
+
+
+@pytest.mark.asyncio
+async def test_async_service_memoize(httpx_mock: HTTPXMock):
+    httpx_mock.add_response(method="POST", url=URL, json={"found": 1})
+    service = AsyncService(
+        transport=AsyncHttpxTransport(base_url="https://example.com:4321"),
+        memoizer=Memoizer(ttl=60),
+    )
+
+    for _ in range(3):
+        response = await service.post("/search", json={"query": "x"}, memoize=True)
+        assert response.json() == {"found": 1}
+
+    assert len(httpx_mock.get_requests()) == 1
@@ -0,0 +1,121 @@
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from typing import cast
+
+import httpx
+import pytest
+
+from httptoolkit import HttpMethod
+from httptoolkit.cache import CachePolicy, parse_cache_control
+from httptoolkit.request import Request
+from httptoolkit.response import OriginalResponse, Response
+from httptoolkit.sent_request import SentRequest
+
+NOW = 1_700_000_000.0
+
+
+@pytest.fixture
+def sent_request() -> SentRequest:
+    return SentRequest(
+        Request(method=HttpMethod.GET, path="/", params={}),
+        base_url="https://example.com",
+        body=None,
+    )
+
+
+def make_response(status_code: int = 200, **headers: str) -> Response:
+    original = httpx.Response(status_code, text="body", headers={k.replace("_", "-"): v for k, v in headers.items()})
+    original.elapsed = timedelta(seconds=0.5)
+    return Response(cast(OriginalResponse, original))
+
+
+def test_parse_cache_control():
+    assert parse_cache_control('max-age=60, No-Store, stale-if-error="30"') == {
+        "max-age": "60",
+        "no-store": None,
+        "stale-if-error": "30",
+    }
+
+
+@pytest.mark.parametrize(
+    "headers,expires_at",
+    [
+        ({"Cache_Control": "max-age=60"}, NOW + 60),
+        ({"Cache_Control": "max-age=60", "Age": "20"}, NOW + 40),
+        ({"Cache_Control": "no-cache, max-age=60", "ETag": '"v1"'}, NOW),
+        ({}, NOW + 5),
+    ],
+)
+def test_freshness(sent_request: SentRequest, headers: dict, expires_at: float):
+    entry = CachePolicy(default_ttl=5).build_entry(sent_request, make_response(**headers), NOW)
+
+    assert entry is not None
+    assert entry.expires_at == expires_at
+    assert entry.elapsed == 0.5
+
+
+def test_expires_header(sent_request: SentRequest):
+    date = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    response = make_response(Date=format_datetime(date), Expires=format_datetime(date + timedelta(seconds=30)))
+
+    entry = CachePolicy().build_entry(sent_request, response, NOW)
+
+    assert entry is not None
+    assert entry.expires_at == NOW + 30
+
+
+def test_stale_windows_from_directives(sent_request: SentRequest):
+    response = make_response(Cache_Control="max-age=10, stale-while-revalidate=20, stale-if-error=30")
+
+    entry = CachePolicy(stale_while_revalidate=1, stale_if_error=1).build_entry(sent_request, response, NOW)
+
+    assert entry is not None
+    assert entry.is_usable_while_revalidating(NOW + 29)
+    assert not entry.is_usable_while_revalidating(NOW + 30)
+    assert entry.is_usable_on_error(NOW + 39)
+    assert not entry.is_usable_on_error(NOW + 40)
+
+
+@pytest.mark.parametrize(
+    "response",
+    [
+        make_response(Cache_Control="no-store, max-age=60"),
+        make_response(status_code=500, Cache_Control="max-age=60"),
+        make_response(),
+    ],
+)
+def test_not_stored(sent_request: SentRequest, response: Response):
+    assert CachePolicy().build_entry(sent_request, response, NOW) is None
+
+
+def test_revalidate_updates_headers(sent_request: SentRequest):
+    policy = CachePolicy()
+    entry = policy.build_entry(sent_request, make_response(ETag='"v1"', Cache_Control="no-cache"), NOW)
+    assert entry is not None
+
+    refreshed = policy.revalidate(entry, make_response(304, Cache_Control="max-age=60"), NOW + 100)
+
+    assert refreshed.expires_at == NOW + 160
+    assert refreshed.etag == '"v1"'
+    assert refreshed.content == b"body"
+
+
+@pytest.mark.parametrize(
+    "policy,response,expires_at",
+    [
+        (CachePolicy(negative_ttl=30), make_response(404), NOW + 30),
+        (CachePolicy(negative_ttl=30), make_response(410, Cache_Control="max-age=5"), NOW + 5),
+        (CachePolicy(negative_ttl=30, negative_status_codes=[404]), make_response(410), None),
+        (CachePolicy(negative_ttl=30), make_response(404, Cache_Control="no-store"), None),
+        (CachePolicy(), make_response(404, Cache_Control="max-age=5"), None),
+    ],
+)
+def test_negative_entries(sent_request: SentRequest, policy: CachePolicy, response: Response, expires_at):
+    entry = policy.build_entry(sent_request, response, NOW)
+
+    if expires_at is None:
+        assert entry is None
+    else:
+        assert entry is not None
+        assert entry.expires_at == expires_at
+        assert entry.stale_if_error == 0
@@ -0,0 +1,142 @@
+import asyncio
+import re
+from typing import List
+
+import httpx
+import pytest
+from pytest_httpx import HTTPXMock
+
+from httptoolkit import HttpMethod
+from httptoolkit.errors import HttpError
+from httptoolkit.request import Request
+from httptoolkit.service import AsyncService, BatchResult, ErrorPolicy
+from httptoolkit.transport import AsyncHttpxTransport
+
+DELAYS = {0: 0.04, 1: 0.01, 2: 0.03, 3: 0.0, 4: 0.02}
+
+
+class Upstream:
+    """
+    Answers /items/<n> after DELAYS[n] seconds, 404 for the ids in missing.
+    """
+
+    def __init__(self, missing: frozenset = frozenset(), delays: dict = DELAYS) -> None:
+        self.missing = missing
+        self.delays = delays
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.cancelled = 0
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        item_id = int(request.url.path.rsplit("/", 1)[1])
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delays[item_id])
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        finally:
+            self.in_flight -= 1
+        if item_id in self.missing:
+            return httpx.Response(status_code=404)
+        return httpx.Response(status_code=200, text=str(item_id))
+
+
+@pytest.fixture
+def service() -> AsyncService:
+    return AsyncService(transport=AsyncHttpxTransport(base_url="https://example.com", retry_max_attempts=1))
+
+
+def requests(ids=DELAYS) -> List[Request]:
+    return [Request(method=HttpMethod.GET, path=f"/items/{item_id}", params=None) for item_id in ids]
+
+
+def text(result: BatchResult) -> str:
+    assert result.response is not None
+    return result.response.text
+
+
+@pytest.mark.asyncio
+async def test_map_yields_in_completion_order(httpx_mock: HTTPXMock, service: AsyncService):
+    upstream = Upstream()
+    httpx_mock.add_callback(upstream, url=re.compile(r"https://example.com/items/\d+"))
+
+    results = [result async for result in service.map(requests(), concurrency=5)]
+
+    assert [result.index for result in results] == [3, 1, 4, 2, 0]
+    assert [text(result) for result in results] == ["3", "1", "4", "2", "0"]
+    assert all(result.ok for result in results)
+
+
+@pytest.mark.asyncio
+async def test_map_limits_concurrency(httpx_mock: HTTPXMock, service: AsyncService):
+    upstream = Upstream()
+    httpx_mock.add_callback(upstream, url=re.compile(r"https://example.com/items/\d+"))
+
+    results = await service.gather(requests(), concurrency=2)
+
+    assert upstream.max_in_flight == 2
+    assert [text(result) for result in results] == ["0", "1", "2", "3", "4"]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("errors", "expected"),
+    ((ErrorPolicy.COLLECT, [0, 1, 2, 3, 4]), (ErrorPolicy.SKIP, [0, 2, 4]), ("skip", [0, 2, 4])),
+)
+async def test_error_policies(httpx_mock: HTTPXMock, service: AsyncService, errors: ErrorPolicy, expected: List[int]):
+    httpx_mock.add_callback(Upstream(missing=frozenset({1, 3})), url=re.compile(r"https://example.com/items/\d+"))
+
+    results = await service.gather(requests(), errors=errors)
+
+    assert [result.index for result in results] == expected
+    for result in results:
+        assert result.ok is (result.index not in (1, 3))
+        assert isinstance(result.error, HttpError) or text(result) == str(result.index)
+
+
+@pytest.mark.asyncio
+async def test_raise_cancels_requests_in_flight(httpx_mock: HTTPXMock, service: AsyncService):
+    upstream = Upstream(missing=frozenset({3}))
+    httpx_mock.add_callback(upstream, url=re.compile(r"https://example.com/items/\d+"))
+
+    with pytest.raises(HttpError):
+        await service.gather(requests())
+
+    assert upstream.in_flight == 0
+    assert upstream.cancelled == 4
+
+
+@pytest.mark.asyncio
+async def test_deadline(httpx_mock: HTTPXMock, service: AsyncService):
+    upstream = Upstream(delays={0: 0.0, 1: 10, 2: 10})
+    httpx_mock.add_callback(upstream, url=re.compile(r"https://example.com/items/\d+"))
+    received = []
+
+    with pytest.raises(asyncio.TimeoutError):
+        async for result in service.map(requests(upstream.delays), timeout_in_seconds=0.05):
+            received.append(result.index)
+
+    assert received == [0]
+    assert upstream.in_flight == 0
+    assert upstream.cancelled == 2
+
+
+@pytest.mark.asyncio
+async def test_closing_iterator_cancels_requests_in_flight(httpx_mock: HTTPXMock, service: AsyncService):
+    upstream = Upstream(delays={0: 0.0, 1: 10})
+    httpx_mock.add_callback(upstream, url=re.compile(r"https://example.com/items/\d+"))
+
+    results = service.map(requests(upstream.delays))
+    assert (await results.__anext__()).index == 0
+    await results.aclose()
+
+    assert upstream.in_flight == 0
+    assert upstream.cancelled == 1
+
+
+@pytest.mark.asyncio
+async def test_invalid_concurrency(service: AsyncService):
+    with pytest.raises(RuntimeError):
+        await service.gather(requests(), concurrency=0)
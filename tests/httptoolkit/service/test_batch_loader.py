@@ -0,0 +1,125 @@
+import asyncio
+import json
+from typing import Mapping, Sequence, Union
+
+import httpx
+import pytest
+from pytest_httpx import HTTPXMock
+
+from httptoolkit import HttpMethod
+from httptoolkit.errors import HttpError
+from httptoolkit.request import Request
+from httptoolkit.response import Response
+from httptoolkit.service import AsyncService, BatchLoader
+from httptoolkit.transport import AsyncHttpxTransport
+
+
+class UserNotFound(Exception):
+    pass
+
+
+def build_request(ids: Sequence[int]) -> Request:
+    return Request(method=HttpMethod.POST, path="/users/batch", params=None, json={"ids": list(ids)})
+
+
+def parse_response(ids: Sequence[int], response: Response) -> Mapping[int, Union[str, Exception]]:
+    users = {int(user_id): name for user_id, name in response.json()["users"].items()}
+    return {**{user_id: UserNotFound(user_id) for user_id in response.json()["not_found"]}, **users}
+
+
+def bulk_endpoint(request: httpx.Request) -> httpx.Response:
+    ids = json.loads(request.content)["ids"]
+    return httpx.Response(
+        status_code=200,
+        json={
+            "users": {user_id: f"user {user_id}" for user_id in ids if user_id < 100},
+            "not_found": [user_id for user_id in ids if 100 <= user_id < 200],
+        },
+    )
+
+
+@pytest.fixture
+def loader() -> BatchLoader[int, str]:
+    service = AsyncService(transport=AsyncHttpxTransport(base_url="https://example.com", retry_max_attempts=1))
+    return service.loader(build_request, parse_response, max_batch_size=3)
+
+
+def sent_ids(httpx_mock: HTTPXMock):
+    return [json.loads(call.content)["ids"] for call in httpx_mock.get_requests()]
+
+
+@pytest.mark.asyncio
+async def test_loads_within_window_share_request(httpx_mock: HTTPXMock, loader: BatchLoader[int, str]):
+    httpx_mock.add_callback(bulk_endpoint, url="https://example.com/users/batch")
+
+    users = await asyncio.gather(loader.load(1), loader.load(2), loader.load(1))
+
+    assert users == ["user 1", "user 2", "user 1"]
+    assert sent_ids(httpx_mock) == [[1, 2]]
+
+
+@pytest.mark.asyncio
+async def test_max_batch_size(httpx_mock: HTTPXMock, loader: BatchLoader[int, str]):
+    httpx_mock.add_callback(bulk_endpoint, url="https://example.com/users/batch")
+
+    users = await loader.load_many([1, 2, 3, 4, 5])
+
+    assert users == ["user 1", "user 2", "user 3", "user 4", "user 5"]
+    assert sent_ids(httpx_mock) == [[1, 2, 3], [4, 5]]
+
+
+@pytest.mark.asyncio
+async def test_key_in_flight_is_not_sent_again(httpx_mock: HTTPXMock, loader: BatchLoader[int, str]):
+    async def slow_bulk_endpoint(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(0.05)
+        return bulk_endpoint(request)
+
+    httpx_mock.add_callback(slow_bulk_endpoint, url="https://example.com/users/batch")
+
+    first = asyncio.ensure_future(loader.load(1))
+    await asyncio.sleep(0.01)
+    second = await loader.load(1)
+
+    assert second == await first == "user 1"
+    assert sent_ids(httpx_mock) == [[1]]
+
+
+@pytest.mark.asyncio
+async def test_per_key_errors(httpx_mock: HTTPXMock, loader: BatchLoader[int, str]):
+    httpx_mock.add_callback(bulk_endpoint, url="https://example.com/users/batch")
+
+    found, not_found, missing = await asyncio.gather(
+        loader.load(1), loader.load(100), loader.load(200), return_exceptions=True
+    )
+
+    assert found == "user 1"
+    assert isinstance(not_found, UserNotFound)
+    assert isinstance(missing, KeyError)
+
+
+@pytest.mark.asyncio
+async def test_failed_bulk_request(httpx_mock: HTTPXMock, loader: BatchLoader[int, str]):
+    httpx_mock.add_response(url="https://example.com/users/batch", status_code=500)
+
+    results = await asyncio.gather(loader.load(1), loader.load(2), return_exceptions=True)
+
+    assert all(isinstance(result, HttpError) for result in results)
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_cancel_others(httpx_mock: HTTPXMock, loader: BatchLoader[int, str]):
+    httpx_mock.add_callback(bulk_endpoint, url="https://example.com/users/batch")
+
+    cancelled = asyncio.ensure_future(loader.load(1))
+    other = asyncio.ensure_future(loader.load(1))
+    await asyncio.sleep(0)
+    cancelled.cancel()
+
+    assert await other == "user 1"
+
+
+def test_invalid_batch_size():
+    service = AsyncService(transport=AsyncHttpxTransport(base_url="https://example.com"))
+
+    with pytest.raises(RuntimeError):
+        service.loader(build_request, parse_response, max_batch_size=0)
@@ -0,0 +1,171 @@
+import asyncio
+import threading
+import time
+
+import httpx
+import pytest
+from pytest_httpx import HTTPXMock
+
+from httptoolkit import HttpMethod
+from httptoolkit.request import Request
+from httptoolkit.service import AsyncService, DispatchStats, OverflowPolicy, Service
+from httptoolkit.tracing import InMemorySpanExporter, Tracer
+from httptoolkit.transport import AsyncHttpxTransport, HttpxTransport
+
+
+def event(number: int) -> Request:
+    return Request(method=HttpMethod.POST, path="/events", params=None, json={"n": number})
+
+
+def sent_numbers(httpx_mock: HTTPXMock):
+    return [int(request.content.decode()[6:-1]) for request in httpx_mock.get_requests()]
+
+
+@pytest.fixture
+def service() -> Service:
+    return Service(transport=HttpxTransport(base_url="https://example.com", retry_max_attempts=1))
+
+
+@pytest.fixture
+def async_service() -> AsyncService:
+    return AsyncService(transport=AsyncHttpxTransport(base_url="https://example.com", retry_max_attempts=1))
+
+
+def test_close_drains_queue(httpx_mock: HTTPXMock, service: Service):
+    httpx_mock.add_response(url="https://example.com/events")
+
+    with service.dispatch_queue() as queue:
+        for number in range(3):
+            assert queue.submit(event(number))
+
+    assert sent_numbers(httpx_mock) == [0, 1, 2]
+    assert queue.stats == DispatchStats(sent=3, failed=0, dropped=0, queued=0)
+
+
+def test_failures_are_counted(httpx_mock: HTTPXMock, service: Service):
+    httpx_mock.add_response(url="https://example.com/events", status_code=500)
+
+    queue = service.dispatch_queue()
+    queue.submit(event(0))
+
+    assert queue.close() == DispatchStats(sent=0, failed=1, dropped=0, queued=0)
+
+
+@pytest.mark.parametrize(
+    "overflow, expected_numbers, queued",
+    [
+        (OverflowPolicy.DROP_OLDEST, [0, 2], [True, True, True]),
+        (OverflowPolicy.DROP_NEWEST, [0, 1], [True, True, False]),
+    ],
+)
+def test_overflow(httpx_mock: HTTPXMock, service: Service, overflow, expected_numbers, queued):
+    release = threading.Event()
+
+    def respond(request: httpx.Request) -> httpx.Response:
+        release.wait()
+        return httpx.Response(status_code=200)
+
+    httpx_mock.add_callback(respond, url="https://example.com/events")
+    queue = service.dispatch_queue(max_size=1, overflow=overflow)
+
+    results = [queue.submit(event(0))]
+    time.sleep(0.05)  # the worker takes the first request
+    results += [queue.submit(event(1)), queue.submit(event(2))]
+    release.set()
+
+    assert results == queued
+    assert queue.close().dropped == 1
+    assert sent_numbers(httpx_mock) == expected_numbers
+
+
+def test_block(httpx_mock: HTTPXMock, service: Service):
+    def respond(request: httpx.Request) -> httpx.Response:
+        time.sleep(0.05)
+        return httpx.Response(status_code=200)
+
+    httpx_mock.add_callback(respond, url="https://example.com/events")
+    queue = service.dispatch_queue(max_size=1, overflow=OverflowPolicy.BLOCK)
+
+    started = time.monotonic()
+    for number in range(3):
+        queue.submit(event(number))
+
+    assert time.monotonic() - started >= 0.05
+    assert queue.close() == DispatchStats(sent=3, failed=0, dropped=0, queued=0)
+
+
+def test_close_timeout_drops_queued(httpx_mock: HTTPXMock, service: Service):
+    def respond(request: httpx.Request) -> httpx.Response:
+        time.sleep(0.1)
+        return httpx.Response(status_code=200)
+
+    httpx_mock.add_callback(respond, url="https://example.com/events")
+    queue = service.dispatch_queue()
+    for number in range(3):
+        queue.submit(event(number))
+
+    assert queue.close(timeout_in_seconds=0.01).dropped == 2
+    with pytest.raises(RuntimeError):
+        queue.submit(event(3))
+
+
+def test_invalid_workers(service: Service):
+    with pytest.raises(RuntimeError):
+        service.dispatch_queue(workers=0)
+
+
+@pytest.mark.asyncio
+async def test_async_workers(httpx_mock: HTTPXMock, async_service: AsyncService):
+    in_flight = []
+
+    async def respond(request: httpx.Request) -> httpx.Response:
+        in_flight.append(request)
+        status_code = 500 if len(in_flight) == 1 else 200
+        await asyncio.sleep(0.05)
+        return httpx.Response(status_code=status_code)
+
+    httpx_mock.add_callback(respond, url="https://example.com/events")
+
+    async with async_service.dispatch_queue(workers=2) as queue:
+        for number in range(4):
+            await queue.submit(event(number))
+        await asyncio.sleep(0.01)
+        assert len(in_flight) == 2
+
+    assert queue.stats == DispatchStats(sent=3, failed=1, dropped=0, queued=0)
+
+
+@pytest.mark.asyncio
+async def test_async_overflow_and_close_timeout(httpx_mock: HTTPXMock, async_service: AsyncService):
+    async def respond(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(1)
+        return httpx.Response(status_code=200)  # pragma: no cover
+
+    httpx_mock.add_callback(respond, url="https://example.com/events")
+    queue = async_service.dispatch_queue(max_size=1, overflow=OverflowPolicy.DROP_NEWEST)
+
+    assert await queue.submit(event(0))
+    await asyncio.sleep(0.01)
+    assert await queue.submit(event(1))
+    assert not await queue.submit(event(2))
+
+    # the request in flight is cancelled and the queued one is dropped
+    assert await queue.close(timeout_in_seconds=0.01) == DispatchStats(sent=0, failed=0, dropped=3, queued=0)
+
+
+@pytest.mark.asyncio
+async def test_async_request_runs_in_submit_context(httpx_mock: HTTPXMock):
+    httpx_mock.add_response(url="https://example.com/events")
+    exporter = InMemorySpanExporter()
+    tracer = Tracer(exporter)
+    async_service = AsyncService(transport=AsyncHttpxTransport(base_url="https://example.com", tracer=tracer))
+
+    async with async_service.dispatch_queue() as queue:
+        with tracer.start_as_current_span("first") as first:
+            await queue.submit(event(1))
+        with tracer.start_as_current_span("second") as second:
+            await queue.submit(event(2))
+
+    job_ids = {first.span_id, second.span_id}
+    request_parents = [span.parent_span_id for span in exporter.spans if span.parent_span_id in job_ids]
+    assert sorted(request_parents) == sorted(job_ids)
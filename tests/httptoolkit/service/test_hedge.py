@@ -0,0 +1,144 @@
+import asyncio
+import itertools
+import threading
+import time
+
+import httpx
+import pytest
+from pytest_httpx import HTTPXMock
+
+from httptoolkit import HttpMethod
+from httptoolkit.metrics import MetricsRegistry
+from httptoolkit.request import Request
+from httptoolkit.service import AsyncService, HedgePolicy, HedgeStats, Service
+from httptoolkit.transport import AsyncHttpxTransport, HttpxTransport
+
+
+def get_items() -> Request:
+    return Request(method=HttpMethod.GET, path="/items", params=None)
+
+
+def test_observed_percentile_delay():
+    policy = HedgePolicy(percentile=90, min_samples=10)
+
+    for elapsed in range(1, 10):
+        policy.record_latency(elapsed / 10)
+    assert policy.delay is None
+
+    policy.record_latency(1.0)
+    assert policy.delay == pytest.approx(0.9)
+
+
+def test_extra_load_budget():
+    policy = HedgePolicy(delay_in_seconds=0.01, max_extra_load_percent=20)
+
+    hedges = []
+    for _ in range(10):
+        assert policy.applies(get_items())
+        hedges.append(policy.try_hedge())
+
+    assert hedges.count(True) == 2
+    assert policy.stats == HedgeStats(requests=10, hedges=2, hedge_wins=0)
+
+
+def test_only_idempotent_methods():
+    policy = HedgePolicy(delay_in_seconds=0.01)
+
+    assert not policy.applies(Request(method=HttpMethod.POST, path="/items", params=None))
+    assert policy.stats.requests == 0
+
+
+@pytest.mark.asyncio
+async def test_async_hedge_wins(httpx_mock: HTTPXMock):
+    calls = itertools.count()
+
+    async def respond(request: httpx.Request) -> httpx.Response:
+        if next(calls) == 0:
+            await asyncio.sleep(1)
+            return httpx.Response(status_code=200, json={"from": "primary"})
+        return httpx.Response(status_code=200, json={"from": "hedge"})
+
+    httpx_mock.add_callback(respond, url="https://example.com/items")
+    hedge = HedgePolicy(delay_in_seconds=0.05, max_extra_load_percent=100)
+    service = AsyncService(transport=AsyncHttpxTransport(base_url="https://example.com"), hedge=hedge)
+
+    started = time.monotonic()
+    response = await service.request(get_items())
+
+    assert response.json() == {"from": "hedge"}
+    assert time.monotonic() - started < 0.5
+    assert hedge.stats == HedgeStats(requests=1, hedges=1, hedge_wins=1)
+
+
+@pytest.mark.asyncio
+async def test_async_fast_response_not_hedged(httpx_mock: HTTPXMock):
+    httpx_mock.add_response(url="https://example.com/items")
+    hedge = HedgePolicy(delay_in_seconds=1, max_extra_load_percent=100)
+    service = AsyncService(transport=AsyncHttpxTransport(base_url="https://example.com"), hedge=hedge)
+
+    await service.request(get_items())
+
+    assert len(httpx_mock.get_requests()) == 1
+    assert hedge.stats == HedgeStats(requests=1, hedges=0, hedge_wins=0)
+
+
+def test_sync_hedge_wins(httpx_mock: HTTPXMock):
+    calls = itertools.count()
+
+    def respond(request: httpx.Request) -> httpx.Response:
+        if next(calls) == 0:
+            time.sleep(0.5)
+            return httpx.Response(status_code=200, json={"from": "primary"})
+        return httpx.Response(status_code=200, json={"from": "hedge"})
+
+    httpx_mock.add_callback(respond, url="https://example.com/items")
+    metrics = MetricsRegistry(routes={"/items"})
+    hedge = HedgePolicy(delay_in_seconds=0.05, max_extra_load_percent=100, metrics=metrics)
+    service = Service(transport=HttpxTransport(base_url="https://example.com"), hedge=hedge)
+
+    started = time.monotonic()
+    response = service.request(get_items())
+
+    assert response.json() == {"from": "hedge"}
+    assert time.monotonic() - started < 0.4
+    assert hedge.stats == HedgeStats(requests=1, hedges=1, hedge_wins=1)
+    (series,) = metrics.snapshot()
+    assert (series.transport, series.route, series.hedges, series.hedge_wins) == ("example.com", "/items", 1, 1)
+    # the primary request can't be interrupted, let it finish before the mock is checked
+    time.sleep(0.5)
+
+
+def test_sync_not_hedged_without_budget(httpx_mock: HTTPXMock):
+    def respond(request: httpx.Request) -> httpx.Response:
+        time.sleep(0.1)
+        return httpx.Response(status_code=200)
+
+    httpx_mock.add_callback(respond, url="https://example.com/items")
+    hedge = HedgePolicy(delay_in_seconds=0.01, max_extra_load_percent=0)
+    service = Service(transport=HttpxTransport(base_url="https://example.com"), hedge=hedge)
+
+    service.request(get_items())
+
+    assert len(httpx_mock.get_requests()) == 1
+    assert hedge.stats.hedges == 0
+
+
+def test_sync_hedged_attempts_bounded_by_connections(httpx_mock: HTTPXMock):
+    def respond(request: httpx.Request) -> httpx.Response:
+        time.sleep(0.2)
+        return httpx.Response(status_code=200)
+
+    httpx_mock.add_callback(respond, url="https://example.com/items")
+    hedge = HedgePolicy(delay_in_seconds=0.01, max_extra_load_percent=100)
+    service = Service(transport=HttpxTransport(base_url="https://example.com", max_connections=1), hedge=hedge)
+
+    callers = [threading.Thread(target=service.request, args=(get_items(),)) for _ in range(2)]
+    for caller in callers:
+        caller.start()
+        time.sleep(0.05)
+    for caller in callers:
+        caller.join()
+
+    # the second caller found the only primary thread busy and sent its request itself, without a duplicate
+    assert hedge.stats.hedges == 1
+    time.sleep(0.3)
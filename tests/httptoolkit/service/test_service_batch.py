@@ -0,0 +1,140 @@
+import re
+import threading
+import time
+from concurrent import futures
+from typing import List, Set
+
+import httpx
+import pytest
+from pytest_httpx import HTTPXMock
+
+from httptoolkit import HttpMethod
+from httptoolkit.errors import HttpError
+from httptoolkit.request import Request
+from httptoolkit.service import BatchResult, ErrorPolicy, Service
+from httptoolkit.tracing import InMemorySpanExporter, Tracer
+from httptoolkit.transport import CachingTransport, HttpxTransport
+
+DELAYS = {0: 0.2, 1: 0.05, 2: 0.15, 3: 0.0, 4: 0.1}
+
+
+class Upstream:
+    """
+    Answers /items/<n> after DELAYS[n] seconds, 404 for the ids in missing.
+    """
+
+    def __init__(self, missing: frozenset = frozenset(), delays: dict = DELAYS) -> None:
+        self.missing = missing
+        self.delays = delays
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.threads: Set[str] = set()
+        self._lock = threading.Lock()
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        item_id = int(request.url.path.rsplit("/", 1)[1])
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            self.threads.add(threading.current_thread().name)
+        time.sleep(self.delays[item_id])
+        with self._lock:
+            self.in_flight -= 1
+        if item_id in self.missing:
+            return httpx.Response(status_code=404)
+        return httpx.Response(status_code=200, text=str(item_id))
+
+
+@pytest.fixture
+def service() -> Service:
+    return Service(transport=HttpxTransport(base_url="https://example.com", retry_max_attempts=1))
+
+
+def requests(ids=DELAYS) -> List[Request]:
+    return [Request(method=HttpMethod.GET, path=f"/items/{item_id}", params=None) for item_id in ids]
+
+
+def text(result: BatchResult) -> str:
+    assert result.response is not None
+    return result.response.text
+
+
+def test_map_yields_in_completion_order(httpx_mock: HTTPXMock, service: Service):
+    upstream = Upstream()
+    httpx_mock.add_callback(upstream, url=re.compile(r"https://example.com/items/\d+"))
+
+    results = list(service.map(requests(), concurrency=5))
+
+    assert [result.index for result in results] == [3, 1, 4, 2, 0]
+    assert [text(result) for result in results] == ["3", "1", "4", "2", "0"]
+    assert all(thread.startswith("httptoolkit-batch") for thread in upstream.threads)
+
+
+def test_gather_limits_concurrency(httpx_mock: HTTPXMock, service: Service):
+    upstream = Upstream()
+    httpx_mock.add_callback(upstream, url=re.compile(r"https://example.com/items/\d+"))
+
+    results = service.gather(requests(), concurrency=2)
+
+    assert upstream.max_in_flight == 2
+    assert [text(result) for result in results] == ["0", "1", "2", "3", "4"]
+
+
+def test_default_concurrency_is_connection_limit(httpx_mock: HTTPXMock):
+    upstream = Upstream()
+    httpx_mock.add_callback(upstream, url=re.compile(r"https://example.com/items/\d+"))
+    transport = HttpxTransport(base_url="https://example.com", max_connections=3)
+    service = Service(transport=CachingTransport(transport))
+
+    service.gather(requests())
+
+    assert upstream.max_in_flight == 3
+
+
+@pytest.mark.parametrize(
+    ("errors", "expected"), ((ErrorPolicy.COLLECT, [0, 1, 2, 3, 4]), (ErrorPolicy.SKIP, [0, 2, 4]))
+)
+def test_error_policies(httpx_mock: HTTPXMock, service: Service, errors: ErrorPolicy, expected: List[int]):
+    httpx_mock.add_callback(Upstream(missing=frozenset({1, 3})), url=re.compile(r"https://example.com/items/\d+"))
+
+    results = service.gather(requests(), errors=errors)
+
+    assert [result.index for result in results] == expected
+    for result in results:
+        assert result.ok is (result.index not in (1, 3))
+        assert isinstance(result.error, HttpError) or text(result) == str(result.index)
+
+
+def test_raise_stops_sending(httpx_mock: HTTPXMock, service: Service):
+    httpx_mock.add_callback(Upstream(missing=frozenset({3})), url=re.compile(r"https://example.com/items/\d+"))
+
+    with pytest.raises(HttpError):
+        service.gather(requests(), concurrency=4)
+
+    assert "/items/4" not in [call.url.path for call in httpx_mock.get_requests()]
+
+
+def test_deadline(httpx_mock: HTTPXMock, service: Service):
+    httpx_mock.add_callback(
+        Upstream(delays={0: 0.0, 1: 0.3, 2: 0.0}), url=re.compile(r"https://example.com/items/\d+")
+    )
+    received = []
+
+    with pytest.raises(futures.TimeoutError):
+        for result in service.map(requests({0: 0.0, 1: 0.3, 2: 0.0}), concurrency=2, timeout_in_seconds=0.1):
+            received.append(result.index)
+
+    assert received == [0, 2]
+
+
+def test_requests_keep_caller_context(httpx_mock: HTTPXMock):
+    exporter = InMemorySpanExporter()
+    tracer = Tracer(exporter)
+    service = Service(transport=HttpxTransport(base_url="https://example.com", tracer=tracer))
+    httpx_mock.add_callback(Upstream(), url=re.compile(r"https://example.com/items/\d+"))
+
+    with tracer.start_as_current_span("job") as job:
+        service.gather(requests())
+
+    request_spans = [span for span in exporter.spans if span.parent_span_id == job.span_id]
+    assert len(request_spans) == 5
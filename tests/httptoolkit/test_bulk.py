@@ -0,0 +1,190 @@
+import asyncio
+import json
+import threading
+import time
+from typing import List, Sequence
+
+import httpx
+import pytest
+from pytest_httpx import HTTPXMock
+
+from httptoolkit.bulk import AsyncBulkWriter, BulkFormat, BulkWriter, BulkWriterStats
+from httptoolkit.service import AsyncService, Service
+from httptoolkit.transport import AsyncHttpxTransport, HttpxTransport
+
+
+class Endpoint:
+    def __init__(self, statuses: Sequence[int] = (), delay: float = 0.0) -> None:
+        self.bodies: List[bytes] = []
+        self.content_types: List[str] = []
+        self._statuses = list(statuses)
+        self._delay = delay
+        self._lock = threading.Lock()
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        time.sleep(self._delay)
+        with self._lock:
+            self.bodies.append(request.content)
+            self.content_types.append(request.headers["Content-Type"])
+            status_code = self._statuses.pop(0) if self._statuses else 200
+        return httpx.Response(status_code=status_code)
+
+    def ndjson_batches(self) -> List[List[dict]]:
+        return [[json.loads(line) for line in body.decode().splitlines()] for body in self.bodies]
+
+
+@pytest.fixture
+def service() -> Service:
+    return Service(transport=HttpxTransport(base_url="https://example.com", retry_max_attempts=1))
+
+
+@pytest.fixture
+def async_service() -> AsyncService:
+    return AsyncService(transport=AsyncHttpxTransport(base_url="https://example.com", retry_max_attempts=1))
+
+
+def test_flush_by_record_count(httpx_mock: HTTPXMock, service: Service):
+    endpoint = Endpoint()
+    httpx_mock.add_callback(endpoint, url="https://example.com/events")
+
+    with BulkWriter(service, "/events", max_records=2, max_in_flight=1) as writer:
+        for number in range(5):
+            writer.write({"n": number})
+
+    assert endpoint.ndjson_batches() == [[{"n": 0}, {"n": 1}], [{"n": 2}, {"n": 3}], [{"n": 4}]]
+    assert endpoint.content_types == ["application/x-ndjson"] * 3
+    assert writer.stats == BulkWriterStats(records=5, batches=3, retries=0, dropped=0)
+
+
+def test_json_array_flushed_by_size(httpx_mock: HTTPXMock, service: Service):
+    endpoint = Endpoint()
+    httpx_mock.add_callback(endpoint, url="https://example.com/events")
+
+    writer = BulkWriter(service, "/events", bulk_format=BulkFormat.JSON_ARRAY, max_bytes=20, max_in_flight=1)
+    for number in range(3):
+        writer.write({"n": number})  # 8 bytes each
+    writer.close()
+
+    assert endpoint.bodies == [b'[{"n": 0},{"n": 1}]', b'[{"n": 2}]']
+    assert endpoint.content_types == ["application/json"] * 2
+
+
+def test_flush_by_age(httpx_mock: HTTPXMock, service: Service):
+    endpoint = Endpoint()
+    httpx_mock.add_callback(endpoint, url="https://example.com/events")
+    writer = BulkWriter(service, "/events", max_age_in_seconds=0.05)
+
+    writer.write({"n": 0})
+    time.sleep(0.2)
+
+    assert endpoint.ndjson_batches() == [[{"n": 0}]]
+    writer.close()
+
+
+def test_retries_and_drops(httpx_mock: HTTPXMock, service: Service):
+    endpoint = Endpoint(statuses=[503, 200, 400])
+    httpx_mock.add_callback(endpoint, url="https://example.com/events")
+
+    with BulkWriter(service, "/events", max_records=1, max_in_flight=1, retry_backoff_factor=0) as writer:
+        writer.write({"n": 0})
+        writer.write({"n": 1})
+
+    assert writer.stats == BulkWriterStats(records=1, batches=1, retries=1, dropped=1)
+
+
+def test_backpressure(httpx_mock: HTTPXMock, service: Service):
+    httpx_mock.add_callback(Endpoint(delay=0.1), url="https://example.com/events")
+    writer = BulkWriter(service, "/events", max_records=1, max_buffered_records=1)
+
+    started = time.monotonic()
+    writer.write({"n": 0})
+    writer.write({"n": 1})
+
+    assert time.monotonic() - started >= 0.1
+    assert writer.close().records == 2
+
+
+def test_write_after_close(service: Service):
+    writer = BulkWriter(service, "/events")
+    writer.close()
+
+    with pytest.raises(RuntimeError):
+        writer.write({"n": 0})
+
+
+def test_write_blocked_by_close_fails(httpx_mock: HTTPXMock, service: Service):
+    endpoint = Endpoint(delay=0.2)
+    httpx_mock.add_callback(endpoint, url="https://example.com/events")
+    writer = BulkWriter(service, "/events", max_records=2, max_buffered_records=1)
+    writer.write({"n": 0})
+    errors = []
+
+    def write() -> None:
+        try:
+            writer.write({"n": 1})
+        except RuntimeError as exc:
+            errors.append(exc)
+
+    blocked = threading.Thread(target=write)
+    blocked.start()
+    time.sleep(0.05)
+    stats = writer.close()
+    blocked.join()
+
+    assert len(errors) == 1
+    assert endpoint.ndjson_batches() == [[{"n": 0}]]
+    assert stats == BulkWriterStats(records=1, batches=1, retries=0, dropped=0)
+
+
+@pytest.mark.asyncio
+async def test_async_writer(httpx_mock: HTTPXMock, async_service: AsyncService):
+    endpoint = Endpoint(statuses=[500])
+    httpx_mock.add_callback(endpoint, url="https://example.com/events")
+
+    async with AsyncBulkWriter(async_service, "/events", max_records=2, retry_backoff_factor=0) as writer:
+        for number in range(3):
+            await writer.write({"n": number})
+
+    assert sorted(map(tuple, endpoint.ndjson_batches()), key=len) == [
+        ({"n": 2},),
+        ({"n": 0}, {"n": 1}),
+        ({"n": 0}, {"n": 1}),
+    ]
+    assert writer.stats == BulkWriterStats(records=3, batches=2, retries=1, dropped=0)
+
+
+@pytest.mark.asyncio
+async def test_async_flush_by_age_and_backpressure(httpx_mock: HTTPXMock, async_service: AsyncService):
+    async def slow_endpoint(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(0.1)
+        return httpx.Response(status_code=200)
+
+    httpx_mock.add_callback(slow_endpoint, url="https://example.com/events")
+    writer = AsyncBulkWriter(async_service, "/events", max_age_in_seconds=0.01, max_buffered_records=1)
+
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    await writer.write({"n": 0})
+    await writer.write({"n": 1})
+
+    assert loop.time() - started >= 0.1
+    assert (await writer.close()).batches == 2
+
+
+@pytest.mark.asyncio
+async def test_async_write_blocked_by_close_fails(httpx_mock: HTTPXMock, async_service: AsyncService):
+    async def slow_endpoint(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(0.1)
+        return httpx.Response(status_code=200)
+
+    httpx_mock.add_callback(slow_endpoint, url="https://example.com/events")
+    writer = AsyncBulkWriter(async_service, "/events", max_records=1, max_buffered_records=1)
+    await writer.write({"n": 0})
+
+    blocked = asyncio.ensure_future(writer.write({"n": 1}))
+    await asyncio.sleep(0.01)
+    stats = await writer.close()
+
+    with pytest.raises(RuntimeError):
+        await blocked
+    assert stats == BulkWriterStats(records=1, batches=1, retries=0, dropped=0)
@@ -0,0 +1,157 @@
+import asyncio
+import threading
+import time
+
+import httpx
+import pytest
+from pytest_httpx import HTTPXMock
+
+from httptoolkit import AsyncService, Service
+from httptoolkit.concurrency_limit import AimdLimit, ConcurrencyLimiter, ConcurrencyLimitStats, GradientLimit
+from httptoolkit.errors import ConcurrencyLimitError, HttpError, RequestRejectedError, ServiceError
+from httptoolkit.metrics import MetricsRegistry
+from httptoolkit.transport import AsyncHttpxTransport, HttpxTransport
+
+
+def test_aimd_limit():
+    algorithm = AimdLimit(initial_limit=10, min_limit=2, max_limit=11, backoff_ratio=0.5, timeout_in_seconds=1.0)
+
+    assert algorithm.update(10, rtt=0.1, in_flight=5, dropped=False) == 11
+    assert algorithm.update(11, rtt=0.1, in_flight=6, dropped=False) == 11
+    assert algorithm.update(10, rtt=0.1, in_flight=4, dropped=False) == 10
+    assert algorithm.update(10, rtt=0.1, in_flight=10, dropped=True) == 5
+    assert algorithm.update(10, rtt=2.0, in_flight=10, dropped=False) == 5
+    assert algorithm.update(3, rtt=0.1, in_flight=3, dropped=True) == 2
+
+
+def test_gradient_limit():
+    algorithm = GradientLimit(initial_limit=16, smoothing=1.0, tolerance=1.0)
+
+    assert algorithm.update(16, rtt=0.1, in_flight=16, dropped=False) == 20
+    assert algorithm.update(20, rtt=0.1, in_flight=5, dropped=False) == 20
+    slower = algorithm.update(20, rtt=0.4, in_flight=20, dropped=False)
+    assert slower < 20
+    assert algorithm.update(16, rtt=0.1, in_flight=16, dropped=True) == 12
+
+
+def test_invalid_limits():
+    with pytest.raises(RuntimeError):
+        AimdLimit(initial_limit=0)
+
+
+def test_limiter_queues_and_rejects():
+    limiter = ConcurrencyLimiter(AimdLimit(initial_limit=1), max_queue_size=1, queue_timeout_in_seconds=None)
+    permit = limiter.acquire()
+    acquired = []
+    waiting = threading.Thread(target=lambda: acquired.append(limiter.acquire()))
+    waiting.start()
+    time.sleep(0.05)
+
+    assert limiter.acquire() is None
+    assert limiter.stats == ConcurrencyLimitStats(limit=1, in_flight=1, queued=1, rejected=1)
+
+    permit.release()
+    waiting.join()
+    assert acquired[0] is not None
+    assert limiter.stats == ConcurrencyLimitStats(limit=2, in_flight=1, queued=0, rejected=1)
+
+
+def test_limiter_queue_timeout():
+    limiter = ConcurrencyLimiter(AimdLimit(initial_limit=1), queue_timeout_in_seconds=0.01)
+    limiter.acquire()
+
+    assert limiter.acquire() is None
+    assert limiter.stats.queued == 0
+
+
+@pytest.mark.asyncio
+async def test_async_limiter_cancelled_waiter():
+    limiter = ConcurrencyLimiter(AimdLimit(initial_limit=1))
+    permit = await limiter.acquire_async()
+    waiter = asyncio.ensure_future(limiter.acquire_async())
+    await asyncio.sleep(0)
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+
+    permit.release()
+    assert limiter.stats == ConcurrencyLimitStats(limit=2, in_flight=0, queued=0, rejected=0)
+
+
+def test_transport_rejects_above_limit(httpx_mock: HTTPXMock):
+    release = threading.Event()
+
+    def respond(request: httpx.Request) -> httpx.Response:
+        release.wait()
+        return httpx.Response(status_code=200)
+
+    httpx_mock.add_callback(respond, url="https://example.com/items")
+    limiter = ConcurrencyLimiter(AimdLimit(initial_limit=1), max_queue_size=0)
+    metrics = MetricsRegistry(routes={"/items"})
+    service = Service(
+        transport=HttpxTransport(base_url="https://example.com", concurrency_limiter=limiter, metrics=metrics)
+    )
+    first = threading.Thread(target=service.get, args=("/items",))
+    first.start()
+    time.sleep(0.05)
+
+    with pytest.raises(ConcurrencyLimitError) as error:
+        service.get("/items")
+    release.set()
+    first.join()
+
+    assert isinstance(error.value, RequestRejectedError)
+    assert "the request was not sent" in str(error.value)
+    assert len(httpx_mock.get_requests()) == 1
+    (series,) = metrics.snapshot()
+    assert series.responses == {"200": 1, "concurrency_limited": 1}
+
+
+def test_transport_backs_off_on_overload(httpx_mock: HTTPXMock):
+    httpx_mock.add_response(url="https://example.com/items", status_code=503)
+    limiter = ConcurrencyLimiter(AimdLimit(initial_limit=10, backoff_ratio=0.5))
+    service = Service(
+        transport=HttpxTransport(base_url="https://example.com", retry_max_attempts=1, concurrency_limiter=limiter)
+    )
+
+    with pytest.raises(HttpError):
+        service.get("/items")
+
+    assert limiter.stats == ConcurrencyLimitStats(limit=5, in_flight=0, queued=0, rejected=0)
+
+
+def test_transport_stream_error_after_response_is_not_a_drop(httpx_mock: HTTPXMock):
+    httpx_mock.add_response(url="https://example.com/items", status_code=404)
+    limiter = ConcurrencyLimiter(AimdLimit(initial_limit=10, backoff_ratio=0.5))
+    service = Service(transport=HttpxTransport(base_url="https://example.com", concurrency_limiter=limiter))
+
+    with pytest.raises(ServiceError):
+        with service.get_stream("/items"):
+            pass  # pragma: no cover
+
+    assert limiter.stats.limit == 10
+
+
+@pytest.mark.asyncio
+async def test_async_transport_queues_above_limit(httpx_mock: HTTPXMock):
+    in_flight = []
+    max_in_flight = []
+
+    async def respond(request: httpx.Request) -> httpx.Response:
+        in_flight.append(request)
+        max_in_flight.append(len(in_flight))
+        await asyncio.sleep(0.01)
+        in_flight.remove(request)
+        return httpx.Response(status_code=200)
+
+    httpx_mock.add_callback(respond, url="https://example.com/items")
+    limiter = ConcurrencyLimiter(AimdLimit(initial_limit=2, max_limit=2))
+    service = AsyncService(transport=AsyncHttpxTransport(base_url="https://example.com", concurrency_limiter=limiter))
+
+    await asyncio.gather(*(service.get("/items") for _ in range(6)))
+    async with service.get_stream("/items") as response:
+        assert limiter.stats.in_flight == 1
+        await response.read()
+
+    assert max(max_in_flight) == 2
+    assert limiter.stats == ConcurrencyLimitStats(limit=2, in_flight=0, queued=0, rejected=0)
@@ -0,0 +1,121 @@
+from contextlib import asynccontextmanager, contextmanager
+from typing import AsyncIterator, Iterator, List, Tuple
+
+import pytest
+from pytest_httpx import HTTPXMock
+
+from httptoolkit import AsyncService, Header, Service
+from httptoolkit.errors import HttpError
+from httptoolkit.interceptor import AsyncInterceptor, Interceptor, compile_send
+from httptoolkit.interceptor._async import AsyncSendHandler, AsyncStreamHandler
+from httptoolkit.interceptor._sync import SendHandler, StreamHandler
+from httptoolkit.request import Request
+from httptoolkit.response import AsyncStreamResponse, Response, StreamResponse
+from httptoolkit.sent_request import SentRequest
+from httptoolkit.transport import AsyncHttpxTransport, HttpxTransport
+
+
+class AddHeader(Interceptor):
+    def __init__(self, name: str, value: str, calls: List[str]) -> None:
+        self._header = Header(name=name, value=value, is_sensitive=False)
+        self._calls = calls
+
+    def send(self, request: Request, call_next: SendHandler) -> Tuple[SentRequest, Response]:
+        self._calls.append(self._header.value)
+        return call_next(request.set_new_headers((self._header,)))
+
+    @contextmanager
+    def stream(self, request: Request, call_next: StreamHandler) -> Iterator[Tuple[SentRequest, StreamResponse]]:
+        self._calls.append(f"stream {self._header.value}")
+        with call_next(request.set_new_headers((self._header,))) as result:
+            yield result
+
+
+class RefreshToken(Interceptor):
+    def __init__(self) -> None:
+        self.token = "expired"
+
+    def send(self, request: Request, call_next: SendHandler) -> Tuple[SentRequest, Response]:
+        sent_request, response = call_next(self._authorize(request))
+        if response.status_code == 401:
+            self.token = "fresh"
+            sent_request, response = call_next(self._authorize(request))
+        return sent_request, response
+
+    def _authorize(self, request: Request) -> Request:
+        return request.set_new_headers((Header(name="Authorization", value=self.token, is_sensitive=True),))
+
+
+class AsyncAddHeader(AsyncInterceptor):
+    async def send(self, request: Request, call_next: AsyncSendHandler) -> Tuple[SentRequest, Response]:
+        return await call_next(request.set_new_headers((Header(name="Added", value="send", is_sensitive=False),)))
+
+    @asynccontextmanager
+    async def stream(
+        self,
+        request: Request,
+        call_next: AsyncStreamHandler,
+    ) -> AsyncIterator[Tuple[SentRequest, AsyncStreamResponse]]:
+        async with call_next(
+            request.set_new_headers((Header(name="Added", value="stream", is_sensitive=False),))
+        ) as result:
+            yield result
+
+
+def test_interceptors_run_in_order(httpx_mock: HTTPXMock):
+    calls: List[str] = []
+    service = Service(
+        transport=HttpxTransport(base_url="https://example.com:4321"),
+        interceptors=(AddHeader("First", "first", calls), AddHeader("Second", "second", calls)),
+    )
+    httpx_mock.add_response(url="https://example.com:4321/items", text="items")
+    httpx_mock.add_response(url="https://example.com:4321/stream", text="stream")
+
+    assert service.get("/items").text == "items"
+    with service.get_stream("/stream") as response:
+        assert response.read() == b"stream"
+
+    assert calls == ["first", "second", "stream first", "stream second"]
+    for call in httpx_mock.get_requests():
+        assert call.headers["First"] == "first"
+        assert call.headers["Second"] == "second"
+
+
+def test_interceptor_sees_error_status(httpx_mock: HTTPXMock):
+    refresh = RefreshToken()
+    service = Service(transport=HttpxTransport(base_url="https://example.com:4321"), interceptors=(refresh,))
+    httpx_mock.add_response(url="https://example.com:4321/items", status_code=401)
+    httpx_mock.add_response(url="https://example.com:4321/items", text="items")
+
+    assert service.get("/items").text == "items"
+    assert [call.headers["Authorization"] for call in httpx_mock.get_requests()] == ["expired", "fresh"]
+
+
+def test_response_is_validated_after_interceptors(httpx_mock: HTTPXMock):
+    service = Service(transport=HttpxTransport(base_url="https://example.com:4321"), interceptors=(Interceptor(),))
+    httpx_mock.add_response(url="https://example.com:4321/items", status_code=404)
+
+    with pytest.raises(HttpError):
+        service.get("/items")
+
+
+def test_empty_chain_is_transport_method():
+    transport = HttpxTransport(base_url="https://example.com:4321")
+
+    assert compile_send((), transport.send) == transport.send
+    assert compile_send((Interceptor(),), transport.send) == transport.send
+
+
+@pytest.mark.asyncio
+async def test_async_interceptors(httpx_mock: HTTPXMock):
+    service = AsyncService(
+        transport=AsyncHttpxTransport(base_url="https://example.com:4321"), interceptors=(AsyncAddHeader(),)
+    )
+    httpx_mock.add_response(url="https://example.com:4321/items", text="items")
+    httpx_mock.add_response(url="https://example.com:4321/stream", text="stream")
+
+    assert (await service.get("/items")).text == "items"
+    async with service.get_stream("/stream") as response:
+        assert await response.read() == b"stream"
+
+    assert [call.headers["Added"] for call in httpx_mock.get_requests()] == ["send", "stream"]
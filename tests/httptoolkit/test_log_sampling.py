@@ -0,0 +1,68 @@
+import logging
+from unittest.mock import patch
+
+import pytest
+from testfixtures import LogCapture
+
+from httptoolkit import HttpMethod
+from httptoolkit.log_sampling import EveryNthLogSampler, RouteLogSampler, TokenBucketLogSampler
+from httptoolkit.prepared_request import PreparedRequest
+from httptoolkit.sent_request import SentRequest
+
+LOGGER = logging.getLogger("httptoolkit.test")
+
+
+def test_every_nth(get_sent_request: SentRequest):
+    sampler = EveryNthLogSampler(3)
+
+    assert [sampler.sample(LOGGER, get_sent_request) for _ in range(6)] == [True, False, False, True, False, False]
+
+
+def test_every_nth_must_be_positive():
+    with pytest.raises(RuntimeError):
+        EveryNthLogSampler(0)
+
+
+def test_route(get_sent_request: SentRequest):
+    prepared = PreparedRequest(method=HttpMethod.GET, path="/users/{user_id}")
+    template_sent_request = SentRequest(prepared.build(path_params={"user_id": 1}), "https://example.com", None)
+    sampler = RouteLogSampler({"/users/{user_id}": 0.0, "/put/some/data/here": 0.5}, default_rate=0.0)
+
+    with patch("random.random", return_value=0.4):
+        assert sampler.sample(LOGGER, get_sent_request)
+        assert not sampler.sample(LOGGER, template_sent_request)
+    with patch("random.random", return_value=0.6):
+        assert not sampler.sample(LOGGER, get_sent_request)
+
+
+def test_token_bucket_per_logger(get_sent_request: SentRequest):
+    other_logger = logging.getLogger("httptoolkit.other")
+    sampler = TokenBucketLogSampler(rate=1, burst=2)
+
+    with patch("time.monotonic", return_value=100.0):
+        assert [sampler.sample(LOGGER, get_sent_request) for _ in range(3)] == [True, True, False]
+        assert sampler.sample(other_logger, get_sent_request)
+    with patch("time.monotonic", return_value=101.0):
+        assert [sampler.sample(LOGGER, get_sent_request) for _ in range(2)] == [True, False]
+
+
+def test_suppressed_records_are_reported(get_sent_request: SentRequest):
+    sampler = EveryNthLogSampler(10, report_interval_in_seconds=60)
+
+    with LogCapture(level=logging.INFO) as capture:
+        with patch("time.monotonic", return_value=100.0):
+            sampler.sample(LOGGER, get_sent_request)
+            sampler.suppress(LOGGER)
+            sampler.suppress(LOGGER)
+        with patch("time.monotonic", return_value=161.0):
+            sampler.sample(LOGGER, get_sent_request)
+            sampler.sample(LOGGER, get_sent_request)
+
+    capture.check(("httptoolkit.test", "INFO", "Suppressed 2 request log records in the last 61 s"))
+    assert capture.records[0].suppressed == 2
+
+
+def test_is_slow():
+    assert EveryNthLogSampler(2, slow_request_threshold_in_seconds=1).is_slow(1)
+    assert not EveryNthLogSampler(2, slow_request_threshold_in_seconds=1).is_slow(0.5)
+    assert not EveryNthLogSampler(2).is_slow(100)
@@ -0,0 +1,101 @@
+import pytest
+from pytest_httpx import HTTPXMock
+
+from httptoolkit import AsyncService, Header, HttpMethod, Service
+from httptoolkit.prepared_request import PreparedRequest, TemplateRequest
+from httptoolkit.transport import AsyncHttpxTransport, HttpxTransport
+
+
+@pytest.fixture
+def prepared() -> PreparedRequest:
+    return PreparedRequest(
+        method=HttpMethod.GET,
+        path="/users/{user_id}/items",
+        headers=(Header(name="ServiceHeader", value="service-header", is_sensitive=False),),
+        params={"fields": "name"},
+    )
+
+
+def test_build(prepared: PreparedRequest):
+    request = prepared.build(
+        path_params={"user_id": "a/b c"},
+        headers=(Header(name="RequestHeader", value="request-header", is_sensitive=False),),
+        params={"page": 2},
+    )
+
+    assert request.method == "GET"
+    assert request.path == "/users/a%2Fb%20c/items"
+    assert request.params == {"fields": "name", "page": 2}
+    assert request.full_path == "/users/a%2Fb%20c/items?fields=name&page=2"
+    assert request.headers == (
+        Header(name="ServiceHeader", value="service-header", is_sensitive=False),
+        Header(name="RequestHeader", value="request-header", is_sensitive=False),
+    )
+    assert (
+        request.build_absolute_url("https://example.com/")
+        == "https://example.com/users/a%2Fb%20c/items?fields=name&page=2"
+    )
+
+
+def test_dynamic_params_override_static(prepared: PreparedRequest):
+    request = prepared.build(path_params={"user_id": 1}, params={"fields": "id"})
+
+    assert request.full_path == "/users/1/items?fields=id"
+
+
+def test_set_new_headers_keeps_template(prepared: PreparedRequest):
+    request = prepared.build(path_params={"user_id": 1}, json={"a": 1})
+    new_request = request.set_new_headers((Header(name="If-None-Match", value='"v1"', is_sensitive=False),))
+
+    assert isinstance(new_request, TemplateRequest)
+    assert new_request.template is prepared
+    assert new_request.full_path == request.full_path
+    assert new_request.json == {"a": 1}
+    assert [header.name for header in new_request.headers] == ["ServiceHeader", "If-None-Match"]
+
+
+def test_service_sends_prepared_request(httpx_mock: HTTPXMock):
+    httpx_mock.add_response(
+        method="POST",
+        url="https://example.com:4321/api/users/42?fields=name",
+        json={"ok": True},
+    )
+    service = Service(
+        transport=HttpxTransport(base_url="https://example.com:4321/api/"),
+        headers=(Header(name="ServiceHeader", value="service-header", is_sensitive=False),),
+    )
+    prepared = service.prepare(
+        HttpMethod.POST,
+        "/users/{user_id}",
+        headers=(Header(name="Content-Type", value="application/vnd.api+json", is_sensitive=False),),
+        params={"fields": "name"},
+    )
+
+    for _ in range(2):
+        response = service.request(
+            prepared.build(
+                path_params={"user_id": 42},
+                headers=(Header(name="RequestHeader", value="request-header", is_sensitive=False),),
+                json={"param1": 1},
+            )
+        )
+        assert response.json() == {"ok": True}
+
+    for call in httpx_mock.get_requests():
+        assert call.headers["ServiceHeader"] == "service-header"
+        assert call.headers["RequestHeader"] == "request-header"
+        assert call.headers["Content-Type"] == "application/vnd.api+json"
+        assert call.headers["User-Agent"].startswith("python-httpx")
+        assert call.content == b'{"param1": 1}'
+        assert call.extensions["timeout"] == {"connect": 1, "pool": None, "read": 1, "write": None}
+
+
+@pytest.mark.asyncio
+async def test_async_service_sends_prepared_request(httpx_mock: HTTPXMock):
+    httpx_mock.add_response(method="GET", url="https://example.com:4321/users/42", text="user")
+    service = AsyncService(transport=AsyncHttpxTransport(base_url="https://example.com:4321"))
+    prepared = service.prepare(HttpMethod.GET, "/users/{user_id}")
+
+    response = await service.request(prepared.build(path_params={"user_id": 42}))
+
+    assert response.text == "user"
@@ -0,0 +1,116 @@
+import time
+
+import pytest
+from pytest_httpx import HTTPXMock
+
+from httptoolkit import AsyncService, Service
+from httptoolkit.errors import RateLimitError, RequestRejectedError
+from httptoolkit.metrics import MetricsRegistry
+from httptoolkit.rate_limit import RateLimit, RateLimiter, RateLimitStats
+from httptoolkit.transport import AsyncHttpxTransport, HttpxTransport
+
+
+def test_paces_requests_after_burst():
+    limiter = RateLimiter(RateLimit(rate=10, burst=2))
+
+    delays = [limiter.reserve("/items") for _ in range(4)]
+
+    assert delays[:2] == [0, 0]
+    assert delays[2] == pytest.approx(0.1, abs=0.01)
+    assert delays[3] == pytest.approx(0.2, abs=0.01)
+    assert limiter.stats == RateLimitStats(delayed=2, rejected=0, pauses=0)
+
+
+def test_fails_fast():
+    limiter = RateLimiter(RateLimit(rate=10), max_wait_in_seconds=0)
+
+    assert limiter.reserve("/items") == 0
+    assert limiter.reserve("/items") is None
+    assert limiter.reserve("/items", retry=True) == pytest.approx(0.1, abs=0.01)
+    assert limiter.stats.rejected == 1
+
+
+def test_routes_have_own_buckets():
+    limiter = RateLimiter(RateLimit(rate=1), routes={"/search": RateLimit(rate=1)}, max_wait_in_seconds=0)
+
+    assert limiter.reserve("/items") == 0
+    assert limiter.reserve("/users") is None
+    assert limiter.reserve("/search") == 0
+    assert limiter.reserve("/search") is None
+
+
+def test_no_limit_without_configuration():
+    limiter = RateLimiter(max_wait_in_seconds=0)
+
+    assert [limiter.reserve("/items") for _ in range(100)] == [0] * 100
+
+
+@pytest.mark.parametrize(
+    "status_code, headers, paused",
+    [
+        (429, {"Retry-After": "5"}, True),
+        (503, {"Retry-After": "5"}, True),
+        (500, {"Retry-After": "5"}, False),
+        (200, {"RateLimit-Remaining": "0", "RateLimit-Reset": "5"}, True),
+        (200, {"RateLimit-Remaining": "3", "RateLimit-Reset": "5"}, False),
+        (200, {"RateLimit": "limit=100, remaining=0, reset=5"}, True),
+        (200, {}, False),
+    ],
+)
+def test_pauses_on_response_headers(status_code, headers, paused):
+    limiter = RateLimiter(routes={"/search": RateLimit(rate=100)}, max_wait_in_seconds=1)
+
+    limiter.update("/items", status_code, headers)
+
+    assert (limiter.reserve("/items") is None) is paused
+    assert limiter.reserve("/search") == 0
+    assert limiter.stats.pauses == int(paused)
+
+
+def test_transport_avoids_429(httpx_mock: HTTPXMock):
+    httpx_mock.add_response(
+        url="https://example.com/items", headers={"RateLimit-Remaining": "0", "RateLimit-Reset": "60"}
+    )
+    limiter = RateLimiter(max_wait_in_seconds=0)
+    metrics = MetricsRegistry(routes={"/items"})
+    service = Service(transport=HttpxTransport(base_url="https://example.com", rate_limiter=limiter, metrics=metrics))
+
+    service.get("/items")
+    with pytest.raises(RateLimitError) as error:
+        service.get("/items")
+
+    assert isinstance(error.value, RequestRejectedError)
+    assert len(httpx_mock.get_requests()) == 1
+    (series,) = metrics.snapshot()
+    assert series.responses == {"200": 1, "rate_limited": 1}
+
+
+def test_transport_retry_waits_for_limit(httpx_mock: HTTPXMock):
+    httpx_mock.add_response(url="https://example.com/items", status_code=429)
+    httpx_mock.add_response(url="https://example.com/items")
+    limiter = RateLimiter(RateLimit(rate=10), max_wait_in_seconds=0)
+    service = Service(
+        transport=HttpxTransport(base_url="https://example.com", retry_backoff_factor=0, rate_limiter=limiter)
+    )
+
+    started = time.monotonic()
+    service.get("/items")
+
+    assert time.monotonic() - started >= 0.09
+    assert limiter.stats == RateLimitStats(delayed=1, rejected=0, pauses=0)
+
+
+@pytest.mark.asyncio
+async def test_async_transport_waits(httpx_mock: HTTPXMock):
+    httpx_mock.add_response(url="https://example.com/items")
+    limiter = RateLimiter(RateLimit(rate=20))
+    service = AsyncService(transport=AsyncHttpxTransport(base_url="https://example.com", rate_limiter=limiter))
+
+    started = time.monotonic()
+    for _ in range(3):
+        await service.get("/items")
+    async with service.get_stream("/items"):
+        pass
+
+    assert time.monotonic() - started >= 0.14
+    assert limiter.stats.delayed == 3
@@ -61,6 +61,20 @@ def test_set_new_headers(test_file):
     assert new_post_request.files == {"upload-file": test_file}
 
 
+def test_encode_json_once():
+    calls = []
+
+    def encoder(content) -> str:
+        calls.append(content)
+        return str(content)
+
+    request = Request(method=HttpMethod.POST, path="/", params=None, json={"param1": 1})
+
+    assert request.encode_json(encoder) == "{'param1': 1}"
+    assert request.set_new_headers(()).encode_json(encoder) == "{'param1': 1}"
+    assert calls == [{"param1": 1}]
+
+
 def test_filtered_and_masked_headers(filtered_and_masked_headers):
     request = Request(
         method=HttpMethod.GET,
@@ -0,0 +1,76 @@
+import pickle
+
+import httpx
+import pytest
+from pytest_httpx import HTTPXMock
+
+from httptoolkit import Service
+from httptoolkit.errors import HttpError, ServiceError
+from httptoolkit.request_history import RequestHistory
+from httptoolkit.retry import Attempt
+from httptoolkit.transport import HttpxTransport
+
+
+def test_keeps_last_records_in_order():
+    history = RequestHistory(size=3)
+
+    for index in range(5):
+        history.add(method="GET", route=f"/items/{index}", status_code=200, elapsed=0.01)
+
+    assert [record.route for record in history.records()] == ["/items/2", "/items/3", "/items/4"]
+
+
+def test_dump():
+    history = RequestHistory(size=2)
+    history.add(method="get", route="/items", status_code=200, elapsed=0.012, attempts=[Attempt(0.012, 200)])
+    history.add(method="post", route="/items", status_code=None, elapsed=1.5, error="ReadTimeout")
+
+    first, second = history.dump().split("\n")
+
+    assert first.endswith(" GET /items 200 in 12 ms (attempts: 1)")
+    assert second.endswith(" POST /items ReadTimeout in 1500 ms (attempts: 0)")
+
+
+def test_size_must_be_positive():
+    with pytest.raises(RuntimeError):
+        RequestHistory(size=0)
+
+
+def test_transport_records_requests_and_attaches_them_to_service_error(httpx_mock: HTTPXMock):
+    history = RequestHistory(size=10)
+    service = Service(
+        transport=HttpxTransport(base_url="https://example.com:4321", retry_max_attempts=1, history=history)
+    )
+    httpx_mock.add_response(url="https://example.com:4321/first", text="first")
+    httpx_mock.add_exception(httpx.ReadTimeout("Timeout reached"), url="https://example.com:4321/second")
+
+    service.get("/first")
+    with pytest.raises(ServiceError) as error:
+        service.get("/second")
+
+    first, second = history.records()
+    assert (first.method, first.route, first.status_code, len(first.attempts)) == ("GET", "/first", 200, 1)
+    assert (second.route, second.status_code, second.error) == ("/second", None, "ReadTimeout")
+    assert error.value.history == (first, second)
+    assert "Recent requests (last 2 of 2):" in str(error.value)
+    assert pickle.loads(pickle.dumps(error.value)).history == (first, second)
+
+
+def test_http_error_has_history_and_message_shows_the_last_records(httpx_mock: HTTPXMock):
+    history = RequestHistory(size=10)
+    service = Service(
+        transport=HttpxTransport(base_url="https://example.com:4321", retry_max_attempts=1, history=history)
+    )
+    httpx_mock.add_response(url="https://example.com:4321/items", text="items")
+    httpx_mock.add_response(url="https://example.com:4321/missing", status_code=404)
+
+    for _ in range(7):
+        service.get("/items")
+    with pytest.raises(HttpError) as error:
+        service.get("/missing")
+
+    assert error.value.history == tuple(history.records())
+    assert len(error.value.history) == 8
+    message = str(error.value)
+    assert f"Recent requests (last {ServiceError.HISTORY_IN_MESSAGE} of 8):" in message
+    assert message.count(" GET /items 200 ") == ServiceError.HISTORY_IN_MESSAGE - 1
@@ -16,19 +16,25 @@ def test_post_request_format(post_sent_request):
 
 
 def test_args(post_sent_request):
-    assert RequestLogRecord(post_sent_request).args() == {
+    args = RequestLogRecord(post_sent_request).args()
+
+    assert str(args.pop("headers")) == "ServiceHeader: service-header\nRequestHeader: request-header"
+    assert args == {
         "method": "POST",
         "url": "https://example.com:4321/put/some/data/here?please=True&carefully=True",
-        "headers": "ServiceHeader: service-header\nRequestHeader: request-header",
         "body_size": 43,
     }
 
 
 def test_args_json(x_sent_request_dict_json):
     metod, x_request = x_sent_request_dict_json
-    assert RequestLogRecord(x_request).args() == {
+    args = RequestLogRecord(x_request).args()
+
+    assert str(args.pop("headers")) == (
+        "ServiceHeader: service-header\nRequestHeader: request-header\nContent-Type: application/json"
+    )
+    assert args == {
         "method": metod,
         "url": "https://example.com:4321/put/some/data/here?please=True&carefully=True",
-        "headers": "ServiceHeader: service-header\nRequestHeader: request-header\nContent-Type: application/json",
-        "body_size": 29,
+        "body_size": 26,
     }
@@ -0,0 +1,74 @@
+import logging
+
+import pytest
+from pytest_httpx import HTTPXMock
+from testfixtures import LogCapture
+
+from httptoolkit.slow_request import SlowRequestThresholds, slow_request_thresholds
+from httptoolkit.transport import AsyncHttpxTransport, HttpxTransport
+
+URL = "https://example.com:4321/put/some/data/here?please=True&carefully=True"
+
+
+@pytest.fixture
+def global_thresholds():
+    yield slow_request_thresholds
+    slow_request_thresholds.default = None
+    slow_request_thresholds.routes.clear()
+
+
+def test_thresholds_per_route():
+    thresholds = SlowRequestThresholds(default=1, routes={"/fast": 0.1, "/ignored": None})
+
+    assert thresholds.get("/fast") == 0.1
+    assert thresholds.get("/ignored") is None
+    assert thresholds.get("/other") == 1
+
+
+def test_slow_request_is_logged(get_request, httpx_mock: HTTPXMock):
+    transport = HttpxTransport(
+        base_url="https://example.com:4321",
+        retry_max_attempts=1,
+        slow_request_thresholds=SlowRequestThresholds(default=0),
+    )
+    httpx_mock.add_response(url=URL)
+
+    with LogCapture(level=logging.WARNING) as capture:
+        transport.send(get_request)
+
+    (record,) = capture.records
+    assert record.levelname == "WARNING"
+    assert record.getMessage().startswith(f"Slow request GET {URL}: ")
+    assert record.getMessage().endswith(" ms (threshold: 0 ms, attempts: 1)")
+    assert record.route == "/put/some/data/here"
+    assert record.status_code == 200
+    assert record.request_headers["serviceheader"] == "service-header"
+    assert record.elapsed == pytest.approx(record.attempts[0].elapsed, abs=0.05)
+
+
+def test_route_threshold_overrides_default(get_request, httpx_mock: HTTPXMock):
+    transport = HttpxTransport(
+        base_url="https://example.com:4321",
+        retry_max_attempts=1,
+        slow_request_thresholds=SlowRequestThresholds(default=0, routes={"/put/some/data/here": 60}),
+    )
+    httpx_mock.add_response(url=URL)
+
+    with LogCapture(level=logging.WARNING) as capture:
+        transport.send(get_request)
+
+    capture.check()
+
+
+@pytest.mark.asyncio
+async def test_global_threshold_applies_to_stream(get_request, httpx_mock: HTTPXMock, global_thresholds):
+    global_thresholds.default = 0
+    transport = AsyncHttpxTransport(base_url="https://example.com:4321", retry_max_attempts=1)
+    httpx_mock.add_response(url=URL, text="Streamed")
+
+    with LogCapture(level=logging.WARNING) as capture:
+        async with transport.stream(get_request) as (_, response):
+            await response.read()
+
+    (record,) = capture.records
+    assert record.getMessage().startswith(f"Slow request GET {URL}: ")
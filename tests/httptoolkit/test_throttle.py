@@ -0,0 +1,123 @@
+import pytest
+from pytest_httpx import HTTPXMock
+
+from httptoolkit import AsyncService, Service
+from httptoolkit.errors import HttpError, RateLimitError, RequestRejectedError, ServiceError, ThrottledError
+from httptoolkit.metrics import MetricsRegistry
+from httptoolkit.rate_limit import RateLimit, RateLimiter
+from httptoolkit.throttle import AdaptiveThrottle, ThrottleStats
+from httptoolkit.transport import AsyncHttpxTransport, HttpxTransport
+
+
+def test_no_rejection_while_accepted():
+    throttle = AdaptiveThrottle(random_source=lambda: 0.0)
+    for _ in range(100):
+        assert throttle.allow()
+        throttle.record(200)
+
+    assert throttle.stats == ThrottleStats(requests=100, accepts=100, rejected=0, rejection_probability=0.0)
+
+
+def test_rejection_probability():
+    throttle = AdaptiveThrottle(k=2, random_source=iter([0.99, 0.99, 0.99, 0.0]).__next__)
+    for status_code in (200, 503, 503, 503, None):
+        throttle.allow()
+        throttle.record(status_code)
+
+    # (5 - 2 * 1) / (5 + 1)
+    assert throttle.stats.rejection_probability == 0.5
+    assert throttle.allow()
+    assert not throttle.allow()
+    # the allowed request is not counted until it is recorded
+    assert throttle.stats == ThrottleStats(requests=6, accepts=1, rejected=1, rejection_probability=4 / 7)
+
+
+def test_window_slides(monkeypatch: pytest.MonkeyPatch):
+    now = [1000.0]
+    monkeypatch.setattr("httptoolkit.throttle.time.monotonic", lambda: now[0])
+    throttle = AdaptiveThrottle(window_in_seconds=10, buckets=10, random_source=lambda: 1.0)
+    throttle.allow()
+    throttle.record(None)
+    now[0] += 5
+    throttle.allow()
+    throttle.record(200)
+
+    now[0] += 6
+    assert throttle.stats == ThrottleStats(requests=1, accepts=1, rejected=0, rejection_probability=0.0)
+    now[0] += 100
+    assert throttle.stats.requests == 0
+
+
+def test_invalid_k():
+    with pytest.raises(RuntimeError):
+        AdaptiveThrottle(k=0)
+
+
+def test_transport_rejects_locally(httpx_mock: HTTPXMock):
+    httpx_mock.add_response(url="https://example.com/items", status_code=503)
+    metrics = MetricsRegistry()
+    throttle = AdaptiveThrottle(random_source=lambda: 0.0)
+    service = Service(
+        transport=HttpxTransport(
+            base_url="https://example.com", retry_max_attempts=1, throttle=throttle, metrics=metrics
+        )
+    )
+
+    with pytest.raises(HttpError):
+        service.get("/items")
+    with pytest.raises(ThrottledError) as error:
+        service.get("/items")
+
+    assert isinstance(error.value, RequestRejectedError)
+    assert len(httpx_mock.get_requests()) == 1
+    assert throttle.stats == ThrottleStats(requests=2, accepts=0, rejected=1, rejection_probability=2 / 3)
+    (series,) = metrics.snapshot()
+    assert series.responses == {"503": 1, "throttled": 1}
+
+
+def test_transport_does_not_count_requests_rejected_by_rate_limiter(httpx_mock: HTTPXMock):
+    httpx_mock.add_response(url="https://example.com/items")
+    throttle = AdaptiveThrottle(random_source=lambda: 0.0)
+    service = Service(
+        transport=HttpxTransport(
+            base_url="https://example.com",
+            throttle=throttle,
+            rate_limiter=RateLimiter(RateLimit(rate=1), max_wait_in_seconds=0),
+        )
+    )
+
+    service.get("/items")
+    for _ in range(5):
+        with pytest.raises(RateLimitError):
+            service.get("/items")
+
+    assert throttle.stats == ThrottleStats(requests=1, accepts=1, rejected=0, rejection_probability=0.0)
+
+
+def test_transport_counts_stream_errors_after_response_as_accepted(httpx_mock: HTTPXMock):
+    httpx_mock.add_response(url="https://example.com/items", status_code=404)
+    throttle = AdaptiveThrottle()
+    service = Service(transport=HttpxTransport(base_url="https://example.com", throttle=throttle))
+
+    with pytest.raises(ServiceError):
+        with service.get_stream("/items"):
+            pass  # pragma: no cover
+
+    assert throttle.stats.accepts == 1
+
+
+@pytest.mark.asyncio
+async def test_async_transport(httpx_mock: HTTPXMock):
+    httpx_mock.add_response(url="https://example.com/items", status_code=429)
+    throttle = AdaptiveThrottle(random_source=lambda: 0.0)
+    service = AsyncService(
+        transport=AsyncHttpxTransport(base_url="https://example.com", retry_max_attempts=1, throttle=throttle)
+    )
+
+    with pytest.raises(HttpError):
+        await service.get("/items")
+    with pytest.raises(ThrottledError):
+        async with service.get_stream("/items"):
+            pass  # pragma: no cover
+
+    assert len(httpx_mock.get_requests()) == 1
@@ -0,0 +1,117 @@
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Iterator
+from unittest.mock import patch
+
+import pytest
+from testfixtures import LogCapture
+
+from httptoolkit import HttpMethod
+from httptoolkit.request import Request
+from httptoolkit.slow_request import SlowRequestThresholds
+from httptoolkit.timings import Timings, TimingsRecorder
+from httptoolkit.transport import AsyncHttpxTransport, HttpxTransport
+
+
+class Handler(BaseHTTPRequestHandler):
+    def do_GET(self) -> None:
+        body = b"timed"
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+@pytest.fixture
+def base_url() -> Iterator[str]:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def request() -> Request:
+    return Request(method=HttpMethod.GET, path="/timed", params=None)
+
+
+def assert_phases(timings: Timings) -> None:
+    for phase in ("pool_wait", "connect", "request_write", "ttfb", "body"):
+        assert getattr(timings, phase) >= 0, phase
+    assert timings.tls is None
+
+
+def test_recorder_phases():
+    recorder = TimingsRecorder()
+    events = [
+        (1.0, None),
+        (1.5, "connection.connect_tcp.started"),
+        (2.0, "connection.connect_tcp.complete"),
+        (2.0, "http11.send_request_headers.started"),
+        (2.25, "http11.send_request_headers.complete"),
+        (2.25, "http11.send_request_body.started"),
+        (2.5, "http11.send_request_body.complete"),
+        (2.5, "http11.receive_response_headers.started"),
+        (4.0, "http11.receive_response_headers.complete"),
+        (4.0, "http11.receive_response_body.started"),
+        (5.0, "http11.receive_response_body.complete"),
+    ]
+
+    for now, name in events:
+        with patch("time.perf_counter", return_value=now):
+            if name is None:
+                recorder.start_attempt()
+            else:
+                recorder.trace(name, {})
+
+    assert recorder.last == Timings(pool_wait=0.5, connect=0.5, tls=None, request_write=0.5, ttfb=1.5, body=1.0)
+
+
+def test_send_collects_timings(base_url: str):
+    collected = []
+    transport = HttpxTransport(
+        base_url=base_url, retry_max_attempts=1, timings_hook=lambda request, timings: collected.append(timings)
+    )
+
+    _, response = transport.send(request())
+
+    assert response.timings is not None
+    assert_phases(response.timings)
+    assert collected == [(response.timings,)]
+
+
+def test_timings_are_not_collected_by_default(base_url: str):
+    _, response = HttpxTransport(base_url=base_url, retry_max_attempts=1).send(request())
+
+    assert response.timings is None
+
+
+@pytest.mark.asyncio
+async def test_async_stream_collects_timings(base_url: str):
+    transport = AsyncHttpxTransport(base_url=base_url, retry_max_attempts=1, collect_timings=True)
+
+    async with transport.stream(request()) as (_, response):
+        assert await response.read() == b"timed"
+
+    assert response.timings is not None
+    assert_phases(response.timings)
+
+
+def test_slow_request_record_has_phases(base_url: str):
+    transport = HttpxTransport(
+        base_url=base_url, retry_max_attempts=1, slow_request_thresholds=SlowRequestThresholds(default=0)
+    )
+
+    with LogCapture(level=logging.WARNING) as capture:
+        _, response = transport.send(request())
+
+    (record,) = capture.records
+    (timings,) = record.timings
+    assert_phases(timings)
+    assert "; attempt 1: pool_wait " in record.getMessage()
+    assert response.timings is None
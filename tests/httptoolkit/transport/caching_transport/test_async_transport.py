@@ -0,0 +1,95 @@
+import asyncio
+
+import httpx
+import pytest
+from pytest_httpx import HTTPXMock
+
+from httptoolkit import AsyncService, HttpMethod, suppress_http_error
+from httptoolkit.cache import CachePolicy
+from httptoolkit.request import Request
+from httptoolkit.transport import AsyncCachingTransport, AsyncHttpxTransport
+
+URL = "https://example.com:4321/some/path"
+
+
+@pytest.fixture
+def transport() -> AsyncCachingTransport:
+    return AsyncCachingTransport(
+        AsyncHttpxTransport(base_url="https://example.com:4321", retry_max_attempts=1),
+        policy=CachePolicy(stale_if_error=60),
+    )
+
+
+def get_request() -> Request:
+    return Request(method=HttpMethod.GET, path="/some/path", params=None)
+
+
+@pytest.mark.asyncio
+async def test_fresh_response_is_served_from_cache(transport: AsyncCachingTransport, httpx_mock: HTTPXMock):
+    httpx_mock.add_response(url=URL, json={"cached": True}, headers={"Cache-Control": "max-age=60"})
+    service = AsyncService(transport=transport)
+
+    assert (await service.get("/some/path")).json() == {"cached": True}
+    assert (await service.get("/some/path")).json() == {"cached": True}
+    assert len(httpx_mock.get_requests()) == 1
+
+
+@pytest.mark.asyncio
+async def test_stale_while_revalidate_refreshes_once(transport: AsyncCachingTransport, httpx_mock: HTTPXMock):
+    responses = iter(["first", "second"])
+    httpx_mock.add_callback(
+        lambda request: httpx.Response(
+            200, text=next(responses), headers={"Cache-Control": "max-age=0, stale-while-revalidate=60"}
+        ),
+        url=URL,
+    )
+
+    assert (await transport.send(get_request()))[1].text == "first"
+    results = await asyncio.gather(*(transport.send(get_request()) for _ in range(5)))
+
+    assert {response.text for _, response in results} == {"first"}
+
+    await asyncio.gather(*transport._refreshing.values())
+
+    assert (await transport.send(get_request()))[1].text == "second"
+    assert len(httpx_mock.get_requests()) == 2
+
+
+@pytest.mark.asyncio
+async def test_stale_if_error(transport: AsyncCachingTransport, httpx_mock: HTTPXMock):
+    httpx_mock.add_response(url=URL, text="stale", headers={"Cache-Control": "max-age=0"})
+
+    await transport.send(get_request())
+
+    httpx_mock.reset(assert_all_responses_were_requested=False)
+    httpx_mock.add_exception(httpx.ReadTimeout("Timeout reached"), url=URL)
+
+    assert (await transport.send(get_request()))[1].text == "stale"
+
+    httpx_mock.reset(assert_all_responses_were_requested=False)
+    httpx_mock.add_response(url=URL, status_code=503)
+
+    assert (await transport.send(get_request()))[1].text == "stale"
+
+
+@pytest.mark.asyncio
+async def test_negative_caching(httpx_mock: HTTPXMock):
+    service = AsyncService(
+        transport=AsyncCachingTransport(
+            AsyncHttpxTransport(base_url="https://example.com:4321", retry_max_attempts=1),
+            policy=CachePolicy(negative_ttl=60, negative_status_codes=[410]),
+        ),
+    )
+    httpx_mock.add_response(url=URL, status_code=410)
+
+    for _ in range(3):
+        with suppress_http_error(410):
+            await service.get("/some/path")
+
+    assert len(httpx_mock.get_requests()) == 1
+
+
+def test_max_connections_of_wrapped_transport():
+    transport = AsyncCachingTransport(AsyncHttpxTransport(base_url="https://example.com:4321", max_connections=7))
+
+    assert transport.max_connections == 7
@@ -0,0 +1,238 @@
+import threading
+import time
+
+import httpx
+import pytest
+from pytest_httpx import HTTPXMock
+
+from httptoolkit import Header, HttpMethod, Service
+from httptoolkit.cache import CachePolicy, MemoryCacheStore
+from httptoolkit.errors import HttpError, ServiceError, suppress_http_error
+from httptoolkit.request import Request
+from httptoolkit.transport import CachingTransport, HttpxTransport
+
+URL = "https://example.com:4321/some/path"
+
+
+def wait_for_refresh(transport: CachingTransport) -> None:
+    deadline = time.monotonic() + 5
+    while transport._refreshing and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def store() -> MemoryCacheStore:
+    return MemoryCacheStore()
+
+
+@pytest.fixture
+def transport(store: MemoryCacheStore) -> CachingTransport:
+    return CachingTransport(
+        HttpxTransport(base_url="https://example.com:4321", retry_max_attempts=1),
+        store=store,
+        policy=CachePolicy(stale_if_error=60),
+    )
+
+
+@pytest.fixture
+def service(transport: CachingTransport) -> Service:
+    return Service(transport=transport)
+
+
+def get_request(path: str = "/some/path") -> Request:
+    return Request(method=HttpMethod.GET, path=path, params=None)
+
+
+def test_fresh_response_is_served_from_cache(service: Service, httpx_mock: HTTPXMock):
+    httpx_mock.add_response(url=URL, text="cached", headers={"Cache-Control": "max-age=60"})
+
+    assert service.get("/some/path").text == "cached"
+    response = service.get("/some/path")
+
+    assert response.text == "cached"
+    assert response.status_code == 200
+    assert len(httpx_mock.get_requests()) == 1
+
+
+def test_not_cacheable_responses_are_not_stored(service: Service, store: MemoryCacheStore, httpx_mock: HTTPXMock):
+    httpx_mock.add_response(url=URL, text="private", headers={"Cache-Control": "no-store"})
+    httpx_mock.add_response(method="POST", url=URL, text="created", headers={"Cache-Control": "max-age=60"})
+
+    service.get("/some/path")
+    service.get("/some/path")
+    service.post("/some/path")
+    service.post("/some/path")
+
+    assert len(httpx_mock.get_requests()) == 4
+    assert len(store) == 0
+
+
+def test_stale_while_revalidate_returns_stale_and_refreshes(transport: CachingTransport, httpx_mock: HTTPXMock):
+    responses = iter(["first", "second"])
+    httpx_mock.add_callback(
+        lambda request: httpx.Response(
+            200, text=next(responses), headers={"Cache-Control": "max-age=0, stale-while-revalidate=60"}
+        ),
+        url=URL,
+    )
+
+    assert transport.send(get_request())[1].text == "first"
+    assert transport.send(get_request())[1].text == "first"
+
+    wait_for_refresh(transport)
+
+    assert transport.send(get_request())[1].text == "second"
+
+
+def test_stale_while_revalidate_refreshes_once_per_key(transport: CachingTransport, httpx_mock: HTTPXMock):
+    release = threading.Event()
+    headers = {"Cache-Control": "max-age=0, stale-while-revalidate=60"}
+    calls = []
+
+    def callback(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        if len(calls) > 1:
+            release.wait(5)
+        return httpx.Response(200, text="body", headers=headers)
+
+    httpx_mock.add_callback(callback, url=URL)
+
+    transport.send(get_request())
+    for _ in range(5):
+        transport.send(get_request())
+    release.set()
+    wait_for_refresh(transport)
+
+    assert len(calls) == 2
+
+
+def test_revalidation_with_etag(transport: CachingTransport, httpx_mock: HTTPXMock):
+    httpx_mock.add_response(url=URL, text="tagged", headers={"ETag": '"v1"', "Cache-Control": "no-cache"})
+
+    transport.send(get_request())
+
+    httpx_mock.reset(assert_all_responses_were_requested=False)
+    httpx_mock.add_response(url=URL, status_code=304, headers={"Cache-Control": "max-age=60"})
+
+    sent_request, response = transport.send(get_request())
+
+    assert response.status_code == 200
+    assert response.text == "tagged"
+    revalidation = httpx_mock.get_request()
+    assert revalidation is not None
+    assert revalidation.headers["If-None-Match"] == '"v1"'
+
+    transport.send(get_request())
+    assert len(httpx_mock.get_requests()) == 1
+
+
+def test_stale_if_error_on_transport_error(service: Service, httpx_mock: HTTPXMock):
+    httpx_mock.add_response(url=URL, text="stale", headers={"Cache-Control": "max-age=0"})
+
+    service.get("/some/path")
+
+    httpx_mock.reset(assert_all_responses_were_requested=False)
+    httpx_mock.add_exception(httpx.ReadTimeout("Timeout reached"), url=URL)
+
+    assert service.get("/some/path").text == "stale"
+
+
+def test_stale_if_error_on_server_error(service: Service, httpx_mock: HTTPXMock):
+    httpx_mock.add_response(url=URL, text="stale", headers={"Cache-Control": "max-age=0"})
+
+    service.get("/some/path")
+
+    httpx_mock.reset(assert_all_responses_were_requested=False)
+    httpx_mock.add_response(url=URL, status_code=502)
+
+    assert service.get("/some/path").text == "stale"
+
+
+def test_stale_if_error_window_is_over(httpx_mock: HTTPXMock):
+    service = Service(
+        transport=CachingTransport(
+            HttpxTransport(base_url="https://example.com:4321", retry_max_attempts=1),
+            policy=CachePolicy(stale_if_error=0),
+        ),
+    )
+    httpx_mock.add_response(url=URL, text="stale", headers={"Cache-Control": "max-age=0, stale-if-error=0"})
+
+    service.get("/some/path")
+
+    httpx_mock.reset(assert_all_responses_were_requested=False)
+    httpx_mock.add_exception(httpx.ReadTimeout("Timeout reached"), url=URL)
+
+    with pytest.raises(ServiceError):
+        service.get("/some/path")
+
+
+def test_key_headers_separate_entries(httpx_mock: HTTPXMock):
+    transport = CachingTransport(
+        HttpxTransport(base_url="https://example.com:4321", retry_max_attempts=1),
+        policy=CachePolicy(default_ttl=60, key_headers=("Accept-Language",)),
+    )
+    httpx_mock.add_response(url=URL, text="body")
+
+    for language in ("en", "ru", "en"):
+        request = Request(
+            method=HttpMethod.GET,
+            path="/some/path",
+            params=None,
+            headers=(Header(name="Accept-Language", value=language, is_sensitive=False),),
+        )
+        transport.send(request)
+
+    assert len(httpx_mock.get_requests()) == 2
+
+
+def test_bodies_separate_entries(httpx_mock: HTTPXMock):
+    transport = CachingTransport(
+        HttpxTransport(base_url="https://example.com:4321", retry_max_attempts=1),
+        policy=CachePolicy(default_ttl=60, methods=("POST",)),
+    )
+    httpx_mock.add_callback(lambda request: httpx.Response(status_code=200, content=request.content), url=URL)
+
+    responses = [
+        transport.send(Request(method=HttpMethod.POST, path="/some/path", params=None, **body))[1].text
+        for body in ({"json": {"query": "a"}}, {"json": {"query": "b"}}, {"body": "a"}, {"json": {"query": "a"}})
+    ]
+
+    assert responses == ['{"query": "a"}', '{"query": "b"}', "a", '{"query": "a"}']
+    assert len(httpx_mock.get_requests()) == 3
+
+
+def test_max_connections_of_wrapped_transport():
+    transport = CachingTransport(HttpxTransport(base_url="https://example.com:4321", max_connections=7))
+
+    assert transport.max_connections == 7
+
+
+def test_stream_is_not_cached(transport: CachingTransport, httpx_mock: HTTPXMock):
+    httpx_mock.add_response(url=URL, text="streamed", headers={"Cache-Control": "max-age=60"})
+
+    for _ in range(2):
+        with transport.stream(get_request()) as (sent_request, stream_response):
+            assert stream_response.read() == b"streamed"
+
+    assert len(httpx_mock.get_requests()) == 2
+
+
+def test_negative_caching(httpx_mock: HTTPXMock):
+    service = Service(
+        transport=CachingTransport(
+            HttpxTransport(base_url="https://example.com:4321", retry_max_attempts=1),
+            policy=CachePolicy(negative_ttl=60),
+        ),
+    )
+    httpx_mock.add_response(url=URL, status_code=404, text="No such entity")
+
+    for _ in range(2):
+        with pytest.raises(HttpError) as error:
+            service.get("/some/path")
+        assert error.value.response_code() == 404
+        assert "No such entity" in str(error.value)
+
+    with suppress_http_error(404):
+        service.get("/some/path")
+
+    assert len(httpx_mock.get_requests()) == 1
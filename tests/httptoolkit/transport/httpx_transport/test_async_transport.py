@@ -337,11 +337,27 @@ async def test_logging_request(
         (
             "httptoolkit.transport._httpx._async",
             "INFO",
-            "Sending POST https://example.com:4321/put/some/data/here?please=True&carefully=True (body: 46)",
+            "Sending POST https://example.com:4321/put/some/data/here?please=True&carefully=True (body: 43)",
         )
     )
 
 
+@pytest.mark.asyncio
+async def test_logging_stream_completion(get_request, httpx_mock: HTTPXMock) -> None:
+    transport = AsyncHttpxTransport(base_url="https://example.com:4321", retry_max_attempts=1, log_completion=True)
+    httpx_mock.add_response(text="Streamed")
+
+    with LogCapture(level=logging.INFO) as capture:
+        async with transport.stream(get_request) as (_, response):
+            assert capture.records[-1].getMessage().startswith("Sending GET")
+            await response.read()
+
+    completion_record = capture.records[-1]
+    assert completion_record.getMessage().endswith(" ms (size: 8, attempts: 1)")
+    assert completion_record.status_code == 200
+    assert completion_record.response_size == 8
+
+
 @pytest.mark.asyncio
 async def test_session_is_not_closed_after_response(
     get_request,
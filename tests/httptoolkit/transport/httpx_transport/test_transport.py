@@ -1,17 +1,23 @@
 import json
 import logging
+import pickle
 import uuid
 from datetime import timedelta
 from json import JSONEncoder
 from typing import BinaryIO, Type
+from unittest.mock import patch
 
+import httpx
 import pytest
 from pytest_httpx import HTTPXMock
 from testfixtures import LogCapture
 
 from httptoolkit import Header, HttpMethod
 from httptoolkit.errors import TransportError
+from httptoolkit.log_sampling import EveryNthLogSampler
 from httptoolkit.request import Request
+from httptoolkit.sent_request import SentRequest
+from httptoolkit.tracing import InMemorySpanExporter, Tracer
 from httptoolkit.transport import HttpxTransport
 
 HTTPX_CLIENT_STATE_OPENED = 2
@@ -395,11 +401,130 @@ def test_logging_request(
         (
             "httptoolkit.transport._httpx._sync",
             "INFO",
-            "Sending POST https://example.com:4321/put/some/data/here?please=True&carefully=True (body: 46)",
+            "Sending POST https://example.com:4321/put/some/data/here?please=True&carefully=True (body: 43)",
         )
     )
 
 
+def test_nothing_is_logged_or_materialized_when_info_is_disabled(
+    post_request,
+    transport: HttpxTransport,
+    httpx_mock: HTTPXMock,
+) -> None:
+    httpx_mock.add_response()
+
+    with (
+        LogCapture(level=logging.WARNING) as capture,
+        patch("httptoolkit.transport._httpx._sent_request.Header", wraps=Header) as header,
+    ):
+        sent_request, _ = transport.send(post_request)
+
+        capture.check()
+        header.assert_not_called()
+        assert "content-length" in [header.name for header in sent_request.headers]
+        assert header.called
+
+
+def test_sent_request_headers_include_traceparent(post_request, httpx_mock: HTTPXMock) -> None:
+    transport = HttpxTransport(base_url="https://example.com:4321", tracer=Tracer(InMemorySpanExporter()))
+    httpx_mock.add_response()
+
+    sent_request, _ = transport.send(post_request)
+
+    headers = {header.name: header.value for header in sent_request.headers}
+    assert headers["traceparent"] == httpx_mock.get_requests()[0].headers["traceparent"]
+
+
+def test_logging_completion(get_request, httpx_mock: HTTPXMock) -> None:
+    transport = HttpxTransport(
+        base_url="https://example.com:4321", retry_max_attempts=2, retry_backoff_factor=0, log_completion=True
+    )
+    url = "https://example.com:4321/put/some/data/here?please=True&carefully=True"
+    httpx_mock.add_response(url=url, status_code=503)
+    httpx_mock.add_response(url=url, text="Completed")
+
+    with LogCapture(level=logging.INFO) as capture:
+        transport.send(get_request)
+
+    request_record, completion_record = capture.records
+    assert completion_record.getMessage().startswith(f"Received 200 for GET {url} in ")
+    assert completion_record.getMessage().endswith(" ms (size: 9, attempts: 2)")
+    assert completion_record.status_code == 200
+    assert completion_record.response_size == 9
+    assert [attempt.status_code for attempt in completion_record.attempts] == [503, 200]
+    assert completion_record.elapsed >= sum(attempt.elapsed for attempt in completion_record.attempts)
+
+
+def test_logging_completion_of_failed_stream(get_request, httpx_mock: HTTPXMock) -> None:
+    transport = HttpxTransport(base_url="https://example.com:4321", retry_max_attempts=1, log_completion=True)
+    httpx_mock.add_exception(httpx.ReadTimeout("Timeout reached"))
+
+    with LogCapture(level=logging.INFO) as capture:
+        with pytest.raises(TransportError):
+            with transport.stream(get_request):
+                pass  # pragma: no cover
+
+    completion_record = capture.records[-1]
+    assert completion_record.getMessage().endswith(" ms (attempts: 1): ReadTimeout")
+    assert completion_record.status_code is None
+    assert completion_record.attempts[0].error == "ReadTimeout"
+
+
+def test_sampled_out_records_are_suppressed_unless_failed_or_slow(get_request, httpx_mock: HTTPXMock) -> None:
+    transport = HttpxTransport(
+        base_url="https://example.com:4321",
+        retry_max_attempts=1,
+        log_completion=True,
+        log_sampler=EveryNthLogSampler(100, slow_request_threshold_in_seconds=60, report_interval_in_seconds=0),
+    )
+    httpx_mock.add_response()
+    httpx_mock.add_response()
+    httpx_mock.add_exception(httpx.ReadTimeout("Timeout reached"))
+
+    with LogCapture(level=logging.INFO) as capture:
+        transport.send(get_request)
+        transport.send(get_request)
+        with pytest.raises(TransportError):
+            transport.send(get_request)
+
+    messages = [record.getMessage() for record in capture.records]
+    assert len(messages) == 5
+    assert messages[0].startswith("Sending GET") and messages[1].startswith("Received 200")
+    assert messages[2] == "Suppressed 1 request log records in the last 0 s"
+    assert messages[3].startswith("Sending GET") and messages[4].startswith("Failed GET")
+
+
+def test_sampled_out_error_response_is_logged(get_request, httpx_mock: HTTPXMock) -> None:
+    transport = HttpxTransport(
+        base_url="https://example.com:4321",
+        retry_max_attempts=1,
+        log_sampler=EveryNthLogSampler(1000),
+    )
+    httpx_mock.add_response(status_code=500)
+
+    with LogCapture(level=logging.INFO) as capture:
+        for _ in range(3):
+            transport.send(get_request)
+
+    assert [record.getMessage().startswith("Sending GET") for record in capture.records] == [True] * 3
+
+
+def test_sampled_out_slow_request_is_logged(get_request, httpx_mock: HTTPXMock) -> None:
+    transport = HttpxTransport(
+        base_url="https://example.com:4321",
+        retry_max_attempts=1,
+        log_sampler=EveryNthLogSampler(100, slow_request_threshold_in_seconds=0),
+    )
+    httpx_mock.add_response()
+    httpx_mock.add_response()
+
+    with LogCapture(level=logging.INFO) as capture:
+        transport.send(get_request)
+        transport.send(get_request)
+
+    assert len(capture.records) == 2
+
+
 def test_session_is_not_closed_after_response(
     get_request,
     transport: HttpxTransport,
@@ -489,6 +614,19 @@ def test_returned_request(
     assert returned_request.proxies == {"http://": "http://10.10.1.10:3128"}
 
 
+def test_returned_request_is_materialized_on_pickle(transport, get_request: Request, httpx_mock: HTTPXMock) -> None:
+    httpx_mock.add_response()
+
+    returned_request, _ = transport.send(get_request)
+    unpickled = pickle.loads(pickle.dumps(returned_request))
+
+    assert type(unpickled) is SentRequest
+    assert unpickled.url == returned_request.url
+    assert unpickled.headers == returned_request.headers
+    assert unpickled.body == returned_request.body
+    assert unpickled.proxies == returned_request.proxies
+
+
 def test_custom_retry_status_codes(
     get_request, httpx_mock: HTTPXMock, transport_with_custom_retry_status_codes: HttpxTransport
 ) -> None:
@@ -0,0 +1,112 @@
+import asyncio
+import threading
+from typing import Iterator
+
+import httpx
+import pytest
+from pytest_httpx import HTTPXMock
+
+from httptoolkit import Service
+from httptoolkit.errors import HttpError, ServiceError
+from httptoolkit.tracing import InMemorySpanExporter, Tracer
+from httptoolkit.transport import AsyncHttpxTransport, BackgroundLoop, BackgroundLoopTransport
+
+
+@pytest.fixture
+def loop() -> Iterator[BackgroundLoop]:
+    loop = BackgroundLoop()
+    yield loop
+    loop.close()
+
+
+@pytest.fixture
+def service(loop: BackgroundLoop) -> Service:
+    return Service(
+        transport=BackgroundLoopTransport(
+            AsyncHttpxTransport(base_url="https://example.com", retry_max_attempts=1), loop=loop
+        )
+    )
+
+
+def test_threads_share_one_loop(httpx_mock: HTTPXMock, service: Service):
+    in_flight = []
+    loop_threads = set()
+
+    async def respond(request: httpx.Request) -> httpx.Response:
+        loop_threads.add(threading.current_thread().name)
+        in_flight.append(request)
+        await asyncio.sleep(0.1)
+        return httpx.Response(status_code=200, json={"in_flight": len(in_flight)})
+
+    httpx_mock.add_callback(respond, url="https://example.com/items")
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(service.get("/items").json())) for _ in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(results) == 20
+    assert max(result["in_flight"] for result in results) == 20
+    assert loop_threads == {"httptoolkit-loop"}
+
+
+def test_errors(httpx_mock: HTTPXMock, service: Service):
+    httpx_mock.add_response(url="https://example.com/missing", status_code=404, text="missing")
+    httpx_mock.add_exception(httpx.ReadTimeout("Timeout reached"), url="https://example.com/slow")
+
+    with pytest.raises(HttpError) as error:
+        service.get("/missing")
+    assert error.value.response.text == "missing"
+    with pytest.raises(ServiceError):
+        service.get("/slow")
+
+
+def test_stream(httpx_mock: HTTPXMock, service: Service):
+    httpx_mock.add_response(url="https://example.com/lines", content=b"first\nsecond\nthird\n")
+    httpx_mock.add_response(url="https://example.com/json", json={"ok": True})
+
+    with service.get_stream("/lines") as response:
+        assert response.status_code == 200
+        assert list(response.iter_lines()) == ["first", "second", "third"]
+    with service.get_stream("/json") as response:
+        assert response.read() == b'{"ok": true}'
+        assert response.text == '{"ok": true}'
+
+
+def test_stream_error_status_is_read(httpx_mock: HTTPXMock, service: Service):
+    httpx_mock.add_response(url="https://example.com/lines", status_code=500, text="failed")
+
+    with pytest.raises(ServiceError) as error:
+        with service.get_stream("/lines"):
+            pass  # pragma: no cover
+    assert "Response body: failed" in str(error.value)
+
+
+def test_requests_keep_caller_context(httpx_mock: HTTPXMock, loop: BackgroundLoop):
+    exporter = InMemorySpanExporter()
+    tracer = Tracer(exporter)
+    service = Service(
+        transport=BackgroundLoopTransport(AsyncHttpxTransport(base_url="https://example.com", tracer=tracer), loop)
+    )
+    httpx_mock.add_response(url="https://example.com/items")
+
+    with tracer.start_as_current_span("job") as job:
+        service.get("/items")
+
+    attempt, request_span, _ = exporter.spans
+    assert request_span.parent_span_id == job.span_id
+
+
+def test_loop_cant_wait_for_itself(loop: BackgroundLoop):
+    async def nested() -> None:
+        loop.run(asyncio.sleep(0))
+
+    with pytest.raises(RuntimeError):
+        loop.run(nested())
+
+
+def test_max_connections(loop: BackgroundLoop):
+    transport = BackgroundLoopTransport(AsyncHttpxTransport(base_url="https://example.com", max_connections=5), loop)
+
+    assert transport.max_connections == 5